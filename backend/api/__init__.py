@@ -2,7 +2,7 @@ import os
 from flask import Flask, jsonify
 from dotenv import load_dotenv
 from .config import Config
-from .extensions import init_extensions, init_firebase, scheduler
+from .extensions import init_extensions, init_firebase, scheduler, response_cache
 
 # blueprints
 from .blueprints.auth import bp as auth_bp
@@ -18,6 +18,13 @@ from .push.routes import bp as push_bp
 from .follows.routes import bp as follows_bp
 from .auth.oauth import bp as oauth_bp
 from .reminders.scheduler import register_jobs
+from .notifications.outbox import register_outbox_job
+from .notifications.counters import register_counter_job
+from .notifications.retention import register_retention_job
+from .notifications.digest import register_digest_job
+from .push.tokens import register_token_sweeper, live_counts as push_token_counts
+from .notifications.stream import notification_broker
+from .notifications.transport import init_push_transport
 
 load_dotenv()
 
@@ -29,12 +36,26 @@ def create_app():
     init_extensions(app)
     # init firebase (safe no-op if not configured)
     init_firebase(app)
+    notification_broker.init_app(app)
+    init_push_transport(app)
 
     # healthcheck
     @app.get("/health")
     def health():
         return jsonify({"ok": True}), 200
 
+    @app.get("/health/cache")
+    def health_cache():
+        return jsonify(response_cache.stats()), 200
+
+    @app.get("/health/stream")
+    def health_stream():
+        return jsonify({"connections": notification_broker.connections()}), 200
+
+    @app.get("/health/push")
+    def health_push():
+        return jsonify(push_token_counts()), 200
+
     prefix = app.config.get("API_PREFIX", "/api").rstrip("/")
     # mount blueprints
     app.register_blueprint(auth_bp, url_prefix=f"{prefix}/auth")
@@ -52,8 +73,19 @@ def create_app():
     app.register_blueprint(notifications_bp, url_prefix=f"{prefix}/notifications")
     app.register_blueprint(push_bp,           url_prefix=f"{prefix}/push")
 
-    # scheduler jobs (reminders, etc.) and start the scheduler
-    register_jobs(app)
-    scheduler.start()
+    # scheduler jobs (reminders, etc.); SCHEDULER_ENABLED=0 leaves them to `flask scheduler`
+    if app.config.get("SCHEDULER_ENABLED", True):
+        start_scheduler(app)
 
     return app
+
+def start_scheduler(app):
+    if scheduler.running:
+        return
+    register_jobs(app)
+    register_outbox_job(app)
+    register_counter_job(app)
+    register_retention_job(app)
+    register_digest_job(app)
+    register_token_sweeper(app)
+    scheduler.start()
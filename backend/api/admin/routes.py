@@ -1,10 +1,12 @@
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from sqlalchemy import or_
 from ..extensions import db
 from ..models import User, Event, Team, Tournament, Reminder, Notification, PushToken
-from ..schemas import user_schema
+from marshmallow import fields
+from ..schemas import user_schema, EventSchema
+from ..serializers import compile_dump, dump_many, dump_user, json_response
+from ..search import apply_search
 from datetime import datetime
 
 bp = Blueprint("admin", __name__)
@@ -60,14 +62,12 @@ def users_list():
     if err: return err
     q = request.args.get("q")
     status_filter = request.args.get("status")  # pending|verified|rejected
-    query = db.session.query(User)
-    if q:
-        like = f"%{q.lower()}%"
-        query = query.filter(or_(User.email.ilike(like), User.display_name.ilike(like)))
+    query, ranked = apply_search(db.session.query(User), User, q)
     page = int(request.args.get("page", 1)); page_size = min(int(request.args.get("page_size", 20)), 100)
     total = query.count()
-    rows = query.order_by(User.created_at.desc()).offset((page-1)*page_size).limit(page_size).all()
-    return jsonify({"page": page, "page_size": page_size, "total": total, "items": [user_schema.dump(u) for u in rows]})
+    if not ranked: query = query.order_by(User.created_at.desc())
+    rows = query.offset((page-1)*page_size).limit(page_size).all()
+    return json_response({"page": page, "page_size": page_size, "total": total, "items": dump_many(dump_user, rows)})
 
 @bp.patch("/users/<id>")
 @jwt_required()
@@ -84,14 +84,8 @@ def user_patch(id):
     return jsonify({"user": user_schema.dump(u)})
 
 # Events
-def _ev(e: Event):
-    return {
-        "id": str(e.id), "title": e.title, "sport": getattr(e,"sport",None),
-        "status": getattr(e,"status",None), "city": getattr(e,"city",None),
-        "starts_at": e.starts_at.isoformat() if getattr(e,"starts_at",None) else None,
-        "created_at": e.created_at.isoformat() if getattr(e,"created_at",None) else None,
-    }
-
+# admin list shapes, compiled once (see serializers.compile_dump)
+_ev = compile_dump(EventSchema, only=("id", "title", "sport", "status", "city", "starts_at", "created_at"))
 
 @bp.post("/events")
 @jwt_required()
@@ -112,23 +106,23 @@ def admin_create_event():
     )
     db.session.add(e); db.session.commit()
     return jsonify({"event": _ev(e)}), 201
+def admin_events_query(status=None):
+    query = db.session.query(Event)
+    if status:
+        query = query.filter(Event.status==status)
+    return query
+
 @bp.get("/events")
 @jwt_required()
 def events_list():
     admin, err = _require_admin()
     if err: return err
-    q = request.args.get("q")
-    status_filter = request.args.get("status")  # pending|verified|rejected; status = request.args.get("status")
-    query = db.session.query(Event)
-    if q:
-        like = f"%{q.lower()}%"
-        query = query.filter(or_(Event.title.ilike(like), Event.city.ilike(like), Event.sport.ilike(like)))
-    if status:
-        query = query.filter(Event.status==status)
+    query, ranked = apply_search(admin_events_query(request.args.get("status")), Event, request.args.get("q"))
     page = int(request.args.get("page",1)); page_size = min(int(request.args.get("page_size",20)),100)
     total = query.count()
-    rows = query.order_by(Event.starts_at.desc().nullslast(), Event.created_at.desc()).offset((page-1)*page_size).limit(page_size).all()
-    return jsonify({"page":page,"page_size":page_size,"total":total,"items":[_ev(e) for e in rows]})
+    if not ranked: query = query.order_by(Event.starts_at.desc(), Event.id.desc())
+    rows = query.offset((page-1)*page_size).limit(page_size).all()
+    return json_response({"page":page,"page_size":page_size,"total":total,"items":dump_many(_ev, rows)})
 
 @bp.patch("/events/<id>")
 @jwt_required()
@@ -182,13 +176,10 @@ def event_reject(id):
     return jsonify({"event": _ev(e)})
 
 # Teams
-def _team(t: Team):
-    return {
-        "id": str(t.id), "name": t.name, "sport": getattr(t,"sport",None),
-        "city": getattr(t,"city",None), "owner_id": getattr(t,"owner_id",None),
-        "verified_at": getattr(t,"verified_at",None).isoformat() if getattr(t,"verified_at",None) else None,
-        "created_at": t.created_at.isoformat() if getattr(t,"created_at",None) else None,
-    }
+_team = compile_dump({
+    "id": fields.Str(), "name": fields.Str(), "sport": fields.Str(), "city": fields.Str(),
+    "owner_id": fields.Str(), "verified_at": fields.DateTime(), "created_at": fields.DateTime(),
+}, model=Team)
 
 @bp.get("/teams")
 @jwt_required()
@@ -197,14 +188,12 @@ def teams_list():
     if err: return err
     q = request.args.get("q")
     status_filter = request.args.get("status")  # pending|verified|rejected
-    query = db.session.query(Team)
-    if q:
-        like = f"%{q.lower()}%"
-        query = query.filter(or_(Team.name.ilike(like), Team.city.ilike(like), Team.sport.ilike(like)))
+    query, ranked = apply_search(db.session.query(Team), Team, q)
     page = int(request.args.get("page",1)); page_size = min(int(request.args.get("page_size",20)),100)
     total = query.count()
-    rows = query.order_by(Team.created_at.desc()).offset((page-1)*page_size).limit(page_size).all()
-    return jsonify({"page":page,"page_size":page_size,"total":total,"items":[_team(t) for t in rows]})
+    if not ranked: query = query.order_by(Team.created_at.desc())
+    rows = query.offset((page-1)*page_size).limit(page_size).all()
+    return json_response({"page":page,"page_size":page_size,"total":total,"items":dump_many(_team, rows)})
 
 @bp.patch("/teams/<id>")
 @jwt_required()
@@ -260,14 +249,11 @@ def team_verify(id):
     return jsonify({"team": _team(t)})
 
 # Tournaments
-def _tour(t: Tournament):
-    return {
-        "id": str(t.id), "name": t.name, "sport": getattr(t,"sport",None),
-        "city": getattr(t,"city",None), "start_date": getattr(t,"start_date",None).isoformat() if getattr(t,"start_date",None) else None,
-        "end_date": getattr(t,"end_date",None).isoformat() if getattr(t,"end_date",None) else None,
-        "status": getattr(t,"status",None),
-        "created_at": t.created_at.isoformat() if getattr(t,"created_at",None) else None,
-    }
+# sport/status aren't Tournament columns yet; model= emits them as None
+_tour = compile_dump({
+    "id": fields.Str(), "name": fields.Str(), "sport": fields.Str(), "city": fields.Str(),
+    "start_date": fields.Date(), "end_date": fields.Date(), "status": fields.Str(), "created_at": fields.DateTime(),
+}, model=Tournament)
 
 @bp.get("/tournaments")
 @jwt_required()
@@ -276,14 +262,12 @@ def tournaments_list():
     if err: return err
     q = request.args.get("q")
     status_filter = request.args.get("status")  # pending|verified|rejected
-    query = db.session.query(Tournament)
-    if q:
-        like = f"%{q.lower()}%"
-        query = query.filter(or_(Tournament.name.ilike(like), Tournament.city.ilike(like), Tournament.sport.ilike(like)))
+    query, ranked = apply_search(db.session.query(Tournament), Tournament, q)
     page = int(request.args.get("page",1)); page_size = min(int(request.args.get("page_size",20)),100)
     total = query.count()
-    rows = query.order_by(Tournament.created_at.desc()).offset((page-1)*page_size).limit(page_size).all()
-    return jsonify({"page":page,"page_size":page_size,"total":total,"items":[_tour(x) for x in rows]})
+    if not ranked: query = query.order_by(Tournament.created_at.desc())
+    rows = query.offset((page-1)*page_size).limit(page_size).all()
+    return json_response({"page":page,"page_size":page_size,"total":total,"items":dump_many(_tour, rows)})
 
 @bp.post("/tournaments")
 @jwt_required()
@@ -323,6 +307,28 @@ def tournaments_patch(id):
     db.session.commit()
     return jsonify({"tournament": _tour(t)})
 
+# Bulk import (CSV / NDJSON, streamed)
+@bp.post("/import/<kind>")
+@jwt_required()
+def bulk_import(kind):
+    admin, err = _require_admin()
+    if err: return err
+    from ..importer import KINDS, FORMATS, import_stream, text_stream, DEFAULT_CHUNK_SIZE
+    if kind not in KINDS: return jsonify({"error": f"kind must be one of {', '.join(KINDS)}"}), 400
+    upload = request.files.get("file")
+    fmt = request.args.get("format")
+    if not fmt:
+        name = (upload.filename if upload else "") or ""
+        ctype = (upload.mimetype if upload else request.mimetype) or ""
+        fmt = "ndjson" if name.endswith((".ndjson", ".jsonl")) or "ndjson" in ctype or "jsonl" in ctype else "csv"
+    if fmt not in FORMATS: return jsonify({"error": "format must be csv or ndjson"}), 400
+    chunk_size = max(1, min(int(request.args.get("chunk_size", DEFAULT_CHUNK_SIZE)), 5000))
+    dry_run = request.args.get("dry_run", "").lower() in ("1", "true", "yes")
+    # raw body is read straight off the socket; multipart uploads are spooled by werkzeug
+    stream = text_stream(upload.stream if upload else request.stream)
+    report = import_stream(kind, stream, fmt, owner_id=admin.id, chunk_size=chunk_size, dry_run=dry_run)
+    return jsonify(report), (200 if report["inserted"] or dry_run or not report["failed"] else 400)
+
 # Reminders
 def _rem(r: Reminder):
     return {
@@ -411,6 +417,7 @@ def _pt(t: PushToken):
         "token": getattr(t,"token",None), "platform": getattr(t,"platform",None),
         "revoked_at": getattr(t,"revoked_at",None).isoformat() if getattr(t,"revoked_at",None) else None,
         "created_at": t.created_at.isoformat() if getattr(t,"created_at",None) else None,
+        "refreshed_at": t.refreshed_at.isoformat() if getattr(t,"refreshed_at",None) else None,
     }
 
 @bp.get("/push-tokens")
@@ -1,13 +1,22 @@
 from flask import Blueprint, jsonify, request, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity
+import math
 from datetime import datetime
-from ..extensions import db
+from sqlalchemy import and_, case, func, or_, update
+from ..extensions import db, response_cache
 from ..models import Event
-from ..schemas import event_schema, events_schema
+from ..schemas import event_schema
+from ..serializers import dump_event, dump_many, json_response
 from ..utils.ics import event_to_ics
+from ..utils.pagination import keyset_page, page_size, wants_total, CursorError, encode_cursor, decode_cursor
+from ..utils.geo import KM_PER_DEG, cell_ranges, haversine_km
+from ..utils.http import check_etag, with_etag
 
 bp = Blueprint("events", __name__)
 
+MAX_NEARBY_RADIUS_KM = 200.0
+MIN_NEARBY_RADIUS_KM = 0.1
+
 def parse_dt(s):
     if not s: return None
     try:
@@ -15,33 +24,122 @@ def parse_dt(s):
     except Exception:
         return None
 
-@bp.get("/events")
-def list_events():
+def _cursor_page(q):
+    # cursor mode: ?cursor= (empty for the first page), total only on request
+    try:
+        size = page_size(request.args.get("page_size"))
+    except ValueError:
+        return jsonify({"error": "page_size must be an integer"}), 400
+    try:
+        rows, next_cursor = keyset_page(q, Event.starts_at, Event.id, request.args.get("cursor"), size)
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    body = {"items": dump_many(dump_event, rows), "page_size": size, "next_cursor": next_cursor}
+    if wants_total(request.args):
+        body["total"] = q.order_by(None).count()
+    return json_response(body)
+
+# query builders shared with the query-plan check (api/query_plans.py)
+def events_query(args):
     q = Event.query
     # filters
     for attr in ["sport", "city", "province", "status"]:
-        v = request.args.get(attr)
+        v = args.get(attr)
         if v: q = q.filter(getattr(Event, attr) == v)
-    start = parse_dt(request.args.get("from"))
-    end = parse_dt(request.args.get("to"))
+    start = parse_dt(args.get("from"))
+    end = parse_dt(args.get("to"))
     if start: q = q.filter(Event.starts_at >= start)
     if end:   q = q.filter(Event.starts_at <= end)
+    return q
 
+def nearby_distance(lat, lng):
+    # squared distance in degrees of latitude; longitude scaled at `lat` and
+    # taken the short way round the antimeridian
+    dlng = func.abs(Event.lng - lng)
+    dlng = case((dlng > 180, 360 - dlng), else_=dlng) * math.cos(math.radians(lat))
+    return (Event.lat - lat) * (Event.lat - lat) + dlng * dlng
+
+def live_query():
+    return Event.query.filter(Event.status == "live").order_by(Event.starts_at.desc()).limit(100)
+
+def schedule_query(now=None):
+    # approved upcoming events
+    return Event.query.filter(Event.status == "approved", Event.starts_at >= (now or datetime.utcnow()))
+
+@bp.get("/events")
+@response_cache.cached("events")
+def list_events():
+    q = events_query(request.args)
+    if "cursor" in request.args:
+        return _cursor_page(q)
     page = int(request.args.get("page", 1))
     size = int(request.args.get("page_size", 20))
     items = q.order_by(Event.starts_at.asc()).paginate(page=page, per_page=size, error_out=False)
-    return jsonify({"items": events_schema.dump(items.items), "page": page, "page_size": size, "total": items.total})
+    return json_response({"items": dump_many(dump_event, items.items), "page": page, "page_size": size, "total": items.total})
 
 @bp.get("/events/live")
+@response_cache.cached("events")
 def live_events():
-    q = Event.query.filter(Event.status == "live").order_by(Event.starts_at.desc()).limit(100)
-    return jsonify(events_schema.dump(q.all()))
+    return json_response(dump_many(dump_event, live_query().all()))
+
+@bp.get("/events/nearby")
+def nearby_events():
+    try:
+        lat = float(request.args["lat"]); lng = float(request.args["lng"])
+    except (KeyError, ValueError):
+        return jsonify({"error":"lat and lng required"}), 400
+    try:
+        radius = float(request.args.get("radius_km", 10))
+        size = int(request.args.get("page_size", 20))
+    except ValueError:
+        return jsonify({"error":"radius_km and page_size must be numbers"}), 400
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return jsonify({"error":"lat/lng out of range"}), 400
+    if radius != radius or radius <= 0:  # NaN
+        return jsonify({"error":"radius_km must be a positive number"}), 400
+    if radius > MAX_NEARBY_RADIUS_KM:
+        return jsonify({"error":f"radius_km must be at most {MAX_NEARBY_RADIUS_KM:g}"}), 400
+    radius = max(radius, MIN_NEARBY_RADIUS_KM)
+    size = min(max(size, 1), 100)
+    after = None
+    if request.args.get("cursor"):
+        try:
+            after = decode_cursor(request.args["cursor"], parse=float)
+        except CursorError as e:
+            return jsonify({"error": str(e)}), 400
+
+    # 1) prune: index range scans over the grid cells covering the bounding box,
+    #    ordered by squared equirectangular distance (plain arithmetic, so the
+    #    database sorts it) and cut at one page: each request reads one page
+    #    whatever the density of the area
+    d2 = nearby_distance(lat, lng)
+    cells = or_(*[Event.geo_cell.between(lo, hi) for lo, hi in cell_ranges(lat, lng, radius)])
+    q = events_query(request.args).filter(cells, d2 <= (radius / KM_PER_DEG) ** 2)
+    # 2) keyset on (distance, id)
+    if after:
+        q = q.filter(or_(d2 > after[0], and_(d2 == after[0], Event.id > after[1])))
+    cand = q.with_entities(Event.id, Event.lat, Event.lng, d2.label("d2"))\
+        .order_by(d2, Event.id).limit(size + 1).all()
+    page, rest = cand[:size], cand[size:]
+    # 3) exact distances for the page
+    dists = haversine_km(lat, lng, [c.lat for c in page], [c.lng for c in page])
+
+    rows = {e.id: e for e in Event.query.filter(Event.id.in_([c.id for c in page])).all()} if page else {}
+    items = []
+    for d, c in zip(dists, page):
+        item = dump_event(rows[c.id])
+        item["distance_km"] = round(d, 3)
+        items.append(item)
+    next_cursor = encode_cursor(page[-1].d2, page[-1].id) if rest else None
+    return json_response({"items": items, "page_size": size, "radius_km": radius, "next_cursor": next_cursor})
 
 @bp.get("/events/<id>")
 def get_event(id):
+    early = check_etag(Event, id, "event")
+    if early: return early
     ev = db.session.get(Event, id)
     if not ev: return jsonify({"error":"not found"}), 404
-    return jsonify(event_schema.dump(ev))
+    return with_etag(jsonify(event_schema.dump(ev)), "event", ev)
 
 @bp.post("/events")
 @jwt_required()
@@ -65,6 +163,13 @@ def create_event():
         host_id=get_jwt_identity(),
     )
     db.session.add(ev)
+    db.session.flush()
+    # followers are notified by the outbox drain; queued in the same commit as the event
+    from ..notifications.fanout import queue_fan_out
+    queue_fan_out(ev.host_id, "new_event",
+        title=f"New event: {ev.title}",
+        body="A new match was posted",
+        data={"entity":"event","eventId": ev.id, "sport": ev.sport})
     db.session.commit()
     return jsonify(event_schema.dump(ev)), 201
 
@@ -73,20 +178,25 @@ def create_event():
 def hosted_by_me():
     uid = get_jwt_identity()
     q = Event.query.filter_by(host_id=uid).order_by(Event.starts_at.desc())
-    return jsonify(events_schema.dump(q.all()))
+    return json_response(dump_many(dump_event, q.all()))
 
 
 @bp.get("/events/schedule")
+@response_cache.cached("events")
 def events_schedule():
     # approved upcoming events sorted by start time
-    now = datetime.utcnow()
-    q = Event.query.filter(Event.status == "approved", Event.starts_at >= now).order_by(Event.starts_at.asc())
+    q = schedule_query()
+    if "cursor" in request.args:
+        return _cursor_page(q)
+    q = q.order_by(Event.starts_at.asc())
     page = int(request.args.get("page", 1)); size = int(request.args.get("page_size", 20))
     items = q.paginate(page=page, per_page=size, error_out=False)
-    return jsonify({"items": events_schema.dump(items.items), "page": page, "page_size": size, "total": items.total})
+    return json_response({"items": dump_many(dump_event, items.items), "page": page, "page_size": size, "total": items.total})
 
 @bp.get("/events/<id>/ics")
 def event_ics(id):
+    early = check_etag(Event, id, "ics")
+    if early: return early
     ev = db.session.get(Event, id)
     if not ev: return jsonify({"error": "not found"}), 404
     ics = event_to_ics({
@@ -97,9 +207,31 @@ def event_ics(id):
         "starts_at": ev.starts_at,
         "ends_at": ev.ends_at or ev.starts_at,
     })
-    return Response(ics, mimetype="text/calendar")
+    return with_etag(Response(ics, mimetype="text/calendar"), "ics", ev)
 
 
+def _reserve_tickets(ticket_type_id, event_id, qty):
+    """
+    Take `qty` seats in one conditional UPDATE (no read-then-write, so no oversell
+    and no row held locked across a round trip). Returns the updated
+    (price_cents, currency, capacity, sold) row, or None if invalid/sold out.
+    """
+    from ..models import TicketType
+    stmt = (
+        update(TicketType)
+        .where(TicketType.id == ticket_type_id, TicketType.event_id == event_id,
+               or_(TicketType.capacity.is_(None), TicketType.sold + qty <= TicketType.capacity))
+        .values(sold=TicketType.sold + qty)
+        .execution_options(synchronize_session=False)
+    )
+    cols = (TicketType.price_cents, TicketType.currency, TicketType.capacity, TicketType.sold)
+    if db.session.get_bind().dialect.update_returning:
+        return db.session.execute(stmt.returning(*cols)).first()
+    # no RETURNING (e.g. SQLite < 3.35): the row count says whether we got the seats
+    if db.session.execute(stmt).rowcount != 1:
+        return None
+    return db.session.query(*cols).filter(TicketType.id == ticket_type_id).first()
+
 @bp.post("/events/<id>/tickets/purchase")
 @jwt_required()
 def purchase_tickets(id):
@@ -111,36 +243,33 @@ def purchase_tickets(id):
     ticket_type_id = data.get("ticket_type_id")
     price_cents = int(data.get("price_cents") or 0)
     currency = data.get("currency") or "GBP"
-    # capacity check if ticket_type_id provided
+    remaining = None
     if ticket_type_id:
-        from ..models import TicketType
-        tt = db.session.get(TicketType, ticket_type_id)
-        if not tt or str(tt.event_id) != str(e.id):
-            return jsonify({"error":"invalid ticket_type"}), 400
-        if tt.capacity is not None and tt.sold + qty > tt.capacity:
-            return jsonify({"error":"sold_out"}), 400
-        tt.sold += qty
+        tt = _reserve_tickets(ticket_type_id, e.id, qty)
+        if tt is None:
+            from ..models import TicketType
+            exists = db.session.query(TicketType.id).filter_by(id=ticket_type_id, event_id=e.id).first()
+            db.session.rollback()
+            return jsonify({"error": "sold_out" if exists else "invalid ticket_type"}), 400
         total_cents = (tt.price_cents or 0) * qty
         currency = tt.currency or currency
-        ticket_type = tt
+        remaining = tt.capacity - tt.sold if tt.capacity is not None else None
     else:
         total_cents = price_cents * qty
-        ticket_type = None
     from ..models import TicketPurchase
     purchase = TicketPurchase(user_id=uid, event_id=e.id, ticket_type_id=ticket_type_id, quantity=qty, total_cents=total_cents, currency=currency)
-    db.session.add(purchase); db.session.commit()
-    # send notifications (buyer + host)
-    try:
-        from ..notifications.service import deliver_notification
-        deliver_notification([uid], "ticket_purchased",
-            title="Ticket purchased", body=f"You bought {qty} ticket(s) for {e.title}",
-            data={"entity":"event","eventId": str(e.id)})
-        deliver_notification([e.host_id], "ticket_sold",
-            title="Ticket sold", body=f"{qty} ticket(s) sold for {e.title}",
-            data={"entity":"event","eventId": str(e.id)})
-    except Exception:
-        pass
-    return jsonify({"ok": True, "purchase_id": str(purchase.id)}), 201
+    db.session.add(purchase)
+    # notifications (buyer + host) commit with the purchase; pushes go out via the outbox
+    from ..notifications.service import deliver_notification
+    deliver_notification([uid], "ticket_purchased",
+        title="Ticket purchased", body=f"You bought {qty} ticket(s) for {e.title}",
+        data={"entity":"event","eventId": str(e.id)}, commit=False)
+    # host side is coalesced: one "N tickets sold" per event per window
+    from ..notifications.digest import notify_coalesced
+    notify_coalesced(e.host_id, "ticket_sold", entity=f"event:{e.id}", subject=e.title, count=qty,
+        data={"entity":"event","eventId": str(e.id)}, commit=False)
+    db.session.commit()
+    return jsonify({"ok": True, "purchase_id": str(purchase.id), "remaining": remaining}), 201
 
 @bp.get("/events/<id>/tickets")
 @jwt_required()
@@ -1,27 +1,35 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..extensions import db
+from ..extensions import db, response_cache
 from ..models import Team, TeamFollower
-from ..schemas import team_schema, teams_schema
+from ..schemas import team_schema
+from ..serializers import dump_team, dump_many, json_response
+from ..search import apply_search
+from ..utils.http import check_etag, with_etag
 
 bp = Blueprint("teams", __name__)
 
 @bp.get("/teams")
+@response_cache.cached("teams")
 def list_teams():
     q = Team.query
     for attr in ["sport", "city", "province", "league"]:
         v = request.args.get(attr)
         if v: q = q.filter(getattr(Team, attr) == v)
+    q, ranked = apply_search(q, Team, request.args.get("search"))
+    if not ranked: q = q.order_by(Team.created_at.desc())
     page = int(request.args.get("page", 1))
     size = int(request.args.get("page_size", 20))
-    items = q.order_by(Team.created_at.desc()).paginate(page=page, per_page=size, error_out=False)
-    return jsonify({"items": teams_schema.dump(items.items), "page": page, "page_size": size, "total": items.total})
+    items = q.paginate(page=page, per_page=size, error_out=False)
+    return json_response({"items": dump_many(dump_team, items.items), "page": page, "page_size": size, "total": items.total})
 
 @bp.get("/teams/<id>")
 def get_team(id):
+    early = check_etag(Team, id, "team")
+    if early: return early
     t = db.session.get(Team, id)
     if not t: return jsonify({"error":"not found"}), 404
-    return jsonify(team_schema.dump(t))
+    return with_etag(jsonify(team_schema.dump(t)), "team", t)
 
 @bp.post("/teams")
 @jwt_required()
@@ -48,7 +56,7 @@ def create_team():
 def my_teams():
     uid = get_jwt_identity()
     q = Team.query.filter_by(owner_id=uid).order_by(Team.created_at.desc())
-    return jsonify(teams_schema.dump(q.all()))
+    return json_response(dump_many(dump_team, q.all()))
 
 @bp.post("/teams/<id>/follow")
 @jwt_required()
@@ -1,27 +1,35 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..extensions import db
+from ..extensions import db, response_cache
 from ..models import Tournament, Registration
-from ..schemas import tournament_schema, tournaments_schema
+from ..schemas import tournament_schema
+from ..serializers import dump_tournament, dump_many, json_response
+from ..search import apply_search
+from ..utils.http import check_etag, with_etag
 
 bp = Blueprint("tournaments", __name__)
 
 @bp.get("/tournaments")
+@response_cache.cached("tournaments")
 def list_tournaments():
     q = Tournament.query
     for attr in ["city", "province", "level", "institution_type"]:
         v = request.args.get(attr)
         if v: q = q.filter(getattr(Tournament, attr) == v)
+    q, ranked = apply_search(q, Tournament, request.args.get("search"))
+    if not ranked: q = q.order_by(Tournament.start_date.asc().nulls_last())
     page = int(request.args.get("page", 1))
     size = int(request.args.get("page_size", 20))
-    items = q.order_by(Tournament.start_date.asc().nulls_last()).paginate(page=page, per_page=size, error_out=False)
-    return jsonify({"items": tournaments_schema.dump(items.items), "page": page, "page_size": size, "total": items.total})
+    items = q.paginate(page=page, per_page=size, error_out=False)
+    return json_response({"items": dump_many(dump_tournament, items.items), "page": page, "page_size": size, "total": items.total})
 
 @bp.get("/tournaments/<id>")
 def get_tournament(id):
+    early = check_etag(Tournament, id, "tournament")
+    if early: return early
     t = db.session.get(Tournament, id)
     if not t: return jsonify({"error":"not found"}), 404
-    return jsonify(tournament_schema.dump(t))
+    return with_etag(jsonify(tournament_schema.dump(t)), "tournament", t)
 
 @bp.post("/tournaments/<id>/register")
 @jwt_required()
@@ -1,8 +1,14 @@
-from flask import Blueprint, jsonify, request
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..extensions import db
-from ..models import User
+from itsdangerous import URLSafeSerializer, BadSignature
+from sqlalchemy import and_, func, or_, select
+from ..extensions import db, response_cache
+from ..models import User, Event, Reminder, Team, TeamFollower
 from ..schemas import user_schema
+from ..utils.ics import calendar_stream
 
 bp = Blueprint("users", __name__)
 
@@ -22,3 +28,124 @@ def patch_me():
             setattr(u, k, data[k])
     db.session.commit()
     return jsonify(user_schema.dump(u))
+
+
+# ---------------- subscribable calendar feed ----------------
+FEED_PAST_DAYS = 90       # keep recent matches in the feed, drop older ones
+FEED_FUTURE_DAYS = 365    # and don't list anything further ahead than this
+FEED_MAX_EVENTS = 1000    # rows per feed; bounds the rendered body kept in the cache
+FEED_STATE_TTL = 86400    # seconds a rendered feed is kept while nothing changes
+
+def _feed_serializer():
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt="calendar-feed")
+
+def _feed_token(uid, version):
+    token = _feed_serializer().dumps({"u": uid, "v": version})
+    return jsonify({"token": token, "url": url_for("users.calendar_feed", token=token, _external=True)})
+
+def _feed_filter(uid):
+    # reminded events + events of teams the user follows. Events carry no team
+    # id, so "a team's event" means one hosted by the team's owner in the
+    # team's sport (any sport if the team has none); an owner hosting for
+    # several teams of one sport still shows up under each.
+    reminded = select(Reminder.event_id).where(Reminder.user_id == uid)
+    followed = (select(Team.owner_id, Team.sport).join(TeamFollower, TeamFollower.team_id == Team.id)
+                .where(TeamFollower.user_id == uid).subquery())
+    team_event = select(followed.c.owner_id).where(
+        followed.c.owner_id == Event.host_id, or_(followed.c.sport.is_(None), followed.c.sport == Event.sport))
+    now = datetime.utcnow()
+    return and_(Event.starts_at >= now - timedelta(days=FEED_PAST_DAYS),
+                Event.starts_at <= now + timedelta(days=FEED_FUTURE_DAYS),
+                or_(Event.id.in_(reminded), team_event.exists()))
+
+def _feed_version(uid):
+    """(etag, newest change) for the feed, from one aggregate query; nothing is rendered."""
+    row = db.session.query(
+        func.count(Event.id),
+        func.max(func.coalesce(Event.updated_at, Event.created_at)),
+        select(func.max(Reminder.created_at)).where(Reminder.user_id == uid).scalar_subquery(),
+        select(func.max(TeamFollower.created_at)).where(TeamFollower.user_id == uid).scalar_subquery(),
+        select(func.max(func.coalesce(Team.updated_at, Team.created_at))).join(TeamFollower, TeamFollower.team_id == Team.id)
+            .where(TeamFollower.user_id == uid).scalar_subquery(),
+    ).filter(_feed_filter(uid)).one()
+    count, stamps = row[0], [s for s in row[1:] if s]
+    newest = max(stamps) if stamps else None
+    raw = f"{uid}:{count}:" + ",".join(s.isoformat() if s else "-" for s in row[1:])
+    return hashlib.sha1(raw.encode()).hexdigest(), newest
+
+def _feed_rows(uid):
+    cols = (Event.id, Event.title, Event.venue, Event.city, Event.starts_at, Event.ends_at)
+    q = db.session.query(*cols).filter(_feed_filter(uid)).order_by(Event.starts_at.asc(), Event.id.asc())\
+        .limit(FEED_MAX_EVENTS)
+    for r in q.yield_per(500):
+        yield r._asdict()
+
+@bp.get("/me/calendar-token")
+@jwt_required()
+def calendar_token():
+    uid = get_jwt_identity()
+    version = db.session.query(User.calendar_token_version).filter(User.id == uid).scalar()
+    if version is None: return jsonify({"error":"not found"}), 404
+    return _feed_token(uid, version)
+
+@bp.post("/me/calendar-token/rotate")
+@jwt_required()
+def rotate_calendar_token():
+    # revokes every feed URL issued so far (e.g. one that leaked) and returns a new one
+    uid = get_jwt_identity()
+    u = db.session.get(User, uid)
+    if not u: return jsonify({"error":"not found"}), 404
+    u.calendar_token_version = (u.calendar_token_version or 0) + 1
+    db.session.commit()
+    return _feed_token(uid, u.calendar_token_version)
+
+@bp.get("/me/calendar.ics")
+def calendar_feed():
+    try:
+        payload = _feed_serializer().loads(request.args.get("token", ""))
+        uid, version = payload["u"], payload.get("v", 0)  # tokens issued before versioning count as 0
+    except (BadSignature, KeyError, TypeError, AttributeError):
+        return jsonify({"error": "invalid calendar token"}), 401
+    current = db.session.query(User.calendar_token_version).filter(User.id == uid).scalar()
+    if current is None or current != version:
+        return jsonify({"error": "invalid calendar token"}), 401  # rotated (or user gone)
+    etag, newest = _feed_version(uid)
+
+    key = f"calendar:{uid}"
+    try:
+        state = response_cache.backend.get(key)
+    except Exception:
+        state = None  # cache down: render every time
+    if state and state["etag"] == etag:
+        last_modified = state["last_modified"]
+    else:
+        # a removed reminder doesn't raise any timestamp, so a changed feed is never older than "now"
+        last_modified = int(newest.replace(tzinfo=timezone.utc).timestamp()) if newest else 0
+        if state:
+            last_modified = max(last_modified, int(time.time()))
+        state = None
+
+    if request.if_none_match.contains(etag) or (
+        not request.if_none_match and request.if_modified_since
+        and int(request.if_modified_since.timestamp()) >= last_modified
+    ):
+        resp = Response(status=304)
+    elif state and state.get("body") is not None:
+        resp = Response(state["body"], mimetype="text/calendar")
+    else:
+        def generate():
+            parts = []
+            for chunk in calendar_stream(_feed_rows(uid), name="Sportrium"):
+                parts.append(chunk)
+                yield chunk
+            try:
+                response_cache.backend.set(key, {"etag": etag, "last_modified": last_modified, "body": "".join(parts)},
+                                           FEED_STATE_TTL)
+            except Exception:
+                pass
+        resp = Response(stream_with_context(generate()), mimetype="text/calendar")
+    resp.set_etag(etag)
+    if last_modified:
+        resp.last_modified = datetime.fromtimestamp(last_modified, tz=timezone.utc)
+    resp.headers["Cache-Control"] = "private, max-age=300"
+    return resp
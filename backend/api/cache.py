@@ -0,0 +1,216 @@
+"""
+Shared response cache for public read endpoints.
+
+Keys are the request path + normalized query args + the current version of
+each tag the endpoint depends on ("events", "teams", ...). Committing a
+change to a tagged table bumps that tag's version, so every dependent entry
+is skipped from then on and ages out via LRU/TTL. Nothing has to enumerate
+keys to invalidate.
+
+Backends: in-process LRU+TTL (default) or any Redis-compatible server via
+RESPONSE_CACHE_URL, which also shares invalidations across processes (e.g.
+the admin API on :5050 and the public API on :5000).
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    # Optional: only needed for a shared (cross-process) cache
+    import redis
+except Exception:
+    redis = None
+
+# tables whose commits invalidate cached responses (table name == tag)
+WATCHED_TABLES = {"events", "teams", "tournaments"}
+
+
+class LRUTTLBackend:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def versions(self, tags):
+        with self._lock:
+            return [self._versions.get(t, 0) for t in tags]
+
+    def bump(self, tag):
+        with self._lock:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisBackend:
+    def __init__(self, url, prefix="sportrium:cache:"):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def versions(self, tags):
+        raw = self.client.mget([f"{self.prefix}v:{t}" for t in tags])
+        return [int(v or 0) for v in raw]
+
+    def bump(self, tag):
+        self.client.incr(f"{self.prefix}v:{tag}")
+
+    def __len__(self):
+        return -1  # not tracked for shared backends
+
+
+class ResponseCache:
+    def __init__(self):
+        self.backend = LRUTTLBackend()
+        self.ttl = 30
+        self.enabled = True
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+        self._stats_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = int(app.config.get("RESPONSE_CACHE_TTL", 30))
+        self.enabled = self.ttl > 0
+        url = app.config.get("RESPONSE_CACHE_URL")
+        if url and redis is None:
+            app.logger.warning("RESPONSE_CACHE_URL set but redis not installed; using in-process cache")
+        elif url:
+            self.backend = RedisBackend(url)
+            return
+        self.backend = LRUTTLBackend(int(app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024)))
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def stats(self):
+        with self._stats_lock:
+            s = dict(self._stats)
+        lookups = s["hits"] + s["misses"]
+        s["hit_ratio"] = round(s["hits"] / lookups, 4) if lookups else 0.0
+        s["entries"] = len(self.backend)
+        s["backend"] = type(self.backend).__name__
+        return s
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            try:
+                self.backend.bump(tag)
+                self._count("invalidations")
+            except Exception:
+                pass
+
+    def _key(self, tags):
+        args = sorted(request.args.items(multi=True))
+        qs = "&".join(f"{k}={v}" for k, v in args)
+        versions = ",".join(str(v) for v in self.backend.versions(tags))
+        return f"{request.path}?{qs}|{versions}"
+
+    def cached(self, *tags, ttl=None):
+        """Cache successful GET JSON responses; invalidated when any of `tags` changes."""
+        def deco(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != "GET":
+                    return fn(*args, **kwargs)
+                try:
+                    key = self._key(tags)
+                    hit = self.backend.get(key)
+                except Exception:
+                    return fn(*args, **kwargs)  # cache down: serve uncached
+                if hit is not None:
+                    self._count("hits")
+                    etag = hit.get("etag")
+                    if etag and request.if_none_match.contains(etag):
+                        resp = Response(status=304)
+                    else:
+                        resp = Response(hit["body"], status=200, mimetype=hit["mimetype"])
+                    if etag:
+                        resp.set_etag(etag)
+                    resp.headers["X-Cache"] = "HIT"
+                    return resp
+                self._count("misses")
+                resp = make_response(fn(*args, **kwargs))
+                if resp.status_code == 200 and resp.mimetype == "application/json":
+                    resp.add_etag()  # body hash, computed once per stored entry
+                    try:
+                        self.backend.set(key, {"body": resp.get_data(as_text=True), "mimetype": resp.mimetype,
+                                               "etag": resp.get_etag()[0]}, ttl or self.ttl)
+                        self._count("stores")
+                    except Exception:
+                        pass
+                    resp.make_conditional(request)
+                resp.headers["X-Cache"] = "MISS"
+                return resp
+            return wrapper
+        return deco
+
+
+response_cache = ResponseCache()
+
+
+# ---------------- write-driven invalidation ----------------
+def mark_changed(session, *tags):
+    """Queue tags to invalidate when `session` commits (for Core writes the ORM can't see)."""
+    session.info.setdefault("cache_tags", set()).update(tags)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session, flush_context):
+    tags = {getattr(obj, "__tablename__", None) for obj in (*session.new, *session.dirty, *session.deleted)}
+    tags &= WATCHED_TABLES
+    if tags:
+        mark_changed(session, *tags)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk(orm_execute_state):
+    # query.update()/delete() bypass the unit of work
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        table = getattr(mapper, "local_table", None)
+        if table is not None and table.name in WATCHED_TABLES:
+            mark_changed(orm_execute_state.session, table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("cache_tags", None)
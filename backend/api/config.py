@@ -55,3 +55,63 @@ class Config:
     SMTP_USER = os.getenv("SMTP_USER") or None
     SMTP_PASS = os.getenv("SMTP_PASS") or None
     SMTP_FROM = os.getenv("SMTP_FROM", "no-reply@sportrium.local")
+
+    # Response cache for public GET lists (0 TTL disables).
+    # Set a redis:// URL to share entries + invalidations across processes.
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL") or None
+
+    # Push delivery from the notification outbox:
+    # "scheduler" drains it in-process, "worker" leaves it to `flask notify-worker`
+    NOTIFY_DELIVERY = os.getenv("NOTIFY_DELIVERY", "scheduler")
+    NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "100"))
+    NOTIFY_THREADS = int(os.getenv("NOTIFY_THREADS", "8"))
+    NOTIFY_POLL_SECONDS = int(os.getenv("NOTIFY_POLL_SECONDS", "5"))
+    NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+    NOTIFY_BACKOFF_SECONDS = int(os.getenv("NOTIFY_BACKOFF_SECONDS", "30"))
+    NOTIFY_CLAIM_LEASE_SECONDS = int(os.getenv("NOTIFY_CLAIM_LEASE_SECONDS", "300"))
+    # how often unread badge counters are recomputed from the notifications table
+    COUNTER_RECONCILE_MINUTES = int(os.getenv("COUNTER_RECONCILE_MINUTES", "60"))
+    # read notifications older than this move to notifications_archive
+    NOTIFY_RETENTION_DAYS = int(os.getenv("NOTIFY_RETENTION_DAYS", "90"))
+    NOTIFY_RETENTION_BATCH = int(os.getenv("NOTIFY_RETENTION_BATCH", "1000"))
+    NOTIFY_RETENTION_INTERVAL_HOURS = int(os.getenv("NOTIFY_RETENTION_INTERVAL_HOURS", "24"))
+    # sent/skipped/failed push outbox rows older than this are deleted by the same job
+    NOTIFY_OUTBOX_RETENTION_DAYS = int(os.getenv("NOTIFY_OUTBOX_RETENTION_DAYS", "7"))
+    # run background jobs in this process (set 0 on web workers and run `flask scheduler` once)
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1").lower() not in ("0", "false", "no")
+    # only the holder of this DB lease runs the reminder engine/poll (0 = every process ticks; claims still dedupe);
+    # the interval engine stretches it to at least two ticks
+    REMINDER_LEADER_LEASE_SECONDS = int(os.getenv("REMINDER_LEADER_LEASE_SECONDS", "30"))
+    # a claimed reminder not delivered within this long can be claimed by another worker
+    REMINDER_CLAIM_LEASE_SECONDS = int(os.getenv("REMINDER_CLAIM_LEASE_SECONDS", "120"))
+    # reminders: timer (in-memory heap, fires on the second) | interval (legacy 1-minute poll)
+    REMINDER_ENGINE = os.getenv("REMINDER_ENGINE", "timer")
+    REMINDER_HORIZON_SECONDS = int(os.getenv("REMINDER_HORIZON_SECONDS", "900"))
+    REMINDER_RESYNC_SECONDS = int(os.getenv("REMINDER_RESYNC_SECONDS", "300"))
+    REMINDER_GRACE_SECONDS = int(os.getenv("REMINDER_GRACE_SECONDS", "120"))
+    # on startup, deliver reminders missed during downtime (events not started yet), paced to RATE/second
+    REMINDER_CATCHUP = os.getenv("REMINDER_CATCHUP", "1").lower() not in ("0", "false", "no")
+    REMINDER_CATCHUP_BATCH = int(os.getenv("REMINDER_CATCHUP_BATCH", "500"))
+    REMINDER_CATCHUP_RATE = float(os.getenv("REMINDER_CATCHUP_RATE", "1000"))  # 0 = unpaced
+    REMINDER_CATCHUP_LOOKBACK_HOURS = int(os.getenv("REMINDER_CATCHUP_LOOKBACK_HOURS", "48"))
+    # ticket_sold / new_follower are merged per recipient+entity for this long (0 = deliver each one)
+    NOTIFY_COALESCE_WINDOW_SECONDS = int(os.getenv("NOTIFY_COALESCE_WINDOW_SECONDS", "300"))
+    NOTIFY_COALESCE_POLL_SECONDS = int(os.getenv("NOTIFY_COALESCE_POLL_SECONDS", "30"))
+    # push transport: fcm | fake (in-process, simulated latency/failures) | http (POST to PUSH_HTTP_URL)
+    PUSH_TRANSPORT = os.getenv("PUSH_TRANSPORT", "fcm")
+    PUSH_HTTP_URL = os.getenv("PUSH_HTTP_URL") or None
+    PUSH_HTTP_TIMEOUT = float(os.getenv("PUSH_HTTP_TIMEOUT", "10"))
+    PUSH_FAKE_LATENCY_MS = float(os.getenv("PUSH_FAKE_LATENCY_MS", "0"))
+    PUSH_FAKE_FAILURE_RATE = float(os.getenv("PUSH_FAKE_FAILURE_RATE", "0"))
+    PUSH_FAKE_DEAD_RATE = float(os.getenv("PUSH_FAKE_DEAD_RATE", "0"))
+    # push tokens the client hasn't re-registered in this many days are revoked
+    PUSH_TOKEN_STALE_DAYS = int(os.getenv("PUSH_TOKEN_STALE_DAYS", "60"))
+    PUSH_TOKEN_SWEEP_HOURS = int(os.getenv("PUSH_TOKEN_SWEEP_HOURS", "24"))
+
+    # GET /notifications/stream (SSE); a redis:// URL shares events across processes
+    NOTIFY_STREAM_URL = os.getenv("NOTIFY_STREAM_URL") or None
+    NOTIFY_STREAM_HEARTBEAT = int(os.getenv("NOTIFY_STREAM_HEARTBEAT", "15"))
+    NOTIFY_STREAM_MAX_SECONDS = int(os.getenv("NOTIFY_STREAM_MAX_SECONDS", "3600"))
+    NOTIFY_STREAM_QUEUE = int(os.getenv("NOTIFY_STREAM_QUEUE", "256"))
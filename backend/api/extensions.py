@@ -4,6 +4,7 @@ from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
+from .cache import response_cache
 
 try:
     # Optional: only needed if you want push notifications
@@ -30,6 +31,7 @@ def init_extensions(app):
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     jwt.init_app(app)
+    response_cache.init_app(app)
 
     # allow dev origins
     CORS(app, resources={r"/api/*": {"origins": "*"}})
@@ -2,7 +2,7 @@ from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..extensions import db
 from ..models import UserFollow, User
-from ..notifications.service import deliver_notification
+from ..notifications.digest import notify_coalesced
 
 bp = Blueprint("follows", __name__)
 
@@ -16,10 +16,10 @@ def follow(user_id):
     exists = UserFollow.query.filter_by(follower_id=me, following_id=user_id).first()
     if not exists:
         db.session.add(UserFollow(follower_id=me, following_id=user_id))
-        db.session.commit()
         u = db.session.get(User, me)
         name = getattr(u, "display_name", None) or getattr(u, "email", "Someone")
-        deliver_notification([user_id], "new_follower", f"{name} followed you", "", {"entity":"user","userId": me})
+        # follow + digest merge in one commit; one "X and N others followed you" per window
+        notify_coalesced(user_id, "new_follower", actor=name, data={"entity":"user","userId": me})
     return jsonify({"ok": True})
 
 @bp.delete("/<user_id>/follow")
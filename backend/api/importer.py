@@ -0,0 +1,259 @@
+"""
+Streaming bulk import of events, teams and tournaments from CSV or NDJSON.
+
+Records are read one at a time, validated into column dicts and inserted in
+chunks with a single executemany per chunk, each chunk in its own
+transaction. Bad rows are reported (line + message) and skipped; a chunk the
+database rejects is retried row by row under savepoints so only the offending
+rows are dropped. Memory stays bounded by the chunk size and the error cap.
+Used by `flask import` and POST /api/admin/v1/import/<kind>.
+"""
+import csv
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone
+from sqlalchemy.exc import DBAPIError
+from .cache import mark_changed
+from .extensions import db
+from .models import Event, Team, Tournament, User, gen_uuid
+from .utils.geo import grid_cell
+
+FORMATS = ("csv", "ndjson")
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 200
+
+
+class RowError(ValueError):
+    pass
+
+
+# ---------------- reading ----------------
+def iter_records(stream, fmt):
+    """Yield (line_no, record, error) from a text stream; record is None when the line can't be parsed."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for rec in reader:
+            yield reader.line_num, {k.strip(): v for k, v in rec.items() if k}, None
+    elif fmt == "ndjson":
+        for n, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError as e:
+                yield n, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(rec, dict):
+                yield n, None, "expected a JSON object"
+                continue
+            yield n, rec, None
+    else:
+        raise ValueError(f"unknown format {fmt!r} (expected csv or ndjson)")
+
+
+def text_stream(binary):
+    """Wrap a binary upload/request stream for line-by-line decoding."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+# ---------------- validation ----------------
+def _str(rec, key, required=False, max_len=None):
+    v = rec.get(key)
+    v = v.strip() if isinstance(v, str) else v
+    if v in (None, ""):
+        if required:
+            raise RowError(f"{key} required")
+        return None
+    v = str(v)
+    if max_len and len(v) > max_len:
+        raise RowError(f"{key} longer than {max_len} characters")
+    return v
+
+
+def _float(rec, key, lo, hi):
+    v = rec.get(key)
+    if v in (None, ""):
+        return None
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        raise RowError(f"{key} must be a number")
+    if not lo <= v <= hi:
+        raise RowError(f"{key} out of range")
+    return v
+
+
+def _datetime(rec, key, required=False):
+    v = rec.get(key)
+    if v in (None, ""):
+        if required:
+            raise RowError(f"{key} required (ISO 8601)")
+        return None
+    try:
+        dt = datetime.fromisoformat(str(v).strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise RowError(f"{key} is not an ISO 8601 datetime")
+    # stored naive UTC, like datetime.utcnow() elsewhere
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _date(rec, key):
+    v = rec.get(key)
+    if v in (None, ""):
+        return None
+    try:
+        return date.fromisoformat(str(v).strip())
+    except ValueError:
+        raise RowError(f"{key} is not an ISO date (YYYY-MM-DD)")
+
+
+def _event_row(rec, owner_id, now):
+    starts_at = _datetime(rec, "starts_at", required=True)
+    lat, lng = _float(rec, "lat", -90, 90), _float(rec, "lng", -180, 180)
+    return {
+        "id": gen_uuid(),
+        "title": _str(rec, "title", required=True, max_len=200),
+        "sport": _str(rec, "sport", max_len=80),
+        "status": _str(rec, "status", max_len=20) or "upcoming",
+        "city": _str(rec, "city", max_len=120),
+        "province": _str(rec, "province", max_len=120),
+        "venue": _str(rec, "venue", max_len=200),
+        "lat": lat,
+        "lng": lng,
+        "geo_cell": grid_cell(lat, lng),  # Core inserts skip the ORM listener
+        "starts_at": starts_at,
+        "ends_at": _datetime(rec, "ends_at") or starts_at,
+        "host_id": _str(rec, "host_id") or owner_id,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _team_row(rec, owner_id, now):
+    return {
+        "id": gen_uuid(),
+        "name": _str(rec, "name", required=True, max_len=200),
+        "short_name": _str(rec, "short_name", max_len=50),
+        "league": _str(rec, "league", max_len=120),
+        "sport": _str(rec, "sport", max_len=80),
+        "city": _str(rec, "city", max_len=120),
+        "province": _str(rec, "province", max_len=120),
+        "owner_id": _str(rec, "owner_id") or owner_id,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _tournament_row(rec, owner_id, now):
+    start, end = _date(rec, "start_date"), _date(rec, "end_date")
+    if start and end and end < start:
+        raise RowError("end_date before start_date")
+    return {
+        "id": gen_uuid(),
+        "name": _str(rec, "name", required=True, max_len=200),
+        "organizer": _str(rec, "organizer", max_len=200),
+        "level": _str(rec, "level", max_len=80),
+        "institution_type": _str(rec, "institution_type", max_len=80),
+        "city": _str(rec, "city", max_len=120),
+        "province": _str(rec, "province", max_len=120),
+        "start_date": start,
+        "end_date": end,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+# kind -> (model, row builder, user FK column or None)
+KINDS = {
+    "events": (Event, _event_row, "host_id"),
+    "teams": (Team, _team_row, "owner_id"),
+    "tournaments": (Tournament, _tournament_row, None),
+}
+
+
+class _UserCheck:
+    """Existence check for FK user ids, one query per distinct id."""
+
+    def __init__(self):
+        self.known = {}
+
+    def __call__(self, uid, user_col):
+        if uid not in self.known:
+            try:
+                uuid.UUID(str(uid))  # a malformed id would make Postgres reject the query (and the transaction)
+            except ValueError:
+                raise RowError(f"{user_col} is not a valid id")
+            self.known[uid] = db.session.query(User.id).filter(User.id == uid).first() is not None
+        return self.known[uid]
+
+
+# ---------------- writing ----------------
+def _flush(table, rows, lines, report):
+    """Insert one chunk in its own transaction; on failure, retry each row under a savepoint."""
+    try:
+        db.session.execute(table.insert(), rows)
+        mark_changed(db.session, table.name)
+        db.session.commit()
+        report["inserted"] += len(rows)
+        return
+    except DBAPIError:
+        db.session.rollback()
+    for line, row in zip(lines, rows):
+        try:
+            with db.session.begin_nested():
+                db.session.execute(table.insert(), [row])
+            report["inserted"] += 1
+        except DBAPIError as e:
+            _error(report, line, str(getattr(e, "orig", e)).splitlines()[0])
+    mark_changed(db.session, table.name)
+    db.session.commit()
+
+
+def _error(report, line, message):
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line, "error": message})
+    else:
+        report["errors_truncated"] = True
+
+
+def import_stream(kind, stream, fmt, owner_id=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Validate and insert every record of `stream` (text) into `kind`.
+    `owner_id` fills host_id/owner_id when a row doesn't name one.
+    Returns {"kind", "inserted", "failed", "errors": [{"line", "error"}], ...}.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"unknown kind {kind!r} (expected one of {', '.join(KINDS)})")
+    model, build, user_col = KINDS[kind]
+    table = model.__table__
+    user_exists = _UserCheck()
+    report = {"kind": kind, "format": fmt, "dry_run": dry_run, "inserted": 0, "valid": 0, "failed": 0, "errors": []}
+    rows, lines = [], []
+    now = datetime.utcnow()
+
+    for line, rec, err in iter_records(stream, fmt):
+        if err:
+            _error(report, line, err)
+            continue
+        try:
+            row = build(rec, owner_id, now)
+            if user_col:
+                if not row[user_col]:
+                    raise RowError(f"{user_col} required")
+                if not user_exists(row[user_col], user_col):
+                    raise RowError(f"{user_col} {row[user_col]} is not a user")
+        except RowError as e:
+            _error(report, line, str(e))
+            continue
+        report["valid"] += 1
+        if dry_run:
+            continue
+        rows.append(row); lines.append(line)
+        if len(rows) >= chunk_size:
+            _flush(table, rows, lines, report)
+            rows, lines = [], []
+    if rows:
+        _flush(table, rows, lines, report)
+    return report
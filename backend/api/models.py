@@ -1,8 +1,9 @@
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, event
 from .extensions import db
+from .utils.geo import grid_cell
 
 def gen_uuid() -> str:
     return str(uuid.uuid4())
@@ -20,6 +21,8 @@ class User(db.Model):
     sports = db.Column(db.JSON)  # list[str]
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # signed into calendar feed URLs; bumping it revokes every URL issued so far
+    calendar_token_version = db.Column(db.Integer, default=0, server_default="0", nullable=False)
 
 # password reset token
 class PasswordResetToken(db.Model):
@@ -42,6 +45,7 @@ class Team(db.Model):
     province = db.Column(db.String(120))
     owner_id = db.Column(UUID(as_uuid=False), db.ForeignKey("users.id"), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag source
     verified_at = db.Column(db.DateTime, nullable=True)
     rejected_at = db.Column(db.DateTime, nullable=True)
 
@@ -65,10 +69,27 @@ class Event(db.Model):
     venue = db.Column(db.String(200))
     lat = db.Column(db.Float)
     lng = db.Column(db.Float)
+    geo_cell = db.Column(db.Integer)  # utils.geo.grid_cell(lat, lng), kept in sync below
     starts_at = db.Column(db.DateTime, nullable=False)
     ends_at = db.Column(db.DateTime)
     host_id = db.Column(UUID(as_uuid=False), db.ForeignKey("users.id"), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag source
+    # composite indexes matched to the hot reads: status + starts_at range,
+    # optionally narrowed by city/province, ordered by (starts_at, id)
+    __table_args__ = (
+        db.Index("ix_events_starts_at_id", "starts_at", "id"),
+        db.Index("ix_events_status_starts_at", "status", "starts_at", "id"),
+        db.Index("ix_events_city_status_starts_at", "city", "status", "starts_at"),
+        db.Index("ix_events_province_status_starts_at", "province", "status", "starts_at"),
+        # covering: the nearby prune reads (id, lat, lng) straight from the index
+        db.Index("ix_events_geo_cell", "geo_cell", "lat", "lng", "id"),
+    )
+
+@event.listens_for(Event, "before_insert")
+@event.listens_for(Event, "before_update")
+def _event_geo_cell(mapper, connection, target):
+    target.geo_cell = grid_cell(target.lat, target.lng)
 
 
 # ----------------- Ticketing ------------------
@@ -98,13 +119,64 @@ class Reminder(db.Model):
     __tablename__ = "reminders"
     id = db.Column(UUID(as_uuid=False), primary_key=True, default=gen_uuid)
     user_id = db.Column(UUID(as_uuid=False), db.ForeignKey("users.id"), nullable=False)
-    event_id = db.Column(UUID(as_uuid=False), db.ForeignKey("events.id"), nullable=False)
+    # indexed: rescheduling an event touches all of its reminders
+    event_id = db.Column(UUID(as_uuid=False), db.ForeignKey("events.id"), nullable=False, index=True)
     method = db.Column(db.String(20), default="push")  # push|email|sms
     # NEW: send reminder X minutes before event start; fire-once tracking
     offset_minutes = db.Column(db.Integer, nullable=False, default=15)
     delivered_at   = db.Column(db.DateTime, nullable=True)
+    # events.starts_at - offset_minutes (naive UTC), kept by the listeners below
+    fire_at = db.Column(db.DateTime, nullable=True)
+    # claim lease: the worker delivering it (reminders/scheduler.py claim_due)
+    claimed_by = db.Column(db.String(120), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    __table_args__ = (UniqueConstraint('user_id', 'event_id', name='uq_user_event_reminder'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'event_id', name='uq_user_event_reminder'),
+        # due-window lookup: only undelivered reminders are in the index
+        db.Index("ix_reminders_pending_fire_at", "fire_at",
+                 postgresql_where=db.text("delivered_at IS NULL"), sqlite_where=db.text("delivered_at IS NULL")),
+    )
+
+def reminder_fire_at(starts_at, offset_minutes):
+    if starts_at is None:
+        return None
+    if starts_at.tzinfo is not None:
+        starts_at = starts_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return starts_at - timedelta(minutes=15 if offset_minutes is None else offset_minutes)
+
+@event.listens_for(Reminder, "before_insert")
+@event.listens_for(Reminder, "before_update")
+def _reminder_fire_at(mapper, connection, target):
+    attrs = db.inspect(target).attrs
+    if target.fire_at is not None and not (
+            attrs.event_id.history.has_changes() or attrs.offset_minutes.history.has_changes()):
+        return
+    starts_at = connection.execute(
+        db.select(Event.starts_at).where(Event.id == target.event_id)).scalar()
+    target.fire_at = reminder_fire_at(starts_at, target.offset_minutes)
+
+@event.listens_for(Event, "after_update")
+def _event_reschedule_reminders(mapper, connection, target):
+    hist = db.inspect(target).attrs.starts_at.history
+    if not hist.has_changes():
+        return
+    R = Reminder.__table__
+    pending = db.and_(R.c.event_id == target.id, R.c.delivered_at.is_(None))
+    # one UPDATE per distinct offset (usually one or two) instead of per reminder
+    offsets = connection.execute(db.select(R.c.offset_minutes).where(pending).distinct()).scalars().all()
+    for off in offsets:
+        connection.execute(R.update().where(pending, R.c.offset_minutes == off)
+                           .values(fire_at=reminder_fire_at(target.starts_at, off)))
+
+
+# Named leader leases (utils/lease.py), e.g. "reminders" for the reminder
+# scheduler: one holder at a time, renewed before expires_at
+class SchedulerLease(db.Model):
+    __tablename__ = "scheduler_leases"
+    name = db.Column(db.String(64), primary_key=True)
+    holder = db.Column(db.String(120), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
 
 # ----------------- Tournament -----------------
 class Tournament(db.Model):
@@ -119,6 +191,7 @@ class Tournament(db.Model):
     start_date = db.Column(db.Date)
     end_date = db.Column(db.Date)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag source
 
 class Registration(db.Model):
     __tablename__ = "registrations"
@@ -140,6 +213,85 @@ class Notification(db.Model):
     data_json = db.Column(db.JSON, nullable=True)         # deep-link payload: {"entity":"event","eventId": "..."}
     read_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    __table_args__ = (
+        # inbox: newest first per user; partial index for the unread filter
+        db.Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+        db.Index("ix_notifications_user_unread", "user_id", "created_at", "id",
+                 postgresql_where=db.text("read_at IS NULL"), sqlite_where=db.text("read_at IS NULL")),
+        # retention sweep: read rows by age
+        db.Index("ix_notifications_read_created", "created_at",
+                 postgresql_where=db.text("read_at IS NOT NULL"), sqlite_where=db.text("read_at IS NOT NULL")),
+    )
+
+# Read notifications past NOTIFY_RETENTION_DAYS, moved out by notifications/retention.py
+class NotificationArchive(db.Model):
+    __tablename__ = "notifications_archive"
+    id = db.Column(UUID(as_uuid=False), primary_key=True)
+    user_id = db.Column(UUID(as_uuid=False), index=True, nullable=False)
+    type = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=True)
+    data_json = db.Column(db.JSON, nullable=True)
+    read_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+# Unread badge count per user, kept in step with notifications by
+# notifications/counters.py and reconciled periodically
+class NotificationCounter(db.Model):
+    __tablename__ = "notification_counters"
+    user_id = db.Column(UUID(as_uuid=False), db.ForeignKey("users.id"), primary_key=True)
+    unread = db.Column(db.Integer, nullable=False, default=0)
+
+# Opt-outs per notification type ("*" = all) and channel (in_app|push);
+# no row means enabled. Enforced in SQL by notifications/preferences.py
+class NotificationPreference(db.Model):
+    __tablename__ = "notification_preferences"
+    user_id = db.Column(UUID(as_uuid=False), db.ForeignKey("users.id"), primary_key=True)
+    type = db.Column(db.String(50), primary_key=True)
+    channel = db.Column(db.String(20), primary_key=True)
+    enabled = db.Column(db.Boolean, nullable=False, default=True)
+
+# Pending coalesced notifications (ticket_sold, new_follower), one row per
+# recipient/type/entity per window; flushed by notifications/digest.py
+class NotificationDigest(db.Model):
+    __tablename__ = "notification_digests"
+    user_id = db.Column(UUID(as_uuid=False), db.ForeignKey("users.id"), primary_key=True)
+    type = db.Column(db.String(50), primary_key=True)
+    entity = db.Column(db.String(120), primary_key=True, default="")  # e.g. "event:<id>"; "" when per user
+    count = db.Column(db.Integer, nullable=False, default=0)           # summed quantity (tickets, follows)
+    events = db.Column(db.Integer, nullable=False, default=0)          # occurrences merged
+    subject = db.Column(db.String(200), nullable=False, default="")   # e.g. event title
+    actor = db.Column(db.String(200), nullable=False, default="")     # latest actor name
+    data_json = db.Column(db.JSON, nullable=True)
+    first_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    flush_at = db.Column(db.DateTime, nullable=False, index=True)
+
+# Push deliveries waiting to be sent; written in the same transaction as the
+# Notification rows and drained by notifications/outbox.py
+class NotificationOutbox(db.Model):
+    __tablename__ = "notification_outbox"
+    id = db.Column(UUID(as_uuid=False), primary_key=True, default=gen_uuid)
+    type = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=True)
+    data_json = db.Column(db.JSON, nullable=True)
+    user_ids = db.Column(db.JSON, nullable=False)         # recipients (list[str])
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending|sending|sent|failed|skipped
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claimed_by = db.Column(db.String(64), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    # fan-out rows: notify every follower of this user instead of user_ids (notifications/fanout.py);
+    # fanout_after is the last follower id already written, so a re-claimed row resumes there
+    fanout_of = db.Column(UUID(as_uuid=False), nullable=True)
+    fanout_after = db.Column(UUID(as_uuid=False), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    __table_args__ = (
+        db.Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
 
 # ----------------- Push tokens ----------------
 class PushToken(db.Model):
@@ -150,6 +302,12 @@ class PushToken(db.Model):
     platform = db.Column(db.String(20), nullable=True)    # web|android|ios
     revoked_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # last re-registration by the client
+    __table_args__ = (
+        # live tokens: per-platform counts and the stale-token sweep
+        db.Index("ix_push_tokens_live", "platform", "refreshed_at",
+                 postgresql_where=db.text("revoked_at IS NULL"), sqlite_where=db.text("revoked_at IS NULL")),
+    )
 
 # ---------------- User↔User follow -------------
 class UserFollow(db.Model):
@@ -157,6 +315,8 @@ class UserFollow(db.Model):
     follower_id  = db.Column(UUID(as_uuid=False), db.ForeignKey("users.id"), primary_key=True)
     following_id = db.Column(UUID(as_uuid=False), db.ForeignKey("users.id"), primary_key=True)
     created_at   = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # followers of a user, walked in follower_id order by the fan-out
+    __table_args__ = (db.Index("ix_user_follows_following_follower", "following_id", "follower_id"),)
 
 # --------------- Social identities -------------
 class SocialIdentity(db.Model):
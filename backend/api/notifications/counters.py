@@ -0,0 +1,71 @@
+"""
+Per-user unread counters behind GET /notifications/badge.
+
+Every path that creates or reads notifications adjusts the counter in the same
+transaction (an upsert, so the row appears on first use), which makes the
+badge a primary-key read. reconcile() recomputes the counters from the
+notifications table to repair any drift (rows deleted directly, races with
+the retention job, ...); it runs on the scheduler and as `flask reconcile-counters`.
+"""
+from collections import Counter
+from sqlalchemy import func, select
+from ..extensions import db, scheduler
+from ..models import Notification, NotificationCounter
+from ..utils.sql import upsert
+
+
+def bump_unread(deltas):
+    """Apply {user_id: delta} to the unread counters (no commit)."""
+    rows = [{"user_id": uid, "unread": d} for uid, d in dict(deltas).items() if d]
+    upsert(NotificationCounter.__table__, rows, key=("user_id",), increment=("unread",))
+
+
+def added(user_ids):
+    bump_unread(Counter(user_ids))
+
+
+def unread_count(user_id) -> int:
+    row = db.session.get(NotificationCounter, user_id)
+    return max(0, row.unread) if row else 0
+
+
+def reconcile():
+    """
+    Rewrite counters that disagree with the notifications table. Returns (fixed, created).
+    Each fix is a compare-and-set on the value read alongside the count, so a
+    bump committed in between makes it a no-op (left for the next run)
+    instead of being overwritten.
+    """
+    N, C = Notification.__table__, NotificationCounter.__table__
+    actual = (select(func.count()).select_from(N)
+              .where(N.c.user_id == C.c.user_id, N.c.read_at.is_(None)).scalar_subquery())
+    drift = db.session.execute(select(C.c.user_id, C.c.unread, actual).where(C.c.unread != actual)).all()
+    fixed = 0
+    for uid, seen, want in drift:
+        fixed += db.session.execute(
+            C.update().where(C.c.user_id == uid, C.c.unread == seen).values(unread=want)).rowcount
+    missing = db.session.execute(
+        select(N.c.user_id, func.count()).where(N.c.read_at.is_(None), N.c.user_id.not_in(select(C.c.user_id)))
+        .group_by(N.c.user_id)).all()
+    # do-nothing on conflict: a counter created concurrently already carries its own deltas
+    upsert(C, [{"user_id": uid, "unread": n} for uid, n in missing], key=("user_id",))
+    db.session.commit()
+    return fixed, len(missing)
+
+
+def register_counter_job(app):
+    def _run_reconcile():
+        with app.app_context():
+            fixed, created = reconcile()
+            if fixed or created:
+                app.logger.info(f"notification counters reconciled: fixed {fixed}, created {created}")
+
+    scheduler.add_job(
+        _run_reconcile,
+        "interval",
+        minutes=int(app.config.get("COUNTER_RECONCILE_MINUTES", 60)),
+        id="notification_counters_reconcile",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
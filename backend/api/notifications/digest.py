@@ -0,0 +1,138 @@
+"""
+Coalescing for high-frequency notification types (ticket_sold, new_follower).
+
+The first occurrence in a quiet period is delivered straight away and opens
+a window: an empty row in notification_digests keyed on (user_id, type,
+entity). Follow-ups inside the window are upserted into that row, adding to
+its count. When the window (NOTIFY_COALESCE_WINDOW_SECONDS) has passed,
+flush_due() renders the follow-ups through the type's template ("37 tickets
+sold for Finals") and delivers ONE notification and ONE push via
+deliver_notification, keeping the window open once more; a window that
+closes with nothing merged is dropped, so the next occurrence is immediate
+again. A busy host therefore gets at most one row and one push per (entity,
+window) no matter how many purchases/follows happened, and a lone follow
+isn't held back.
+
+flush_due() subtracts what it rendered rather than deleting blindly, so a
+merge that lands while a flush is running rolls into the next window.
+"""
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, bindparam, select
+from ..extensions import db, scheduler
+from ..models import NotificationDigest
+from ..utils.sql import insert_ignore, upsert
+from .service import deliver_notification
+
+
+def _plural(n, word):
+    return f"{n} {word}" if n == 1 else f"{n} {word}s"
+
+
+def _ticket_sold(d):
+    return "Tickets sold", f"{_plural(d['count'], 'ticket')} sold for {d['subject']}", d["data"]
+
+
+def _new_follower(d):
+    if d["events"] == 1:
+        return f"{d['actor']} followed you", "", d["data"]
+    others = d["events"] - 1
+    return f"{d['actor']} and {_plural(others, 'other')} followed you", "", {"entity": "followers"}
+
+
+# type -> render(digest) -> (title, body, data); digest has count, events, subject, actor, data
+TEMPLATES = {
+    "ticket_sold": _ticket_sold,
+    "new_follower": _new_follower,
+}
+
+
+def _window():
+    return int(current_app.config.get("NOTIFY_COALESCE_WINDOW_SECONDS", 300))
+
+
+def _render(type_, d):
+    render = TEMPLATES.get(type_)
+    if render is None:
+        return d["subject"] or type_, "", d["data"]
+    return render(d)
+
+
+def notify_coalesced(user_id, type_, entity="", subject="", actor="", count=1, data=None, commit=True):
+    """
+    Deliver one occurrence now if no window is open for (user_id, type,
+    entity), opening one; otherwise merge it into that window's digest. With
+    the window set to 0 every occurrence is delivered straight away.
+    """
+    if not user_id:
+        return
+    data = data or {}
+    window = _window()
+    now = datetime.utcnow()
+    row = {"user_id": str(user_id), "type": type_, "entity": entity or "", "subject": (subject or "")[:200],
+           "actor": (actor or "")[:200], "data_json": data, "first_at": now, "flush_at": now + timedelta(seconds=window)}
+    # leading edge: whoever opens the window (an empty digest row) delivers right away
+    if window <= 0 or insert_ignore(NotificationDigest.__table__, {**row, "count": 0, "events": 0}):
+        title, body, data = _render(type_, {"count": count, "events": 1, "subject": subject, "actor": actor, "data": data})
+        deliver_notification([user_id], type_, title, body, data, commit=commit)
+        return
+    upsert(NotificationDigest.__table__, [{**row, "count": count, "events": 1}], key=("user_id", "type", "entity"),
+           increment=("count", "events"), replace=("subject", "actor", "data_json"))
+    if commit:
+        db.session.commit()
+
+
+def flush_due(limit=500):
+    """
+    Deliver every digest whose window has closed, `limit` per transaction, and
+    drop windows that closed with nothing merged. Returns notifications sent.
+    """
+    D = NotificationDigest.__table__
+    sent = 0
+    while True:
+        now = datetime.utcnow()
+        due = select(D).where(D.c.flush_at <= now).order_by(D.c.flush_at).limit(limit)
+        if db.session.get_bind().dialect.name == "postgresql":
+            due = due.with_for_update(skip_locked=True)  # concurrent flushers take disjoint rows
+        due_rows = db.session.execute(due).mappings().all()
+        if not due_rows:
+            db.session.rollback()
+            return sent
+        rows = [r for r in due_rows if r["events"] > 0]
+        for r in rows:
+            title, body, data = _render(r["type"], {"count": r["count"], "events": r["events"], "subject": r["subject"],
+                                                    "actor": r["actor"], "data": r["data_json"] or {}})
+            deliver_notification([r["user_id"]], r["type"], title, body, data, commit=False)
+        key = and_(D.c.user_id == bindparam("k_user"), D.c.type == bindparam("k_type"), D.c.entity == bindparam("k_entity"))
+        # take off what was delivered; anything merged since starts a fresh window
+        if rows:
+            db.session.execute(
+                D.update().where(key).values(count=D.c.count - bindparam("seen_count"), events=D.c.events - bindparam("seen_events"),
+                                             first_at=now, flush_at=now + timedelta(seconds=_window())),
+                [{"k_user": r["user_id"], "k_type": r["type"], "k_entity": r["entity"],
+                  "seen_count": r["count"], "seen_events": r["events"]} for r in rows],
+            )
+        # quiet windows close; flushed rows were just given a new flush_at so they stay open
+        db.session.execute(D.delete().where(D.c.flush_at <= now, D.c.events <= 0))
+        db.session.commit()
+        sent += len(rows)
+        if len(due_rows) < limit:
+            return sent
+
+
+def register_digest_job(app):
+    def _run_flush():
+        with app.app_context():
+            n = flush_due()
+            if n:
+                app.logger.info(f"notification digests flushed: {n}")
+
+    scheduler.add_job(
+        _run_flush,
+        "interval",
+        seconds=int(app.config.get("NOTIFY_COALESCE_POLL_SECONDS", 30)),
+        id="notification_digests",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
@@ -0,0 +1,250 @@
+"""
+Transactional outbox for push delivery.
+
+deliver_notification() writes a NotificationOutbox row next to the
+Notification rows, in the caller's transaction, and returns without touching
+FCM. Rows are drained here, either by the in-process scheduler job
+(NOTIFY_DELIVERY=scheduler, the default) or by `flask notify-worker`
+processes (NOTIFY_DELIVERY=worker):
+
+1. claim a batch: FOR UPDATE SKIP LOCKED on Postgres, so workers never wait
+   on each other; elsewhere a single UPDATE ... WHERE id IN (subquery) tagged
+   with a claim token (SQLite serializes writers, so claims can't overlap)
+2. look up tokens and send through a thread pool
+3. record the outcome: sent, or attempts + 1 with exponential backoff until
+   NOTIFY_MAX_ATTEMPTS, then failed; tokens FCM reported dead are revoked in
+   the same commit. Each outcome UPDATE is guarded by our claim, so a worker
+   whose lease expired can't overwrite a row another worker re-claimed.
+
+Fan-out rows (fanout_of set, see fanout.queue_fan_out) are expanded instead
+of sent: the followers' notifications and push rows are written chunk by
+chunk, each chunk also moving the row's fanout_after mark and renewing the
+claim, so a re-claimed row resumes where the last worker stopped.
+
+A claim older than NOTIFY_CLAIM_LEASE_SECONDS is treated as abandoned (crashed
+worker) and can be claimed again. Finished rows are purged after
+NOTIFY_OUTBOX_RETENTION_DAYS by the retention job (retention.py).
+"""
+import os
+import random
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, bindparam, or_, select, update
+from ..extensions import db, scheduler
+from ..models import NotificationOutbox, PushToken
+from ..push.tokens import revoke_tokens
+from .preferences import allowed
+
+
+def enqueue(user_ids, type_, title, body=None, data=None):
+    """Queue a push for `user_ids` in the current session (no commit)."""
+    row = NotificationOutbox(user_ids=list(user_ids), type=type_, title=title, body=body or "",
+                             data_json=data or {}, status="pending", attempts=0,
+                             next_attempt_at=datetime.utcnow())
+    db.session.add(row)
+    return row
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _claimable(now, lease):
+    O = NotificationOutbox
+    return or_(
+        and_(O.status == "pending", O.next_attempt_at <= now),
+        and_(O.status == "sending", O.claimed_at < now - timedelta(seconds=lease)),
+    )
+
+
+def claim_batch(claim_token, limit):
+    """Mark up to `limit` due rows as ours and return them (committed)."""
+    O = NotificationOutbox
+    cfg = current_app.config
+    now = datetime.utcnow()
+    lease = int(cfg.get("NOTIFY_CLAIM_LEASE_SECONDS", 300))
+    due = select(O.id).where(_claimable(now, lease)).order_by(O.next_attempt_at).limit(limit)
+    if db.session.get_bind().dialect.name == "postgresql":
+        ids = [r[0] for r in db.session.execute(due.with_for_update(skip_locked=True))]
+        if not ids:
+            db.session.rollback()
+            return []
+        where = O.id.in_(ids)
+    else:
+        where = and_(O.id.in_(due), _claimable(now, lease))
+    db.session.execute(
+        update(O).where(where)
+        .values(status="sending", claimed_by=claim_token, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return O.query.filter(O.claimed_by == claim_token, O.status == "sending").all()
+
+
+def _tokens_for(user_ids, type_=None):
+    q = db.session.query(PushToken.token)\
+        .filter(PushToken.user_id.in_(user_ids), PushToken.revoked_at.is_(None))
+    if type_:
+        q = q.filter(allowed(PushToken.user_id, type_, "push"))  # push muted for this type
+    return [t[0] for t in q]
+
+
+def _backoff(attempts):
+    cfg = current_app.config
+    base = float(cfg.get("NOTIFY_BACKOFF_SECONDS", 30))
+    delay = min(base * (2 ** (attempts - 1)), float(cfg.get("NOTIFY_BACKOFF_MAX_SECONDS", 3600)))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _record(outcomes, claim_token):
+    """
+    Write [(row, values)] outcomes, each only if the row is still claimed by
+    `claim_token` (the claim may have expired and been taken over meanwhile).
+    No commit. Returns how many rows were ours.
+    """
+    if not outcomes:
+        return 0
+    O = NotificationOutbox.__table__
+    keys = ("status", "attempts", "last_error", "sent_at", "next_attempt_at")
+    stmt = O.update().where(O.c.id == bindparam("_id"), O.c.claimed_by == bindparam("_token"),
+                            O.c.status == "sending")\
+        .values(claimed_by=None, claimed_at=None, **{k: bindparam(f"_{k}") for k in keys})
+    params = [{"_id": row.id, "_token": claim_token, **{f"_{k}": values.get(k, getattr(row, k)) for k in keys}}
+              for row, values in outcomes]
+    result = db.session.execute(stmt, params)
+    return result.rowcount if db.session.get_bind().dialect.supports_sane_multi_rowcount else len(params)
+
+
+def process_batch(rows, pool, claim_token):
+    """Send claimed push rows concurrently (outcomes in one commit), then expand claimed fan-out rows."""
+    fanouts = [row for row in rows if row.fanout_of]
+    pushes = [row for row in rows if not row.fanout_of]
+    stats = _send(pushes, pool, claim_token) if pushes else {}
+    for k, v in (_expand(fanouts, claim_token) if fanouts else {}).items():
+        stats[k] = stats.get(k, 0) + v
+    return stats
+
+
+def _outcome(attempts, err):
+    """(values, stat key) for a delivery attempt that ended with `err` (None = success)."""
+    now = datetime.utcnow()
+    if err is None:
+        return {"status": "sent", "sent_at": now, "last_error": None, "attempts": attempts}, "sent"
+    if attempts >= int(current_app.config.get("NOTIFY_MAX_ATTEMPTS", 5)):
+        return {"status": "failed", "last_error": err[:2000], "attempts": attempts}, "failed"
+    return {"status": "pending", "last_error": err[:2000], "attempts": attempts,
+            "next_attempt_at": now + _backoff(attempts)}, "retry"
+
+
+def _expand(rows, claim_token):
+    """Run each claimed fan-out row, resuming after its fanout_after mark."""
+    from .fanout import fan_out
+    O = NotificationOutbox.__table__
+    stats = {"fanouts": 0, "fanout_recipients": 0}
+    for row in rows:
+        row_id, attempts = row.id, (row.attempts or 0) + 1
+        args = (row.fanout_of, row.type, row.title, row.body, row.data_json)
+
+        def progress(last, row_id=row_id):
+            # in the chunk's transaction: the mark moves with the rows it covers, and the claim is renewed
+            return db.session.execute(
+                O.update().where(O.c.id == row_id, O.c.claimed_by == claim_token, O.c.status == "sending")
+                .values(fanout_after=last, claimed_at=datetime.utcnow())).rowcount == 1
+
+        try:
+            result = fan_out(*args, after=row.fanout_after, progress=progress)
+            err = None
+        except Exception as e:
+            db.session.rollback()
+            result, err = {}, str(e) or type(e).__name__
+        stats["fanout_recipients"] += result.get("recipients", 0)
+        values, key = _outcome(attempts, err)
+        if result.get("stopped") or not _record([(row, values)], claim_token):
+            key = "lost_claim"  # re-claimed meanwhile; the new owner resumes from fanout_after
+        db.session.commit()
+        key = "fanouts" if key == "sent" else key
+        stats[key] = stats.get(key, 0) + 1
+    return stats
+
+
+def _send(rows, pool, claim_token):
+    from .service import send_push, push_enabled
+
+    if not push_enabled():
+        now = datetime.utcnow()
+        _record([(row, {"status": "skipped", "last_error": "push not configured", "sent_at": now}) for row in rows],
+                claim_token)
+        db.session.commit()
+        return {"sent": 0, "failed": 0, "skipped": len(rows)}
+
+    # DB reads stay on this thread; the pool only does network I/O
+    jobs = [(row, _tokens_for(row.user_ids or [], row.type)) for row in rows]
+    app = current_app._get_current_object()
+
+    def send(job):
+        row, tokens = job
+        try:
+            with app.app_context():
+                _, _, dead = send_push(tokens, row.title, row.body, row.data_json)
+            return None, dead
+        except Exception as e:
+            return str(e) or type(e).__name__, getattr(e, "dead_tokens", ())
+
+    results = list(pool.map(send, jobs))
+    errors = [err for err, _ in results]
+    now = datetime.utcnow()
+    stats = {"sent": 0, "failed": 0, "retry": 0}
+    outcomes = []
+    for (row, _), err in zip(jobs, errors):
+        values, key = _outcome((row.attempts or 0) + 1, err)
+        stats[key] += 1
+        outcomes.append((row, values))
+    lost = len(outcomes) - _record(outcomes, claim_token)
+    if lost:
+        stats["lost_claim"] = lost
+        current_app.logger.warning(f"notification outbox: {lost} rows were re-claimed before their outcome was recorded")
+    dead = [t for _, tokens in results for t in tokens]
+    if dead:
+        stats["revoked"] = revoke_tokens(dead, now)
+    db.session.commit()
+    return stats
+
+
+def drain(batch_size=100, threads=8, claim_token=None, max_batches=None):
+    """Claim and send until nothing is due (or max_batches). Returns totals."""
+    claim_token = claim_token or worker_id()
+    totals = {"sent": 0, "failed": 0, "retry": 0, "skipped": 0, "revoked": 0, "lost_claim": 0,
+              "fanouts": 0, "fanout_recipients": 0}
+    batches = 0
+    with ThreadPoolExecutor(threads, thread_name_prefix="notify") as pool:
+        while max_batches is None or batches < max_batches:
+            rows = claim_batch(claim_token, batch_size)
+            if not rows:
+                break
+            for k, v in process_batch(rows, pool, claim_token).items():
+                totals[k] += v
+            batches += 1
+    return totals
+
+
+def register_outbox_job(app):
+    if app.config.get("NOTIFY_DELIVERY", "scheduler") != "scheduler":
+        return  # drained by `flask notify-worker`
+
+    def _run_drain():
+        with app.app_context():
+            drain(batch_size=int(app.config.get("NOTIFY_BATCH_SIZE", 100)),
+                  threads=int(app.config.get("NOTIFY_THREADS", 8)))
+
+    scheduler.add_job(
+        _run_drain,
+        "interval",
+        seconds=int(app.config.get("NOTIFY_POLL_SECONDS", 5)),
+        id="notification_outbox",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
@@ -0,0 +1,55 @@
+"""
+Per-user notification preferences (type x channel).
+
+Rows only record a choice; no row means enabled. Channels:
+- in_app: the notification itself. Muting it drops the type entirely (no
+  row, no badge, no push).
+- push: only the push; the in-app notification is still written.
+type "*" applies to every type.
+
+Filters are SQL (NOT EXISTS against the primary key), applied inside the
+fan-out follower query and the outbox token lookup, so muted recipients are
+never loaded into Python.
+"""
+from sqlalchemy import exists
+from ..extensions import db
+from ..models import NotificationPreference
+from ..utils.sql import upsert
+
+CHANNELS = ("in_app", "push")
+ALL_TYPES = "*"
+
+
+def muted(user_col, type_, channel):
+    """SQL predicate: the user in `user_col` turned `channel` off for `type_`."""
+    P = NotificationPreference
+    return exists().where(P.user_id == user_col, P.type.in_((type_, ALL_TYPES)),
+                          P.channel == channel, P.enabled.is_(False))
+
+
+def allowed(user_col, type_, channel="in_app"):
+    return ~muted(user_col, type_, channel)
+
+
+def without_muted(user_ids, type_, channel="in_app"):
+    """Drop users who muted `type_` on `channel`; one query for the whole list."""
+    P = NotificationPreference
+    user_ids = list(user_ids)
+    if not user_ids:
+        return user_ids
+    off = {r[0] for r in db.session.query(P.user_id).filter(
+        P.user_id.in_(user_ids), P.type.in_((type_, ALL_TYPES)), P.channel == channel, P.enabled.is_(False))}
+    return [u for u in user_ids if u not in off] if off else user_ids
+
+
+def preferences_for(user_id):
+    P = NotificationPreference
+    rows = P.query.filter_by(user_id=user_id).order_by(P.type, P.channel).all()
+    return [{"type": r.type, "channel": r.channel, "enabled": r.enabled} for r in rows]
+
+
+def set_preferences(user_id, prefs):
+    """Upsert [{"type", "channel", "enabled"}] for `user_id` (no commit)."""
+    upsert(NotificationPreference.__table__, [
+        {"user_id": user_id, "type": p["type"], "channel": p["channel"], "enabled": bool(p["enabled"])} for p in prefs
+    ], key=("user_id", "type", "channel"), replace=("enabled",))
@@ -0,0 +1,101 @@
+"""
+Move read notifications older than NOTIFY_RETENTION_DAYS into
+notifications_archive, a small batch per transaction, so the inbox table
+(and its indexes) only holds recent and unread rows. The same job deletes
+finished push outbox rows (sent/skipped/failed) older than
+NOTIFY_OUTBOX_RETENTION_DAYS, so outbox claims keep scanning a small table.
+Runs daily on the scheduler and as `flask archive-notifications`.
+"""
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import literal, select
+from ..extensions import db, scheduler
+from ..models import Notification, NotificationArchive, NotificationOutbox
+
+COLUMNS = ("id", "user_id", "type", "title", "body", "data_json", "read_at", "created_at")
+FINISHED = ("sent", "skipped", "failed")  # outbox rows nothing will touch again
+
+
+def archive_batch(cutoff, batch_size):
+    """Archive up to batch_size read rows created before `cutoff`; one transaction. Returns rows moved."""
+    N, A = Notification.__table__, NotificationArchive.__table__
+    ids = [r[0] for r in db.session.execute(
+        select(N.c.id).where(N.c.read_at.is_not(None), N.c.created_at < cutoff)
+        .order_by(N.c.created_at).limit(batch_size)
+    )]
+    if not ids:
+        db.session.rollback()
+        return 0
+    now = datetime.utcnow()
+    db.session.execute(A.insert().from_select(
+        [*COLUMNS, "archived_at"],
+        select(*[N.c[c] for c in COLUMNS], literal(now, A.c.archived_at.type)).where(N.c.id.in_(ids)),
+    ))
+    moved = db.session.execute(N.delete().where(N.c.id.in_(ids))).rowcount
+    db.session.commit()
+    return moved
+
+
+def archive_old(days=None, batch_size=None, max_batches=None, pause=0.0):
+    """Run batches until nothing is left (or max_batches). Returns {"moved", "batches", "seconds"}."""
+    cfg = current_app.config
+    days = int(days if days is not None else cfg.get("NOTIFY_RETENTION_DAYS", 90))
+    batch_size = int(batch_size or cfg.get("NOTIFY_RETENTION_BATCH", 1000))
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    t0 = time.perf_counter()
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        tb = time.perf_counter()
+        n = archive_batch(cutoff, batch_size)
+        if not n:
+            break
+        moved += n
+        batches += 1
+        current_app.logger.info(f"notifications archived: batch {batches}, {n} rows in {(time.perf_counter() - tb) * 1000:.0f}ms")
+        if n < batch_size:
+            break
+        if pause:
+            time.sleep(pause)  # let other writers in between batches
+    stats = {"moved": moved, "batches": batches, "seconds": round(time.perf_counter() - t0, 3)}
+    current_app.logger.info(f"notification retention ({days}d): {stats}")
+    return stats
+
+
+def purge_outbox(days=None, batch_size=None, pause=0.0):
+    """Delete finished outbox rows created before the cutoff, one batch per transaction. Returns rows deleted."""
+    cfg = current_app.config
+    days = int(days if days is not None else cfg.get("NOTIFY_OUTBOX_RETENTION_DAYS", 7))
+    batch_size = int(batch_size or cfg.get("NOTIFY_RETENTION_BATCH", 1000))
+    O = NotificationOutbox.__table__
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = 0
+    while True:
+        ids = select(O.c.id).where(O.c.status.in_(FINISHED), O.c.created_at < cutoff).limit(batch_size)
+        n = db.session.execute(O.delete().where(O.c.id.in_(ids))).rowcount
+        db.session.commit()
+        deleted += n
+        if n < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    if deleted:
+        current_app.logger.info(f"notification outbox purge ({days}d): {deleted} rows")
+    return deleted
+
+
+def register_retention_job(app):
+    def _run_archive():
+        with app.app_context():
+            archive_old(pause=0.05)
+            purge_outbox(pause=0.05)
+
+    scheduler.add_job(
+        _run_archive,
+        "interval",
+        hours=int(app.config.get("NOTIFY_RETENTION_INTERVAL_HOURS", 24)),
+        id="notification_retention",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
@@ -1,42 +1,67 @@
-from flask import Blueprint, request, jsonify
+import json
+import queue
+import time
+from flask import Blueprint, request, jsonify, current_app, Response, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_, or_, tuple_, literal
 from ..extensions import db
 from ..models import Notification
+from .counters import bump_unread, unread_count
+from .stream import notification_broker
+from .preferences import CHANNELS, preferences_for, set_preferences
+from ..utils.pagination import keyset_page, page_size, wants_total, CursorError, decode_cursor
 
 bp = Blueprint("notifications", __name__)
 
+READ_ALL_BATCH = 1000  # rows marked read per transaction by /read-all
+
+def _note(n):
+    return {
+        "id": n.id,
+        "type": n.type,
+        "title": n.title,
+        "body": n.body,
+        "data": n.data_json,
+        "read_at": n.read_at.isoformat() if n.read_at else None,
+        "created_at": n.created_at.isoformat(),
+    }
+
 @bp.get("/")
 @jwt_required()
 def list_notifications():
     uid = get_jwt_identity()
     unread_only = request.args.get("unread") == "true"
-    page = int(request.args.get("page", 1))
-    limit = min(int(request.args.get("limit", 20)), 100)
+    try:
+        limit = page_size(request.args.get("limit"))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
 
     q = Notification.query.filter_by(user_id=uid)
     if unread_only:
         q = q.filter(Notification.read_at.is_(None))
-    q = q.order_by(Notification.created_at.desc())
 
-    items = q.paginate(page=page, per_page=limit, error_out=False)
-    data = [{
-        "id": n.id,
-        "type": n.type,
-        "title": n.title,
-        "body": n.body,
-        "data": n.data_json,
-        "read_at": n.read_at.isoformat() if n.read_at else None,
-        "created_at": n.created_at.isoformat(),
-    } for n in items.items]
+    if "cursor" in request.args:
+        # keyset mode: ?cursor= (empty for the first page), newest first on (created_at, id)
+        try:
+            rows, next_cursor = keyset_page(q, Notification.created_at, Notification.id,
+                                            request.args.get("cursor"), limit, descending=True)
+        except CursorError as e:
+            return jsonify({"error": str(e)}), 400
+        body = {"items": [_note(n) for n in rows], "limit": limit, "next_cursor": next_cursor}
+        if wants_total(request.args):
+            body["total"] = q.order_by(None).count()
+        return jsonify(body)
 
-    return jsonify({"items": data, "page": page, "total": items.total})
+    page = int(request.args.get("page", 1))
+    q = q.order_by(Notification.created_at.desc(), Notification.id.desc())
+    items = q.paginate(page=page, per_page=limit, error_out=False)
+    return jsonify({"items": [_note(n) for n in items.items], "page": page, "total": items.total})
 
 @bp.get("/badge")
 @jwt_required()
 def badge():
     uid = get_jwt_identity()
-    count = Notification.query.filter_by(user_id=uid, read_at=None).count()
-    return jsonify({"unread": count})
+    return jsonify({"unread": unread_count(uid)})
 
 @bp.patch("/<nid>/read")
 @jwt_required()
@@ -46,7 +71,9 @@ def mark_read(nid):
     if n.read_at is None:
         from datetime import datetime
         n.read_at = datetime.utcnow()
+        bump_unread({uid: -1})
         db.session.commit()
+        notification_broker.publish_badge(uid, unread_count(uid))
     return jsonify({"ok": True})
 
 @bp.post("/read")
@@ -55,10 +82,143 @@ def mark_read_bulk():
     uid = get_jwt_identity()
     ids = (request.json or {}).get("ids", [])
     from datetime import datetime
-    Notification.query.filter(
+    changed = Notification.query.filter(
         Notification.id.in_(ids),
         Notification.user_id == uid,
         Notification.read_at.is_(None)
     ).update({Notification.read_at: datetime.utcnow()}, synchronize_session=False)
+    bump_unread({uid: -changed})
     db.session.commit()
+    if changed:
+        notification_broker.publish_badge(uid, unread_count(uid))
     return jsonify({"ok": True})
+
+@bp.post("/read-all")
+@jwt_required()
+def mark_read_all():
+    """
+    Mark every unread notification at or older than ?before=<cursor> (an
+    inbox cursor; default: everything up to now) as read, READ_ALL_BATCH
+    rows per transaction, adjusting the badge counter as it goes.
+    """
+    uid = get_jwt_identity()
+    from datetime import datetime
+    now = datetime.utcnow()
+    N = Notification
+    if request.args.get("before"):
+        try:
+            key, id_ = decode_cursor(request.args["before"])
+        except CursorError as e:
+            return jsonify({"error": str(e)}), 400
+        upto = tuple_(N.created_at, N.id) <= tuple_(literal(key, N.created_at.type), literal(id_, N.id.type))
+    else:
+        upto = N.created_at <= now
+    updated = 0
+    while True:
+        # walks the partial unread index; each batch is one short UPDATE + commit
+        ids = [r[0] for r in db.session.query(N.id)
+               .filter(N.user_id == uid, N.read_at.is_(None), upto).limit(READ_ALL_BATCH)]
+        if not ids:
+            break
+        n = N.query.filter(N.id.in_(ids), N.read_at.is_(None))\
+            .update({N.read_at: now}, synchronize_session=False)
+        bump_unread({uid: -n})
+        db.session.commit()
+        updated += n
+        if len(ids) < READ_ALL_BATCH:
+            break
+    if updated:
+        notification_broker.publish_badge(uid, unread_count(uid))
+    return jsonify({"ok": True, "updated": updated})
+
+@bp.get("/preferences")
+@jwt_required()
+def get_preferences():
+    return jsonify({"items": preferences_for(get_jwt_identity()), "channels": list(CHANNELS)})
+
+@bp.put("/preferences")
+@jwt_required()
+def put_preferences():
+    uid = get_jwt_identity()
+    items = (request.get_json(silent=True) or {}).get("items") or []
+    for p in items:
+        if not isinstance(p, dict) or not p.get("type") or p.get("channel") not in CHANNELS or "enabled" not in p:
+            return jsonify({"error": f"each item needs type, channel ({'|'.join(CHANNELS)}) and enabled"}), 400
+    set_preferences(uid, items)
+    db.session.commit()
+    return jsonify({"items": preferences_for(uid), "channels": list(CHANNELS)})
+
+# ---------------- realtime stream (SSE) ----------------
+RESUME_LIMIT = 100  # missed notifications replayed on reconnect; more than this sends `reset`
+
+def _sse(data, event, id_=None):
+    head = f"id: {id_}\n" if id_ else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _missed_since(uid, last_id):
+    """Notifications after `last_id`, oldest first; None if they can't all be replayed (too many, or unknown id)."""
+    anchor = db.session.query(Notification.created_at).filter_by(id=last_id, user_id=uid).first()
+    if not anchor:
+        return None  # archived/deleted or not ours: we can't tell what was missed
+    rows = Notification.query.filter(
+        Notification.user_id == uid,
+        or_(Notification.created_at > anchor[0], and_(Notification.created_at == anchor[0], Notification.id > last_id)),
+    ).order_by(Notification.created_at.asc(), Notification.id.asc()).limit(RESUME_LIMIT + 1).all()
+    if len(rows) > RESUME_LIMIT:
+        return None
+    return [_note(n) for n in rows]
+
+@bp.get("/stream")
+@jwt_required(locations=["headers", "query_string"])  # EventSource can't send headers: ?jwt=<token>
+def stream():
+    uid = get_jwt_identity()
+    app = current_app._get_current_object()
+    heartbeat = float(app.config.get("NOTIFY_STREAM_HEARTBEAT", 15))
+    max_age = float(app.config.get("NOTIFY_STREAM_MAX_SECONDS", 3600))
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+
+    # subscribe before reading the backlog so nothing falls between the two
+    sub = notification_broker.subscribe(uid)
+    backlog = _missed_since(uid, last_id) if last_id else []
+    reset = {"reason": "resume_gap", "refetch": url_for("notifications.list_notifications")} if backlog is None else None
+    badge = unread_count(uid)
+    db.session.close()  # don't hold a pooled connection for the life of the stream
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            if reset:
+                # the gap can't be replayed: tell the client to reload the inbox over REST
+                yield _sse(reset, "reset")
+            seen = {n["id"] for n in backlog or ()}
+            for n in backlog or ():
+                yield _sse(n, "notification", n["id"])
+            yield _sse({"unread": badge}, "badge")
+            deadline = time.monotonic() + max_age
+            while time.monotonic() < deadline and not sub.lagging:
+                try:
+                    item = sub.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                # coalesce a burst (new notifications, reads) into one badge read
+                batch = [item]
+                while True:
+                    try:
+                        batch.append(sub.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                for n in batch:
+                    if "badge" in n:
+                        continue  # read elsewhere: only the badge below changes
+                    if n["id"] not in seen:
+                        yield _sse({**n, "read_at": None}, "notification", n["id"])
+                seen.clear()
+                with app.app_context():
+                    count = unread_count(uid)
+                yield _sse({"unread": count}, "badge")
+        finally:
+            notification_broker.unsubscribe(sub)
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
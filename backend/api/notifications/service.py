@@ -1,11 +1,19 @@
-from typing import Iterable, Optional, Dict, Any
-from firebase_admin import messaging
+from typing import Iterable, Optional, Dict, Any, List
+from datetime import datetime
 from flask import current_app
 from ..extensions import db
-from ..models import Notification, PushToken
+from ..models import Notification, gen_uuid
+from .outbox import enqueue
+from .counters import added as count_unread
+from .stream import queue_publish
+from .transport import get_transport
+from .preferences import without_muted
 
-def _make_note(user_id: str, type_: str, title: str, body: Optional[str], data: Optional[Dict[str, Any]]):
-    note = Notification(user_id=user_id, type=type_, title=title, body=body or "", data_json=data or {})
+FCM_MULTICAST_LIMIT = 500  # tokens per send_multicast call
+
+def _make_note(user_id: str, type_: str, title: str, body: Optional[str], data: Optional[Dict[str, Any]], created_at=None):
+    note = Notification(id=gen_uuid(), user_id=user_id, type=type_, title=title, body=body or "", data_json=data or {},
+                        created_at=created_at or datetime.utcnow())
     db.session.add(note)
     return note
 
@@ -16,30 +24,55 @@ def deliver_notification(
     body: Optional[str] = None,
     data: Optional[Dict[str, Any]] = None,
     push: bool = True,
+    commit: bool = True,
 ):
-    user_ids = list({u for u in user_ids if u})
+    """
+    Write in-app notifications and, with push=True, an outbox row for the push.
+    Both land in the caller's transaction; the push is sent later by the outbox
+    drain, so this never waits on FCM. Users who muted `type_` are skipped.
+    commit=False leaves committing to the caller.
+    """
+    user_ids = without_muted({u for u in user_ids if u}, type_)
     if not user_ids:
         return []
 
+    now = datetime.utcnow()
     notes = []
     for uid in user_ids:
-        notes.append(_make_note(uid, type_, title, body, data))
-    db.session.commit()
-
+        notes.append(_make_note(uid, type_, title, body, data, now))
+    count_unread(user_ids)
+    queue_publish(db.session, [(n.user_id, n.id) for n in notes], type_, title, body, data, now)
     if push:
-        try:
-            tokens = db.session.query(PushToken.token)\
-                .filter(PushToken.user_id.in_(user_ids), PushToken.revoked_at.is_(None)).all()
-            tokens = [t[0] for t in tokens]
-            if tokens:
-                msg = messaging.MulticastMessage(
-                    notification=messaging.Notification(title=title, body=body or ""),
-                    data={k: str(v) for k, v in (data or {}).items()},
-                    tokens=tokens
-                )
-                resp = messaging.send_multicast(msg)
-                current_app.logger.info(f"FCM sent: success {resp.success_count}, fail {resp.failure_count}")
-        except Exception as e:
-            current_app.logger.warning(f"Push send failed: {e}")
-
+        enqueue(user_ids, type_, title, body, data)
+    if commit:
+        db.session.commit()
     return notes
+
+class PushError(RuntimeError):
+    """Every token failed; dead_tokens still lists the ones to revoke."""
+    def __init__(self, message, dead_tokens=()):
+        super().__init__(message)
+        self.dead_tokens = list(dead_tokens)
+
+def push_enabled() -> bool:
+    return get_transport().available()
+
+def send_push(tokens: List[str], title: str, body: Optional[str], data: Optional[Dict[str, Any]]):
+    """
+    Multicast to `tokens` (in FCM-sized chunks) through the configured
+    transport. Returns (sent, failed, dead) where dead lists tokens rejected
+    permanently; raises if every token failed for a transient reason.
+    """
+    transport = get_transport()
+    sent = failed = 0
+    dead = []
+    for i in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+        res = transport.send_multicast(tokens[i:i + FCM_MULTICAST_LIMIT], title, body, data)
+        sent += res.success_count
+        failed += res.failure_count
+        dead += res.dead
+    if tokens:
+        current_app.logger.info(f"push ({transport.name}) sent: success {sent}, fail {failed}, dead tokens {len(dead)}")
+    if failed and not sent and len(dead) < failed:
+        raise PushError(f"push rejected all {failed} tokens", dead)
+    return sent, failed, dead
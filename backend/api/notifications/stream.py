@@ -0,0 +1,146 @@
+"""
+Realtime notification stream (GET /notifications/stream, Server-Sent Events).
+
+Writers queue a message on the session (queue_publish); after the
+transaction commits it goes to the broker, which hands it to every open
+stream of the recipients. Rolled-back notifications are never announced.
+
+The broker is in-process by default. With NOTIFY_STREAM_URL=redis://... every
+process publishes to one Redis pub/sub channel and a listener thread feeds
+the local subscribers, so a notification written by the admin API or a worker
+reaches streams held by any API process.
+
+Message shape (one per transaction/chunk, not per recipient):
+  {"notes": [[user_id, notification_id], ...], "type", "title", "body",
+   "data", "created_at"}
+Reads publish {"badge": [[user_id, unread], ...]} after commit (publish_badge),
+so open streams update the badge without a new notification.
+"""
+import json
+import queue
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    # Optional: only needed to fan messages out across processes
+    import redis
+except Exception:
+    redis = None
+
+CHANNEL = "sportrium:notifications"
+
+
+class Subscription:
+    def __init__(self, user_id, size):
+        self.user_id = str(user_id)
+        self.queue = queue.Queue(maxsize=size)
+        self.lagging = False  # queue overflowed: the stream ends and the client resumes from the DB
+
+
+class Broker:
+    def __init__(self):
+        self._subs = {}  # user_id -> set of Subscription
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener = None
+        self.queue_size = 256
+
+    def init_app(self, app):
+        self.queue_size = int(app.config.get("NOTIFY_STREAM_QUEUE", 256))
+        url = app.config.get("NOTIFY_STREAM_URL")
+        if url and redis is None:
+            app.logger.warning("NOTIFY_STREAM_URL set but redis not installed; streams are per-process")
+        elif url:
+            self._redis = redis.Redis.from_url(url)
+
+    # ---- subscribers ----
+    def subscribe(self, user_id):
+        sub = Subscription(user_id, self.queue_size)
+        with self._lock:
+            self._subs.setdefault(sub.user_id, set()).add(sub)
+        if self._redis is not None:
+            self._ensure_listener()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subs.get(sub.user_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.user_id]
+
+    def connections(self):
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+    # ---- publishing ----
+    def publish(self, msg):
+        if self._redis is not None:
+            try:
+                self._redis.publish(CHANNEL, json.dumps(msg, default=str))
+                return
+            except Exception:
+                pass  # redis down: at least reach this process's streams
+        self._deliver(msg)
+
+    def publish_badge(self, user_id, unread):
+        self.publish({"badge": [[str(user_id), unread]]})
+
+    def _deliver(self, msg):
+        with self._lock:
+            if "badge" in msg:
+                targets = [({"badge": n}, list(self._subs[uid])) for uid, n in msg["badge"] if uid in self._subs]
+            else:
+                base = {k: v for k, v in msg.items() if k != "notes"}
+                targets = [({**base, "id": nid}, list(self._subs[uid])) for uid, nid in msg["notes"] if uid in self._subs]
+        for item, subs in targets:
+            for sub in subs:
+                try:
+                    sub.queue.put_nowait(item)
+                except queue.Full:
+                    sub.lagging = True
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self._listen, name="notify-stream", daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for raw in pubsub.listen():
+                    try:
+                        self._deliver(json.loads(raw["data"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+            except Exception:
+                time.sleep(1)  # connection lost; resubscribe (streams resume via Last-Event-ID)
+
+
+notification_broker = Broker()
+
+
+def queue_publish(session, notes, type_, title, body, data, created_at):
+    """Announce notifications once `session` commits. notes: [(user_id, notification_id)]."""
+    session.info.setdefault("notify_stream", []).append({
+        "notes": [[str(u), str(n)] for u, n in notes], "type": type_, "title": title, "body": body or "",
+        "data": data or {}, "created_at": created_at.isoformat() if created_at else None,
+    })
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session):
+    for msg in session.info.pop("notify_stream", None) or ():
+        notification_broker.publish(msg)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("notify_stream", None)
@@ -0,0 +1,156 @@
+"""
+Push transports: how a multicast actually leaves the process.
+
+service.send_push() chunks tokens and calls the configured transport's
+send_multicast() for each chunk; everything above it (outbox, fan-out,
+digests) is transport-agnostic. PUSH_TRANSPORT picks one:
+
+- fcm  (default) Firebase Admin SDK; imported lazily, so a missing
+        firebase_admin only disables push instead of breaking app import
+- fake  in-process, no network: simulated latency, transient failures and
+        dead tokens, for load tests and local development
+- http  POSTs each multicast as JSON to PUSH_HTTP_URL (e.g.
+        scripts/fake_push_server.py, or a relay in front of a real provider)
+
+A transport returns MulticastResult(success_count, failure_count, dead) where
+`dead` lists tokens that will never work again, and raises on failures that
+should be retried (network errors, provider 5xx).
+"""
+import json
+import random
+import threading
+import time
+import urllib.request
+from collections import namedtuple
+from flask import current_app
+
+try:
+    # Optional: only needed for real FCM delivery
+    import firebase_admin
+    from firebase_admin import messaging
+except Exception:
+    firebase_admin = None
+    messaging = None
+
+MulticastResult = namedtuple("MulticastResult", "success_count failure_count dead")
+
+# provider error codes meaning the token will never work again (revoke, don't retry)
+DEAD_TOKEN_CODES = {"NOT_FOUND", "UNREGISTERED", "SENDER_ID_MISMATCH"}
+
+
+class PushTransport:
+    name = "base"
+
+    def available(self) -> bool:
+        return True
+
+    def send_multicast(self, tokens, title, body, data) -> MulticastResult:
+        raise NotImplementedError
+
+
+class FCMTransport(PushTransport):
+    name = "fcm"
+
+    def available(self):
+        if firebase_admin is None:
+            return False
+        try:
+            firebase_admin.get_app()
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def is_dead_token_error(exc) -> bool:
+        code = (getattr(exc, "code", None) or "").upper()
+        if code in DEAD_TOKEN_CODES or isinstance(exc, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+            return True
+        # INVALID_ARGUMENT is also used for bad payloads; only a malformed token counts
+        return code == "INVALID_ARGUMENT" and "registration token" in str(exc).lower()
+
+    def send_multicast(self, tokens, title, body, data):
+        msg = messaging.MulticastMessage(
+            notification=messaging.Notification(title=title, body=body or ""),
+            data={k: str(v) for k, v in (data or {}).items()},
+            tokens=tokens,
+        )
+        resp = messaging.send_multicast(msg)
+        dead = []
+        if resp.failure_count:
+            # responses are in token order
+            dead = [t for t, r in zip(tokens, resp.responses) if not r.success and self.is_dead_token_error(r.exception)]
+        return MulticastResult(resp.success_count, resp.failure_count, dead)
+
+
+class FakeTransport(PushTransport):
+    """
+    In-process stand-in: sleeps `latency_ms` (+/- jitter) per multicast,
+    raises on `failure_rate` of calls and reports `dead_rate` of tokens (and
+    any token starting with "dead:") as unregistered. Keeps thread-safe totals.
+    """
+    name = "fake"
+
+    def __init__(self, latency_ms=0.0, failure_rate=0.0, dead_rate=0.0, jitter=0.2, seed=None):
+        self.latency_ms, self.failure_rate, self.dead_rate, self.jitter = latency_ms, failure_rate, dead_rate, jitter
+        self._rand = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "errors": 0, "tokens": 0, "sent": 0, "dead": 0}
+
+    def send_multicast(self, tokens, title, body, data):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000 * (1 + self.jitter * (2 * self._rand.random() - 1)))
+        with self._lock:
+            self.stats["calls"] += 1
+            if self._rand.random() < self.failure_rate:
+                self.stats["errors"] += 1
+                raise RuntimeError("fake push transport: simulated outage")
+            dead = [t for t in tokens if t.startswith("dead:") or self._rand.random() < self.dead_rate]
+            self.stats["tokens"] += len(tokens)
+            self.stats["sent"] += len(tokens) - len(dead)
+            self.stats["dead"] += len(dead)
+        return MulticastResult(len(tokens) - len(dead), len(dead), dead)
+
+
+class HTTPTransport(PushTransport):
+    """
+    POST {"tokens", "notification": {"title", "body"}, "data"} to `url`;
+    expects 2xx {"results": [{"error": null | "<CODE>"}, ...]} in token order.
+    """
+    name = "http"
+
+    def __init__(self, url, timeout=10.0):
+        self.url, self.timeout = url, timeout
+
+    def send_multicast(self, tokens, title, body, data):
+        payload = json.dumps({"tokens": tokens, "notification": {"title": title, "body": body or ""},
+                              "data": {k: str(v) for k, v in (data or {}).items()}}).encode()
+        req = urllib.request.Request(self.url, data=payload, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:  # non-2xx raises HTTPError
+            results = json.loads(resp.read() or b"{}").get("results") or []
+        errors = [(t, (r or {}).get("error")) for t, r in zip(tokens, results)]
+        failed = [t for t, err in errors if err]
+        dead = [t for t, err in errors if err and str(err).upper() in DEAD_TOKEN_CODES]
+        return MulticastResult(len(tokens) - len(failed), len(failed), dead)
+
+
+def create_transport(config):
+    kind = (config.get("PUSH_TRANSPORT") or "fcm").lower()
+    if kind == "fake":
+        return FakeTransport(latency_ms=float(config.get("PUSH_FAKE_LATENCY_MS", 0)),
+                             failure_rate=float(config.get("PUSH_FAKE_FAILURE_RATE", 0)),
+                             dead_rate=float(config.get("PUSH_FAKE_DEAD_RATE", 0)))
+    if kind == "http":
+        return HTTPTransport(config["PUSH_HTTP_URL"], timeout=float(config.get("PUSH_HTTP_TIMEOUT", 10)))
+    return FCMTransport()
+
+
+def init_push_transport(app, transport=None):
+    """Install `transport` (or the one PUSH_TRANSPORT names) on the app."""
+    app.extensions["push_transport"] = transport or create_transport(app.config)
+    return app.extensions["push_transport"]
+
+
+def get_transport() -> PushTransport:
+    app = current_app._get_current_object()
+    transport = app.extensions.get("push_transport")
+    return transport if transport is not None else init_push_transport(app)
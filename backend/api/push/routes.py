@@ -1,3 +1,4 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..extensions import db
@@ -19,6 +20,7 @@ def save_token():
         row.user_id = uid
         row.platform = platform
         row.revoked_at = None
+        row.refreshed_at = datetime.utcnow()
     else:
         row = PushToken(user_id=uid, token=token, platform=platform)
         db.session.add(row)
@@ -32,7 +34,6 @@ def revoke_token(token):
     row = PushToken.query.filter_by(token=token, user_id=uid).first()
     if not row:
         return jsonify({"ok": True})
-    from datetime import datetime
     row.revoked_at = datetime.utcnow()
     db.session.commit()
     return jsonify({"ok": True})
@@ -0,0 +1,73 @@
+"""
+Push token hygiene.
+
+- revoke_tokens: one UPDATE for every token FCM reported as permanently dead
+  (unregistered, wrong sender, not a valid registration token), so they drop
+  out of later multicasts instead of being retried forever.
+- sweep_stale: revoke tokens the client hasn't re-registered (POST
+  /push/tokens bumps refreshed_at) in PUSH_TOKEN_STALE_DAYS; FCM expires
+  inactive registrations on its own, this keeps our table in step.
+- live_counts: non-revoked tokens per platform, for /health/push.
+"""
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, update
+from ..extensions import db, scheduler
+from ..models import PushToken
+
+REVOKE_CHUNK = 1000  # bound the IN list
+
+
+def revoke_tokens(tokens, now=None):
+    """Mark `tokens` revoked in the current transaction (no commit). Returns rows updated."""
+    tokens = sorted(set(tokens or ()))
+    now = now or datetime.utcnow()
+    revoked = 0
+    for i in range(0, len(tokens), REVOKE_CHUNK):
+        revoked += db.session.execute(
+            update(PushToken)
+            .where(PushToken.token.in_(tokens[i:i + REVOKE_CHUNK]), PushToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    return revoked
+
+
+def sweep_stale(days=None):
+    """Revoke live tokens not refreshed in `days` (PUSH_TOKEN_STALE_DAYS). Commits; returns the count."""
+    days = int(days if days is not None else current_app.config.get("PUSH_TOKEN_STALE_DAYS", 60))
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    n = db.session.execute(
+        update(PushToken)
+        .where(PushToken.revoked_at.is_(None), PushToken.refreshed_at < cutoff)
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if n:
+        current_app.logger.info(f"push tokens: revoked {n} not refreshed in {days} days")
+    return n
+
+
+def live_counts():
+    """{"live": {platform: n}, "total": n} over non-revoked tokens."""
+    rows = db.session.query(PushToken.platform, func.count())\
+        .filter(PushToken.revoked_at.is_(None)).group_by(PushToken.platform).all()
+    live = {(p or "unknown"): n for p, n in rows}
+    return {"live": live, "total": sum(live.values())}
+
+
+def register_token_sweeper(app):
+    def _run_sweep():
+        with app.app_context():
+            sweep_stale()
+
+    scheduler.add_job(
+        _run_sweep,
+        "interval",
+        hours=int(app.config.get("PUSH_TOKEN_SWEEP_HOURS", 24)),
+        id="push_token_sweep",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
@@ -0,0 +1,80 @@
+"""
+EXPLAIN-based regression check for the hot event reads.
+
+Runs each endpoint's real query through EXPLAIN (SQLite: EXPLAIN QUERY PLAN,
+Postgres: EXPLAIN with enable_seqscan off) and reports any full table scan.
+Run by tests/test_query_plans.py.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from .extensions import db
+
+
+class explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, stmt):
+        self.statement = stmt
+
+
+@compiles(explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN "
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def plan_lines(query):
+    conn = db.session.connection()
+    if conn.dialect.name == "postgresql":
+        # small tables make seq scans cheaper; ask whether an index path exists
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    # read the raw DB-API rows: the result map still carries the select's column types
+    rows = conn.execute(explain(query.statement)).cursor.fetchall()
+    return [str(r[-1]) for r in rows]
+
+
+def full_scans(lines):
+    bad = []
+    for line in lines:
+        text = line.strip()
+        if "Seq Scan on" in text:
+            bad.append(text)
+        # SQLite: "SCAN events" is a table scan, "SCAN events USING INDEX ..." is an index walk
+        elif text.startswith("SCAN ") and " USING " not in text:
+            bad.append(text)
+    return bad
+
+
+def hot_queries():
+    from .blueprints.events import events_query, live_query, schedule_query
+    from .admin.routes import admin_events_query
+    from .reminders.scheduler import due_reminders_query
+    from .models import Event
+
+    now = datetime.utcnow()
+    week = {"from": now.isoformat(), "to": (now + timedelta(days=7)).isoformat()}
+    by_start = (Event.starts_at.asc(), Event.id.asc())
+    return [
+        ("GET /events", events_query({}).order_by(*by_start).limit(20)),
+        ("GET /events?status", events_query({"status": "approved", **week}).order_by(*by_start).limit(20)),
+        ("GET /events?city&status", events_query({"city": "Lahore", "status": "approved", **week}).order_by(*by_start).limit(20)),
+        ("GET /events?province&status", events_query({"province": "Punjab", "status": "approved", **week}).order_by(*by_start).limit(20)),
+        ("GET /events/live", live_query()),
+        ("GET /events/schedule", schedule_query(now).order_by(*by_start).limit(20)),
+        ("GET /admin/events", admin_events_query().order_by(Event.starts_at.desc(), Event.id.desc()).limit(20)),
+        ("GET /admin/events?status", admin_events_query(status="pending").order_by(Event.starts_at.desc(), Event.id.desc()).limit(20)),
+        ("reminders due window", due_reminders_query(now - timedelta(minutes=2), now)),
+    ]
+
+
+def check_plans():
+    """Returns [(name, plan_lines, full_scans)] for every hot query."""
+    results = []
+    try:
+        for name, query in hot_queries():
+            lines = plan_lines(query)
+            results.append((name, lines, full_scans(lines)))
+    finally:
+        db.session.rollback()
+    return results
@@ -0,0 +1,82 @@
+"""
+Catch-up for reminders missed while no scheduler was running (deploys,
+outages). The live paths only look back REMINDER_GRACE_SECONDS, so anything
+older would otherwise stay undelivered forever.
+
+Whenever a process becomes the reminders leader (at startup, or when it
+takes over from a leader that died) this claims overdue undelivered reminders
+whose event hasn't started yet, oldest first, in REMINDER_CATCHUP_BATCH chunks
+through the same claim + batched delivery as the live path, paced to
+REMINDER_CATCHUP_RATE reminders/second so a long outage doesn't hit the push
+provider all at once. Reminders older than REMINDER_CATCHUP_LOOKBACK_HOURS
+(or whose event already started) are left alone. Also runs as
+`flask catch-up-reminders`.
+"""
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, select
+from ..extensions import db, scheduler
+from ..models import Event, Reminder
+from .scheduler import claim_due, deliver_reminders, is_leader
+
+
+def _criteria(now):
+    cfg = current_app.config
+    cutoff = now - timedelta(seconds=int(cfg.get("REMINDER_GRACE_SECONDS", 120)))
+    oldest = now - timedelta(hours=int(cfg.get("REMINDER_CATCHUP_LOOKBACK_HOURS", 48)))
+    upcoming = select(Event.id).where(Event.starts_at > now)
+    # bounded range on ix_reminders_pending_fire_at
+    return (Reminder.fire_at >= oldest, Reminder.fire_at < cutoff, Reminder.event_id.in_(upcoming))
+
+
+def backlog_size(now=None):
+    return db.session.query(func.count(Reminder.id))\
+        .filter(Reminder.delivered_at.is_(None), *_criteria(now or datetime.utcnow())).scalar()
+
+
+def catch_up(batch_size=None, rate=None, stop=None):
+    """
+    Deliver the missed-reminder backlog in paced batches. `stop()` returning
+    True ends the run early. Returns {"backlog", "delivered", "batches", "seconds", "per_second"}.
+    """
+    cfg = current_app.config
+    batch_size = int(batch_size or cfg.get("REMINDER_CATCHUP_BATCH", 500))
+    rate = float(rate if rate is not None else cfg.get("REMINDER_CATCHUP_RATE", 1000))
+    now = datetime.utcnow()
+    criteria = _criteria(now)
+    stats = {"backlog": backlog_size(now), "delivered": 0, "batches": 0}
+    if stats["backlog"]:
+        current_app.logger.info(f"reminder catch-up: {stats['backlog']} missed reminders to deliver")
+    t0 = next_at = time.perf_counter()
+    while stats["backlog"] and not (stop and stop()):
+        rows = claim_due(*criteria, limit=batch_size)
+        if not rows:
+            break
+        stats["delivered"] += deliver_reminders(rows)
+        stats["batches"] += 1
+        if len(rows) < batch_size:
+            break
+        if rate > 0:
+            next_at += len(rows) / rate  # pace to `rate` reminders/second
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    stats["per_second"] = round(stats["delivered"] / stats["seconds"]) if stats["seconds"] else stats["delivered"]
+    if stats["backlog"]:
+        current_app.logger.info(f"reminder catch-up: {stats}")
+    return stats
+
+
+def schedule_catch_up(app):
+    """Queue one catch-up run on the scheduler; called when this process gains leadership."""
+    if not app.config.get("REMINDER_CATCHUP", True):
+        return
+
+    def _run_catch_up():
+        with app.app_context():
+            if is_leader():  # still leading; otherwise the new leader runs its own
+                catch_up(stop=lambda: not scheduler.running)
+
+    # after the live path has had a moment to start
+    scheduler.add_job(_run_catch_up, "date", run_date=datetime.now() + timedelta(seconds=5),
+                      id="reminder_catchup", replace_existing=True, max_instances=1)
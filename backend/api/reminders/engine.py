@@ -0,0 +1,240 @@
+"""
+In-memory reminder engine (REMINDER_ENGINE=timer, the default).
+
+Instead of polling every minute with a 2-minute window, the engine keeps the
+next REMINDER_HORIZON_SECONDS of undelivered reminders in a min-heap keyed on
+fire_at and sleeps until the earliest one, so reminders go out at their
+second and an idle system doesn't touch the database.
+
+- refill: one range query on ix_reminders_pending_fire_at rebuilds the heap
+  every REMINDER_RESYNC_SECONDS (shorter than the horizon, so coverage never
+  lapses). Each refill looks back to the previous one's `now - grace`, so
+  reminders written by other processes (web workers, admin app) that came due
+  between two refills are still claimed and sent, just late.
+- incremental: reminders created/changed/deleted and events whose starts_at
+  moved in this process are applied after commit (session hooks below); a
+  sooner reminder wakes the loop.
+- cancellation is lazy: `_due` holds the current fire_at per id and stale
+  heap entries are skipped when popped.
+- firing claims the rows (still undelivered, fire_at not moved past now)
+  through scheduler.claim_due and hands them to scheduler.deliver_reminders,
+  so engines in several processes never deliver the same reminder twice.
+- with REMINDER_LEADER_LEASE_SECONDS > 0 only the lease holder keeps a heap
+  and fires; the others just retry the lease. Gaining the lease also queues
+  a catch-up run (catchup.py) for reminders missed while nobody led.
+
+The loop runs as a long-lived APScheduler job and exits when the scheduler
+shuts down.
+"""
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from ..extensions import db, scheduler
+from ..models import Event, Reminder
+from ..utils.lease import release_lease
+
+MAX_SLEEP = 5.0    # seconds; bounds how long a scheduler shutdown goes unnoticed
+FIRE_BATCH = 5000  # reminders claimed and delivered per round (grouped per event inside)
+
+
+class ReminderEngine:
+    def __init__(self):
+        self._heap = []               # (fire_at, reminder_id)
+        self._due = {}                # reminder_id -> fire_at currently scheduled
+        self._events = set()          # event ids whose reminders need reloading
+        self._cond = threading.Condition()
+        self._loaded_until = None     # heap covers fire_at <= this
+        self._last_refill = None      # utc time of the previous refill; the next one looks back to it
+        self._next_resync = 0.0
+        self._next_lease = 0.0
+        self.leader = False
+        self.app = None
+        self.running = False
+        self.stats = {"refills": 0, "fired": 0, "max_lag_ms": 0.0}
+
+    def init_app(self, app):
+        self.app = app
+        self.horizon = timedelta(seconds=int(app.config.get("REMINDER_HORIZON_SECONDS", 900)))
+        self.resync = float(app.config.get("REMINDER_RESYNC_SECONDS", 300))
+        self.grace = timedelta(seconds=int(app.config.get("REMINDER_GRACE_SECONDS", 120)))
+        scheduler.add_job(self.run, "date", run_date=datetime.now() + timedelta(seconds=1),
+                          id="reminder_engine", replace_existing=True, max_instances=1)
+
+    # ---- incremental updates (called after commit) ----
+    def schedule(self, reminder_id, fire_at):
+        with self._cond:
+            if fire_at is None or self._loaded_until is None or fire_at > self._loaded_until:
+                self._due.pop(reminder_id, None)  # outside the horizon: the next refill finds it
+                return
+            self._due[reminder_id] = fire_at
+            heapq.heappush(self._heap, (fire_at, reminder_id))
+            if self._heap[0][1] == reminder_id:
+                self._cond.notify()
+
+    def cancel(self, reminder_id):
+        with self._cond:
+            self._due.pop(reminder_id, None)
+
+    def reload_event(self, event_id):
+        with self._cond:
+            self._events.add(event_id)
+            self._cond.notify()
+
+    def size(self):
+        with self._cond:
+            return len(self._due)
+
+    # ---- loop ----
+    def run(self):
+        self.running = True
+        try:
+            with self.app.app_context():
+                while scheduler.running:
+                    try:
+                        self._tick()
+                    except Exception as e:
+                        db.session.rollback()
+                        self.app.logger.warning(f"reminder engine: {e}")
+                        time.sleep(1)
+                    finally:
+                        db.session.remove()
+                if self.leader:
+                    from .scheduler import LEASE_NAME, WORKER
+                    release_lease(LEASE_NAME, WORKER)  # let another process take over right away
+        finally:
+            self.running = self.leader = False
+
+    def _tick(self):
+        if time.monotonic() >= self._next_lease:
+            if not self._hold_lease():
+                with self._cond:
+                    self._cond.wait(min(MAX_SLEEP, self._next_lease - time.monotonic()))
+                return
+        if time.monotonic() >= self._next_resync:
+            self._refill()
+        with self._cond:
+            events, self._events = self._events, set()
+        if events:
+            self._reload(events)
+        ids = self._pop_due(datetime.utcnow())
+        for i in range(0, len(ids), FIRE_BATCH):
+            self._fire(ids[i:i + FIRE_BATCH])
+        with self._cond:
+            if self._events:
+                return
+            wait = min(MAX_SLEEP, max(0.0, min(self._next_resync, self._next_lease) - time.monotonic()))
+            if self._heap:
+                wait = min(wait, max(0.0, (self._heap[0][0] - datetime.utcnow()).total_seconds()))
+            if wait > 0:
+                self._cond.wait(wait)
+
+    def _hold_lease(self):
+        from .scheduler import is_leader, leader_ttl
+        ttl = leader_ttl()
+        was, self.leader = self.leader, is_leader()
+        self._next_lease = time.monotonic() + (ttl / 3 if ttl > 0 else float("inf"))
+        if self.leader and not was:
+            self._next_resync = 0.0  # just took over: load the heap now
+            from .catchup import schedule_catch_up
+            schedule_catch_up(self.app)  # and replay what was missed while nobody led
+        elif was and not self.leader:
+            with self._cond:
+                self._heap, self._due, self._loaded_until = [], {}, None
+            self._last_refill = None  # the new leader covers the gap (catch-up on takeover)
+        return self.leader
+
+    def _window(self, now, since=None):
+        R = Reminder
+        return db.session.query(R.id, R.fire_at).filter(
+            R.delivered_at.is_(None), R.fire_at >= (since or now) - self.grace, R.fire_at <= now + self.horizon)
+
+    def _refill(self):
+        now = datetime.utcnow()
+        # from the previous refill on: rows other processes wrote since then may already be due
+        rows = self._window(now, since=self._last_refill).all()
+        with self._cond:
+            self._due = {rid: fire_at for rid, fire_at in rows}
+            self._heap = [(fire_at, rid) for rid, fire_at in rows]
+            heapq.heapify(self._heap)
+            self._loaded_until = now + self.horizon
+        self._last_refill = now
+        self._next_resync = time.monotonic() + self.resync
+        self.stats["refills"] += 1
+
+    def _reload(self, event_ids):
+        rows = self._window(datetime.utcnow()).filter(Reminder.event_id.in_(event_ids)).all()
+        stale = {rid for (rid,) in db.session.query(Reminder.id).filter(Reminder.event_id.in_(event_ids))}
+        with self._cond:
+            for rid in stale:
+                self._due.pop(rid, None)
+        for rid, fire_at in rows:
+            self.schedule(rid, fire_at)
+
+    def _pop_due(self, now):
+        ids = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, rid = heapq.heappop(self._heap)
+                if self._due.get(rid) == fire_at:
+                    del self._due[rid]
+                    ids.append(rid)
+                    lag = (now - fire_at).total_seconds() * 1000
+                    self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag)
+        return ids
+
+    def _fire(self, ids):
+        from .scheduler import claim_due, deliver_reminders
+        rows = claim_due(Reminder.id.in_(ids), Reminder.fire_at <= datetime.utcnow(), limit=len(ids))
+        if rows:
+            self.stats["fired"] += deliver_reminders(rows)
+
+
+reminder_engine = ReminderEngine()
+
+
+# ---- keep the heap in step with this process's commits ----
+def _changes(target):
+    session = object_session(target)
+    return session.info.setdefault("reminder_engine", {"reminders": {}, "events": set()}) if session else None
+
+
+@event.listens_for(Reminder, "after_insert")
+@event.listens_for(Reminder, "after_update")
+def _reminder_saved(mapper, connection, target):
+    changes = _changes(target)
+    if changes is not None:
+        changes["reminders"][target.id] = None if target.delivered_at else target.fire_at
+
+
+@event.listens_for(Reminder, "after_delete")
+def _reminder_deleted(mapper, connection, target):
+    changes = _changes(target)
+    if changes is not None:
+        changes["reminders"][target.id] = None
+
+
+@event.listens_for(Event, "after_update")
+def _event_moved(mapper, connection, target):
+    if db.inspect(target).attrs.starts_at.history.has_changes():
+        changes = _changes(target)
+        if changes is not None:
+            changes["events"].add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session):
+    changes = session.info.pop("reminder_engine", None)
+    if not changes or not reminder_engine.running:
+        return
+    for rid, fire_at in changes["reminders"].items():
+        reminder_engine.schedule(rid, fire_at)
+    for event_id in changes["events"]:
+        reminder_engine.reload_event(event_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("reminder_engine", None)
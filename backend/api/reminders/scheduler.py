@@ -1,68 +1,175 @@
-from datetime import datetime, timedelta, timezone
+"""
+Reminder delivery, safe to run in any number of processes.
+
+Due reminders are claimed before anything is sent: one UPDATE tags them with
+this worker's token (FOR UPDATE SKIP LOCKED on Postgres, UPDATE ... WHERE id
+IN (subquery) elsewhere, RETURNING where supported), so concurrent workers
+take disjoint rows. Claimed rows are delivered per (event, offset, method):
+one delivered_at UPDATE per group, guarded by our claim, then one bulk
+notification insert and chunked push outbox rows for exactly the rows it
+marked, committed together. A worker that dies mid-delivery leaves nothing
+committed and its claim expires after REMINDER_CLAIM_LEASE_SECONDS.
+
+With REMINDER_LEADER_LEASE_SECONDS > 0 only the process holding the
+"reminders" lease ticks at all, so extra processes cost no DB polling.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
 from flask import current_app
+from sqlalchemy import and_, or_, select, update
 from ..extensions import scheduler, db
 from ..models import Reminder, Event
-from ..notifications.service import deliver_notification
+from ..notifications.outbox import worker_id
+from ..notifications.fanout import write_notifications
+from ..notifications.preferences import without_muted
+from ..utils.lease import acquire_lease
+
+LEASE_NAME = "reminders"
+CLAIM_BATCH = 5000
+POLL_SECONDS = 60  # interval engine tick
 
-def _now_utc():
-    return datetime.utcnow().replace(tzinfo=timezone.utc)
+WORKER = worker_id()  # claim token / lease holder for this process
 
 def _due_window():
-    now = _now_utc()
+    now = datetime.utcnow()
     return now - timedelta(minutes=2), now  # 2-min safety window
 
+def due_reminders_query(start, end):
+    # range scan on ix_reminders_pending_fire_at; cost follows due rows, not all pending ones
+    return db.session.query(Reminder, Event)\
+        .join(Event, Reminder.event_id == Event.id)\
+        .filter(Reminder.delivered_at.is_(None), Reminder.fire_at >= start, Reminder.fire_at <= end)
+
+def leader_ttl():
+    """Leader lease length; with the interval engine it must outlive the gap between ticks."""
+    cfg = current_app.config
+    ttl = int(cfg.get("REMINDER_LEADER_LEASE_SECONDS", 30))
+    if ttl > 0 and cfg.get("REMINDER_ENGINE", "timer") != "timer":
+        ttl = max(ttl, 2 * POLL_SECONDS)
+    return ttl
+
+def is_leader():
+    ttl = leader_ttl()
+    return ttl <= 0 or acquire_lease(LEASE_NAME, WORKER, ttl)
+
+def claim_due(*criteria, limit=CLAIM_BATCH, token=WORKER):
+    """
+    Atomically claim up to `limit` undelivered reminders matching `criteria`.
+    Returns plain rows (id, user_id, offset_minutes, method, event_id, title,
+    starts_at), so nothing expires or lazy-loads between claim and delivery.
+    """
+    R = Reminder
+    now = datetime.utcnow()
+    lease = int(current_app.config.get("REMINDER_CLAIM_LEASE_SECONDS", 120))
+    claimable = and_(R.delivered_at.is_(None), or_(R.claimed_at.is_(None), R.claimed_at < now - timedelta(seconds=lease)),
+                     *criteria)
+    pick = select(R.id).where(claimable).order_by(R.fire_at).limit(limit)
+    bind = db.session.get_bind()
+    if bind.dialect.name == "postgresql":
+        ids = [r[0] for r in db.session.execute(pick.with_for_update(skip_locked=True))]
+        if not ids:
+            db.session.rollback()
+            return []
+        where = R.id.in_(ids)
+    else:
+        where = and_(R.id.in_(pick), claimable)  # one statement; SQLite serializes writers
+    stmt = update(R).where(where).values(claimed_by=token, claimed_at=now).execution_options(synchronize_session=False)
+    if bind.dialect.update_returning:
+        ids = db.session.execute(stmt.returning(R.id)).scalars().all()
+    else:
+        db.session.execute(stmt)
+        ids = db.session.execute(select(R.id).where(R.claimed_by == token, R.claimed_at == now)).scalars().all()
+    db.session.commit()
+    if not ids:
+        return []
+    return db.session.query(R.id, R.user_id, R.offset_minutes, R.method, Event.id.label("event_id"),
+                            Event.title, Event.starts_at)\
+        .join(Event, R.event_id == Event.id).filter(R.id.in_(ids)).all()
+
+def _mark_delivered(ids, token):
+    """Set delivered_at on those of `ids` we still own; returns [(id, user_id)] actually marked (no commit)."""
+    R = Reminder
+    now = datetime.utcnow()
+    stmt = update(R).where(R.id.in_(ids), R.delivered_at.is_(None), R.claimed_by == token)\
+        .values(delivered_at=now).execution_options(synchronize_session=False)
+    if db.session.get_bind().dialect.update_returning:
+        return db.session.execute(stmt.returning(R.id, R.user_id)).all()
+    # no RETURNING: re-read what this transaction just marked
+    db.session.execute(stmt)
+    return db.session.execute(select(R.id, R.user_id).where(
+        R.id.in_(ids), R.claimed_by == token, R.delivered_at == now)).all()
+
+def deliver_reminders(rows, token=WORKER):
+    """
+    Deliver rows from claim_due grouped by (event, offset, method).
+    Each group is one delivered_at UPDATE guarded by our claim, one bulk
+    notification insert for the rows that UPDATE actually marked and outbox
+    rows of at most FCM_MULTICAST_LIMIT recipients, committed together.
+    Reminders deleted, already delivered or re-claimed by another worker since
+    the claim are simply skipped. Returns the count delivered.
+    """
+    groups, events = defaultdict(list), {}
+    for r in rows:
+        groups[(r.event_id, r.offset_minutes, r.method)].append(r.id)
+        events[r.event_id] = (r.title, r.starts_at)
+
+    delivered = 0
+    for (event_id, _offset, _method), ids in groups.items():
+        # email/sms have no sender yet, so every method gets in-app + push as before
+        title, starts_at = events[event_id]
+        marked = _mark_delivered(ids, token)
+        if len(marked) != len(ids):
+            current_app.logger.info(f"Reminders gone or re-claimed since claim: {len(ids) - len(marked)}/{len(ids)}")
+        user_ids = without_muted({uid for _, uid in marked}, "reminder_due")
+        if user_ids:
+            write_notifications(user_ids, "reminder_due", f"Reminder: {title}", f"Starts at {starts_at}",
+                                {"entity": "event", "eventId": event_id}, commit=False)
+        db.session.commit()
+        delivered += len(marked)
+
+    if delivered:
+        current_app.logger.info(f"Reminders delivered: {delivered} in {len(groups)} group(s)")
+    return delivered
+
 def check_due_reminders():
     start, end = _due_window()
+    delivered = 0
+    while True:
+        rows = claim_due(Reminder.fire_at >= start, Reminder.fire_at <= end)
+        if not rows:
+            return delivered
+        delivered += deliver_reminders(rows)
+        if len(rows) < CLAIM_BATCH:
+            return delivered
 
-    rows = db.session.query(Reminder, Event)\
-        .join(Event, Reminder.event_id == Event.id)\
-        .filter(Reminder.delivered_at.is_(None))\
-        .all()
-
-    to_fire = []
-    for r, ev in rows:
-        ev_start = ev.starts_at
-        if not ev_start:
-            continue
-        trigger_time = ev_start - timedelta(minutes=r.offset_minutes or 15)
-        if trigger_time.tzinfo is None:
-            trigger_time = trigger_time.replace(tzinfo=timezone.utc)
-        if start <= trigger_time <= end:
-            to_fire.append((r, ev))
-
-    if not to_fire:
+def register_jobs(app):
+    # reminders missed while nothing was running are caught up whenever a
+    # process becomes leader (reminders/catchup.py)
+    from .catchup import schedule_catch_up
+
+    if app.config.get("REMINDER_ENGINE", "timer") == "timer":
+        # exact-second firing from an in-memory heap (reminders/engine.py)
+        from .engine import reminder_engine
+        reminder_engine.init_app(app)
         return
 
-    fired_ids = []
-    for r, ev in to_fire:
-        title = f"Reminder: {ev.title}"
-        body = f"Starts at {ev.starts_at}"
-        deliver_notification(
-            user_ids=[r.user_id],
-            type_="reminder_due",
-            title=title,
-            body=body,
-            data={"entity": "event", "eventId": ev.id}
-        )
-        fired_ids.append(r.id)
-
-    if fired_ids:
-        now = datetime.utcnow()
-        Reminder.query.filter(Reminder.id.in_(fired_ids))\
-            .update({Reminder.delivered_at: now}, synchronize_session=False)
-        db.session.commit()
-        current_app.logger.info(f"Reminders delivered: {len(fired_ids)}")
+    state = {"leader": False}
 
-def register_jobs(app):
     # Run jobs inside the Flask app context so db/current_app work
     def _run_check_due_reminders():
         with app.app_context():
-            check_due_reminders()
+            leader, was = is_leader(), state["leader"]
+            state["leader"] = leader
+            if leader and not was:
+                schedule_catch_up(app)
+            if leader:
+                check_due_reminders()
 
     scheduler.add_job(
         _run_check_due_reminders,
         "interval",
-        minutes=1,
+        seconds=POLL_SECONDS,
+        next_run_time=datetime.now(),  # take the lease (and catch up) at startup, not a tick later
         id="reminders_due",
         replace_existing=True,
     )
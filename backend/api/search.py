@@ -0,0 +1,179 @@
+"""
+Indexed full-text search for events, teams, tournaments and users.
+
+- Postgres: expression GIN index on to_tsvector('simple', ...) for ranked
+  word/prefix matches, plus a pg_trgm GIN index on the same concatenated text
+  so substring matches over every field (email fragments, "anches" for
+  Manchester) stay indexed. Both are expression indexes, so they stay in sync
+  on insert/update without triggers.
+- SQLite: FTS5 external-content tables with the trigram tokenizer (SQLite
+  3.34+), kept in sync by triggers and ranked by bm25. Any substring of 3+
+  characters is an index lookup; 1-2 character terms only filter the FTS
+  hits with a LIKE (or, if every term is that short, fall back to the scan).
+- Anything else (or a DB that hasn't been migrated): the old ILIKE scan.
+"""
+import re
+from sqlalchemy import func, literal_column, or_, select, text
+from .extensions import db
+
+# table -> searchable columns (first one is the primary column, used for similarity ranking)
+SEARCH_FIELDS = {
+    "events": ("title", "city", "sport", "venue"),
+    "teams": ("name", "short_name", "league", "city", "sport"),
+    "tournaments": ("name", "organizer", "city"),
+    "users": ("display_name", "email"),
+}
+
+_MAX_TERMS = 8
+_MIN_TRIGRAM = 3  # shorter FTS5 trigram queries match nothing
+FTS_TOKENIZE = "trigram"
+_fts_ready = set()  # (engine url, table) pairs confirmed to have an FTS5 table
+
+
+def _terms(q: str):
+    return re.findall(r"\w+", (q or "").lower())[:_MAX_TERMS]
+
+
+def _dialect() -> str:
+    return db.engine.dialect.name
+
+
+def _has_fts(table: str) -> bool:
+    key = (str(db.engine.url), table)
+    if key in _fts_ready:
+        return True
+    found = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"), {"n": f"{table}_fts"}
+    ).first()
+    if found:
+        _fts_ready.add(key)
+    return bool(found)
+
+
+def _like_pattern(q):
+    # %q% with the user's own %, _ and \ taken literally (use with escape="\\")
+    return "%" + re.sub(r"([\\%_])", r"\\\1", q) + "%"
+
+
+def _like_any(model, q):
+    like = _like_pattern(q.lower())
+    return or_(*[getattr(model, c).ilike(like, escape="\\") for c in SEARCH_FIELDS[model.__tablename__]])
+
+
+def _ilike(query, model, q):
+    return query.filter(_like_any(model, q))
+
+
+def search_text(model):
+    """All searchable fields joined with spaces; the exact expression the Postgres GIN indexes are built on
+    (literals inline so the planner matches it)."""
+    cols = [func.coalesce(getattr(model, c), literal_column("''")) for c in SEARCH_FIELDS[model.__tablename__]]
+    doc = cols[0]
+    for c in cols[1:]:
+        doc = doc.op("||")(literal_column("' '")).op("||")(c)
+    return doc
+
+
+def ts_document(model):
+    return func.to_tsvector(literal_column("'simple'::regconfig"), search_text(model))
+
+
+def apply_search(query, model, q):
+    """
+    Filter `query` to rows matching `q` and order them best-first.
+    Returns (query, ranked); when ranked is False the caller keeps its own ordering.
+    """
+    terms = _terms(q)
+    if not terms:
+        return query, False
+    table = model.__tablename__
+    dialect = _dialect()
+
+    if dialect == "postgresql":
+        doc = ts_document(model)
+        tsq = func.to_tsquery(literal_column("'simple'::regconfig"), " & ".join(f"{t}:*" for t in terms))
+        primary = getattr(model, SEARCH_FIELDS[table][0])
+        # word/prefix hits via the tsvector index, any substring via the trigram index
+        query = query.filter(or_(doc.op("@@")(tsq), search_text(model).ilike(_like_pattern(q), escape="\\")))
+        return query.order_by(func.ts_rank(doc, tsq).desc(), func.similarity(primary, q).desc().nullslast()), True
+
+    if dialect == "sqlite" and _has_fts(table):
+        indexed = [t for t in terms if len(t) >= _MIN_TRIGRAM]
+        if not indexed:
+            return _ilike(query, model, q), False
+        match = " ".join(f'"{t}"' for t in indexed)  # every term as a substring, in any field
+        hits = (
+            select(literal_column("rowid").label("rid"), literal_column(f"bm25({table}_fts)").label("rank"))
+            .select_from(text(f"{table}_fts"))
+            .where(text(f"{table}_fts MATCH :match").bindparams(match=match))
+            .subquery()
+        )
+        query = query.join(hits, hits.c.rid == literal_column(f"{table}.rowid"))
+        for t in terms:
+            if len(t) < _MIN_TRIGRAM:
+                query = query.filter(_like_any(model, t))  # only checked on the FTS hits
+        return query.order_by(hits.c.rank.asc()), True
+
+    return _ilike(query, model, q), False
+
+
+# ---------------- schema (migrations + create-db) ----------------
+def _sqlite_ddl(table, cols, tokenize=FTS_TOKENIZE):
+    fts = f"{table}_fts"
+    col_list = ", ".join(cols)
+    new_vals = ", ".join(f"new.{c}" for c in cols)
+    old_vals = ", ".join(f"old.{c}" for c in cols)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({col_list}, content='{table}', "
+        f"content_rowid='rowid', tokenize='{tokenize}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _postgres_ddl(table, cols):
+    doc = " || ' ' || ".join(f"coalesce({c}, '')" for c in cols)
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} "
+        f"USING gin (to_tsvector('simple'::regconfig, {doc}))",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_trgm ON {table} USING gin (({doc}) gin_trgm_ops)",
+    ]
+
+
+def schema_statements(dialect: str, fts_tokenize=FTS_TOKENIZE):
+    if dialect == "postgresql":
+        stmts = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+        for table, cols in SEARCH_FIELDS.items():
+            stmts += _postgres_ddl(table, cols)
+        return stmts
+    if dialect == "sqlite":
+        stmts = []
+        for table, cols in SEARCH_FIELDS.items():
+            stmts += _sqlite_ddl(table, cols, fts_tokenize)
+        return stmts
+    return []
+
+
+def drop_statements(dialect: str):
+    stmts = []
+    for table, cols in SEARCH_FIELDS.items():
+        if dialect == "postgresql":
+            stmts += [f"DROP INDEX IF EXISTS ix_{table}_search", f"DROP INDEX IF EXISTS ix_{table}_search_trgm",
+                      f"DROP INDEX IF EXISTS ix_{table}_{cols[0]}_trgm"]  # pre-20261017220000 name
+        elif dialect == "sqlite":
+            stmts += [f"DROP TRIGGER IF EXISTS {table}_fts_{s}" for s in ("ai", "ad", "au")]
+            stmts.append(f"DROP TABLE IF EXISTS {table}_fts")
+    return stmts
+
+
+def ensure_search_schema():
+    """Create search indexes/FTS tables for the bound DB (used by `flask create-db`)."""
+    with db.engine.begin() as conn:
+        for stmt in schema_statements(conn.dialect.name):
+            conn.exec_driver_sql(stmt)
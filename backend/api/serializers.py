@@ -0,0 +1,127 @@
+"""
+Compiled dump functions for the hot list endpoints.
+
+marshmallow resolves every field through several method calls per row. Here
+each schema is turned once, at import time, into a plain function that reads
+the attributes directly and applies the same conversions, so the output is
+identical to `Schema().dump(obj)` (checked by scripts/bench_serializers.py).
+Field types without a specialised conversion fall back to the field's own
+serialize().
+
+json_response() encodes with orjson when it is installed, otherwise with
+Flask's JSON provider.
+"""
+from datetime import date
+from flask import current_app, jsonify
+from marshmallow import fields, missing
+
+from .schemas import EventSchema, TeamSchema, TournamentSchema, UserSchema
+
+try:
+    # Optional: faster JSON encoding for large list responses
+    import orjson
+except Exception:
+    orjson = None
+
+# exact field type -> expression over the (non-None) attribute value
+_CONVERT = {
+    fields.String: "str({v})",
+    fields.Email: "str({v})",
+    fields.Integer: "int({v})",
+    fields.Float: "float({v})",
+}
+
+
+def _bool(value, truthy, falsy):
+    # same order as fields.Boolean._serialize
+    try:
+        if value in truthy:
+            return True
+        if value in falsy:
+            return False
+    except TypeError:
+        pass
+    return bool(value)
+
+
+def _expr(field, v, env):
+    """Source for converting non-None `v` like field._serialize, or None to fall back."""
+    kind = type(field)
+    if kind is fields.Raw:
+        return v
+    if kind in _CONVERT:
+        if getattr(field, "as_string", False):
+            return None
+        return _CONVERT[kind].format(v=v)
+    if kind is fields.Boolean:
+        env["_bool"], env["_truthy"], env["_falsy"] = _bool, field.truthy, field.falsy
+        return f"_bool({v}, _truthy, _falsy)"
+    if kind is fields.DateTime and (field.format or "iso") == "iso":
+        return f"{v}.isoformat()"
+    if kind is fields.Date and (field.format or "iso") == "iso":
+        env["_date_iso"] = date.isoformat
+        return f"_date_iso({v})"
+    if kind is fields.List:
+        inner = _expr(field.inner, "x", env)
+        return None if inner is None else f"[None if x is None else {inner} for x in {v}]"
+    return None
+
+
+def compile_dump(schema, only=None, model=None):
+    """
+    Build `dump(obj) -> dict` for a Schema class/instance or a {name: Field} mapping.
+    With `model`, attributes the model doesn't define are emitted as None.
+    """
+    if isinstance(schema, dict):
+        field_map = schema
+    else:
+        inst = schema() if isinstance(schema, type) else schema
+        field_map = inst.dump_fields
+    names = [n for n in field_map if only is None or n in only]
+
+    env, lines, items, fallbacks = {"missing": missing}, [], [], []
+    for i, name in enumerate(names):
+        field = field_map[name]
+        attr = field.attribute or name
+        key = field.data_key or name
+        if model is not None and not hasattr(model, attr):
+            items.append(f"{key!r}: None")
+            continue
+        expr = _expr(field, f"v{i}", env) if attr.isidentifier() else None
+        if expr is None:
+            env[f"_f{i}"] = field
+            fallbacks.append((i, name, key))
+            continue
+        lines.append(f"    v{i} = obj.{attr}")
+        items.append(f"{key!r}: None if v{i} is None else {expr}")
+
+    src = ["def dump(obj):", *lines, f"    out = {{{', '.join(items)}}}"]
+    for i, name, key in fallbacks:
+        src += [f"    r = _f{i}.serialize({name!r}, obj)", f"    if r is not missing: out[{key!r}] = r"]
+    src.append("    return out")
+    exec(compile("\n".join(src), f"<dump {getattr(schema, '__name__', type(schema).__name__)}>", "exec"), env)
+    return env["dump"]
+
+
+def dump_many(dump, rows):
+    return [dump(r) for r in rows]
+
+
+def json_response(body, status=200):
+    """JSON response via orjson (sorted keys, like Flask's default) or jsonify as a fallback."""
+    if orjson is not None:
+        try:
+            data = orjson.dumps(body, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass  # something orjson can't encode; let Flask's provider handle it
+        else:
+            return current_app.response_class(data, status=status, mimetype="application/json")
+    resp = jsonify(body)
+    resp.status_code = status
+    return resp
+
+
+dump_user = compile_dump(UserSchema)
+dump_team = compile_dump(TeamSchema)
+dump_event = compile_dump(EventSchema)
+dump_tournament = compile_dump(TournamentSchema)
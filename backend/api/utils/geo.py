@@ -0,0 +1,72 @@
+import math
+
+try:
+    # Optional: vectorized haversine for large candidate sets
+    import numpy as np
+except Exception:
+    np = None
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG = math.radians(EARTH_RADIUS_KM)  # along a meridian
+CELL_DEG = 0.1                      # ~11 km of latitude per grid row
+COLS = int(round(360 / CELL_DEG))   # grid columns per row
+ROWS = int(round(180 / CELL_DEG))
+
+
+def _row(lat: float) -> int:
+    return min(ROWS - 1, max(0, int(math.floor((lat + 90.0) / CELL_DEG))))
+
+
+def _col(lng: float) -> int:
+    return int(math.floor((((lng + 180.0) % 360.0)) / CELL_DEG)) % COLS
+
+
+def grid_cell(lat, lng):
+    """Fixed lat/lng grid cell id (row-major), or None when coordinates are missing."""
+    if lat is None or lng is None:
+        return None
+    return _row(float(lat)) * COLS + _col(float(lng))
+
+
+def cell_ranges(lat: float, lng: float, radius_km: float):
+    """
+    Inclusive (lo, hi) cell-id ranges covering the bounding box of the circle.
+    One range per grid row (two where the box crosses the antimeridian), so the
+    lookup is a handful of index range scans.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lat_lo, lat_hi = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    # widest longitude span is at the row edge nearest the pole
+    edge = max(abs(lat_lo), abs(lat_hi))
+    if edge >= 89.9 or dlat >= 90:
+        lng_spans = [(0, COLS - 1)]
+    else:
+        dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(edge))))
+        if dlng >= 180:
+            lng_spans = [(0, COLS - 1)]
+        else:
+            c_lo, c_hi = _col(lng - dlng), _col(lng + dlng)
+            lng_spans = [(c_lo, c_hi)] if c_lo <= c_hi else [(c_lo, COLS - 1), (0, c_hi)]
+    ranges = []
+    for row in range(_row(lat_lo), _row(lat_hi) + 1):
+        base = row * COLS
+        ranges.extend((base + lo, base + hi) for lo, hi in lng_spans)
+    return ranges
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Distances (km) from (lat, lng) to every point in lats/lngs, in one pass."""
+    if np is not None:
+        la, ln = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lngs, dtype=float))
+        p, q = math.radians(lat), math.radians(lng)
+        a = np.sin((la - p) / 2) ** 2 + math.cos(p) * np.cos(la) * np.sin((ln - q) / 2) ** 2
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))).tolist()
+    sin, cos, asin, sqrt, rad = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    p, q = rad(lat), rad(lng)
+    cos_p = cos(p)
+    out = []
+    for la, ln in zip(lats, lngs):
+        la, ln = rad(la), rad(ln)
+        a = sin((la - p) / 2) ** 2 + cos_p * cos(la) * sin((ln - q) / 2) ** 2
+        out.append(2 * EARTH_RADIUS_KM * asin(sqrt(a)))
+    return out
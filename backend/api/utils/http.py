@@ -0,0 +1,35 @@
+from flask import request, jsonify, Response
+from sqlalchemy import func
+from ..extensions import db
+
+
+def entity_etag(kind: str, id_, updated_at) -> str:
+    # strong validator from the row version; no need to serialize the body
+    return f"{kind}-{id_}-{updated_at.strftime('%Y%m%d%H%M%S%f') if updated_at else '0'}"
+
+
+def not_modified(etag: str):
+    resp = Response(status=304)
+    resp.set_etag(etag)
+    return resp
+
+
+def check_etag(model, id_, kind: str):
+    """
+    Answer If-None-Match from the version column alone, before loading the row.
+    Returns a 304/404 response to send as-is, or None to continue.
+    """
+    if not request.if_none_match:
+        return None
+    row = db.session.query(func.coalesce(model.updated_at, model.created_at)).filter(model.id == id_).first()
+    if row is None:
+        return jsonify({"error": "not found"}), 404
+    etag = entity_etag(kind, id_, row[0])
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+    return None
+
+
+def with_etag(resp, kind: str, obj):
+    resp.set_etag(entity_etag(kind, obj.id, obj.updated_at or obj.created_at))
+    return resp
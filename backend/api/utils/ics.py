@@ -1,26 +1,29 @@
 from datetime import datetime
-from textwrap import dedent
 
-def event_to_ics(ev):
-    # ev: dict-like with starts_at, ends_at, title, venue, city
+CALENDAR_HEADER = "BEGIN:VCALENDAR\nVERSION:2.0\nPRODID:-//Sportrium//EN\n"
+CALENDAR_FOOTER = "END:VCALENDAR\n"
+
+def to_ics(dt: datetime):
+    return dt.strftime("%Y%m%dT%H%M%SZ")
+
+def vevent(ev):
+    # ev: dict-like with id, starts_at, ends_at, title, venue, city
     dt_start = ev.get("starts_at")
     dt_end = ev.get("ends_at")
-    def to_ics(dt: datetime):
-        return dt.strftime("%Y%m%dT%H%M%SZ")
     title = ev.get("title", "Sportrium Event")
     loc = ", ".join([x for x in [ev.get("venue"), ev.get("city")] if x])
     uid = ev.get("id", "sportrium")
-    body = f"""BEGIN:VCALENDAR
-VERSION:2.0
-PRODID:-//Sportrium//EN
-BEGIN:VEVENT
-UID:{uid}
-DTSTAMP:{to_ics(dt_start)}
-DTSTART:{to_ics(dt_start)}
-DTEND:{to_ics(dt_end or dt_start)}
-SUMMARY:{title}
-LOCATION:{loc}
-END:VEVENT
-END:VCALENDAR
-"""
-    return dedent(body).strip()
+    return (
+        f"BEGIN:VEVENT\nUID:{uid}\nDTSTAMP:{to_ics(dt_start)}\nDTSTART:{to_ics(dt_start)}\n"
+        f"DTEND:{to_ics(dt_end or dt_start)}\nSUMMARY:{title}\nLOCATION:{loc}\nEND:VEVENT\n"
+    )
+
+def calendar_stream(events, name=None):
+    """Yield a VCALENDAR chunk by chunk: header, one VEVENT per event, footer."""
+    yield CALENDAR_HEADER + (f"X-WR-CALNAME:{name}\n" if name else "")
+    for ev in events:
+        yield vevent(ev)
+    yield CALENDAR_FOOTER
+
+def event_to_ics(ev):
+    return "".join(calendar_stream([ev])).strip()
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
+from ..extensions import db
+from ..models import SchedulerLease
+from .sql import upsert
+
+
+def acquire_lease(name, holder, ttl):
+    """
+    Take or renew the `name` lease for `holder` for `ttl` seconds. Returns True
+    while `holder` owns it. One conditional UPDATE (after a do-nothing insert
+    the first time), so two processes can never both get True for the same
+    unexpired lease. Commits.
+    """
+    now = datetime.utcnow()
+    L = SchedulerLease
+    upsert(L.__table__, [{"name": name, "holder": holder, "expires_at": now - timedelta(seconds=1)}], key=("name",))
+    won = db.session.execute(
+        update(L).where(L.name == name, or_(L.holder == holder, L.expires_at < now))
+        .values(holder=holder, expires_at=now + timedelta(seconds=ttl))
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+    db.session.commit()
+    return won
+
+
+def release_lease(name, holder):
+    db.session.execute(
+        update(SchedulerLease).where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(expires_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
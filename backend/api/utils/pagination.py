@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_, literal
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(key, id_) -> str:
+    # opaque to clients: base64(json([sort_key, id]))
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = json.dumps([key, str(id_)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, parse=datetime.fromisoformat):
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        key, id_ = json.loads(base64.urlsafe_b64decode(cursor + pad))
+        return parse(key), str(id_)
+    except Exception:
+        raise CursorError("invalid cursor")
+
+
+def page_size(raw, default=20, maximum=100) -> int:
+    # clamp ?page_size= / ?limit= to 1..maximum; ValueError if it isn't an int
+    return max(1, min(int(raw if raw not in (None, "") else default), maximum))
+
+
+def keyset_page(query, sort_col, id_col, cursor=None, size=20, descending=False):
+    """
+    Seek-method paging on (sort_col, id_col): no OFFSET and no COUNT, so every
+    page costs the same. Returns (rows, next_cursor); next_cursor is None on
+    the last page.
+    """
+    if cursor:
+        key, id_ = decode_cursor(cursor)
+        # bind with the column types so UUID/DateTime processors apply
+        mark = tuple_(literal(key, sort_col.type), literal(id_, id_col.type))
+        after = tuple_(sort_col, id_col)
+        after = after < mark if descending else after > mark
+        query = query.filter(after)
+    if descending:
+        query = query.order_by(sort_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(sort_col.asc(), id_col.asc())
+
+    size = max(1, int(size))
+    rows = query.limit(size + 1).all()
+    next_cursor = None
+    if rows and len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
+
+
+def wants_total(args) -> bool:
+    return (args.get("include_total") or "").lower() in {"1", "true", "yes"}
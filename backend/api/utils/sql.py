@@ -0,0 +1,52 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+
+
+def upsert(table, rows, key, increment=(), replace=()):
+    """
+    INSERT `rows` (list of dicts with the same keys) into `table`; where a row
+    with the same `key` columns exists, add the `increment` columns to it and
+    overwrite the `replace` columns instead. One executemany on Postgres and
+    SQLite (ON CONFLICT DO UPDATE); UPDATE-then-INSERT per row elsewhere.
+    Runs in the current session transaction.
+    """
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table)
+        set_ = {c: table.c[c] + stmt.excluded[c] for c in increment}
+        set_.update({c: stmt.excluded[c] for c in replace})
+        if set_:
+            stmt = stmt.on_conflict_do_update(index_elements=[table.c[k] for k in key], set_=set_)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[table.c[k] for k in key])
+        db.session.execute(stmt, rows)
+        return
+    for row in rows:
+        where = [table.c[k] == row[k] for k in key]
+        values = {c: table.c[c] + row[c] for c in increment}
+        values.update({c: row[c] for c in replace})
+        if values:
+            if db.session.execute(table.update().where(*where).values(**values)).rowcount:
+                continue
+        elif db.session.execute(select(1).select_from(table).where(*where)).first():
+            continue
+        db.session.execute(table.insert().values(**row))
+
+
+def insert_ignore(table, row):
+    """INSERT `row` unless a row with the same primary key exists. Returns True if it was inserted."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        return db.session.execute(insert(table).values(**row).on_conflict_do_nothing()).rowcount == 1
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(**row))
+        return True
+    except IntegrityError:
+        return False
@@ -10,6 +10,8 @@ def create_db():
     """Create tables (useful for quick start without migrations)."""
     with app.app_context():
         db.create_all()
+        from api.search import ensure_search_schema
+        ensure_search_schema()
     click.echo("DB tables created.")
 
 @app.cli.command("drop-db")
@@ -46,3 +48,118 @@ def set_password(email, password):
         u.password_hash = hash_password(password)
         db.session.commit()
         click.echo("Password updated.")
+
+@app.cli.command("import")
+@click.argument("kind", type=click.Choice(["events", "teams", "tournaments"]))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), help="Default: from the file extension.")
+@click.option("--owner-email", help="User that owns rows without host_id/owner_id.")
+@click.option("--chunk-size", default=500, show_default=True, help="Rows per INSERT/transaction.")
+@click.option("--dry-run", is_flag=True, help="Validate only.")
+def import_cmd(kind, path, fmt, owner_email, chunk_size, dry_run):
+    "Stream a CSV/NDJSON file of events, teams or tournaments into the DB"
+    with app.app_context():
+        from api.importer import import_stream
+        from api.models import User
+        owner_id = None
+        if owner_email:
+            u = User.query.filter_by(email=owner_email.strip().lower()).first()
+            if not u:
+                click.echo("User not found"); raise SystemExit(1)
+            owner_id = u.id
+        fmt = fmt or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+        fh = click.get_text_stream("stdin") if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        with fh:
+            report = import_stream(kind, fh, fmt, owner_id=owner_id, chunk_size=chunk_size, dry_run=dry_run)
+        for e in report["errors"]:
+            click.echo(f"line {e['line']}: {e['error']}", err=True)
+        if report.get("errors_truncated"):
+            click.echo("... more errors not shown", err=True)
+        verb = "validated" if dry_run else "inserted"
+        click.echo(f"{kind}: {report['valid'] if dry_run else report['inserted']} {verb}, {report['failed']} failed")
+        if report["failed"]:
+            raise SystemExit(1)
+
+@app.cli.command("notify-worker")
+@click.option("--batch-size", default=None, type=int, help="Outbox rows claimed per round (NOTIFY_BATCH_SIZE).")
+@click.option("--threads", default=None, type=int, help="Concurrent sends (NOTIFY_THREADS).")
+@click.option("--poll", default=None, type=float, help="Seconds to sleep when the outbox is empty (NOTIFY_POLL_SECONDS).")
+@click.option("--once", is_flag=True, help="Drain what is due now and exit.")
+def notify_worker(batch_size, threads, poll, once):
+    "Deliver queued push notifications from the outbox (run several for more throughput)"
+    import time
+    from api.extensions import scheduler
+    from api.notifications.outbox import drain, worker_id
+    if scheduler.running:
+        scheduler.shutdown(wait=False)  # this process only drains the outbox
+    cfg = app.config
+    batch_size = batch_size or cfg["NOTIFY_BATCH_SIZE"]
+    threads = threads or cfg["NOTIFY_THREADS"]
+    poll = poll if poll is not None else cfg["NOTIFY_POLL_SECONDS"]
+    token = worker_id()
+    click.echo(f"notify-worker {token}: batch={batch_size} threads={threads}")
+    with app.app_context():
+        while True:
+            totals = drain(batch_size=batch_size, threads=threads, claim_token=token)
+            if any(totals.values()):
+                click.echo(" ".join(f"{k}={v}" for k, v in totals.items()))
+            if once:
+                break
+            time.sleep(poll)
+
+@app.cli.command("reconcile-counters")
+def reconcile_counters_cmd():
+    "Recompute unread notification counters from the notifications table"
+    with app.app_context():
+        from api.notifications.counters import reconcile
+        fixed, created = reconcile()
+        click.echo(f"counters fixed: {fixed}, created: {created}")
+
+@app.cli.command("archive-notifications")
+@click.option("--days", type=int, default=None, help="Age cutoff (NOTIFY_RETENTION_DAYS).")
+@click.option("--batch-size", type=int, default=None, help="Rows per transaction (NOTIFY_RETENTION_BATCH).")
+@click.option("--max-batches", type=int, default=None)
+def archive_notifications_cmd(days, batch_size, max_batches):
+    "Move old read notifications into notifications_archive and purge finished outbox rows"
+    with app.app_context():
+        from api.notifications.retention import archive_old, purge_outbox
+        stats = archive_old(days=days, batch_size=batch_size, max_batches=max_batches)
+        click.echo(f"archived {stats['moved']} notifications in {stats['batches']} batches ({stats['seconds']}s)")
+        click.echo(f"purged {purge_outbox(batch_size=batch_size)} finished outbox rows")
+
+@app.cli.command("sweep-push-tokens")
+@click.option("--days", type=int, default=None, help="Revoke tokens not refreshed in N days (PUSH_TOKEN_STALE_DAYS).")
+def sweep_push_tokens_cmd(days):
+    "Revoke stale push tokens and print live tokens per platform"
+    with app.app_context():
+        from api.push.tokens import sweep_stale, live_counts
+        click.echo(f"revoked {sweep_stale(days)} stale tokens; live: {live_counts()}")
+
+@app.cli.command("catch-up-reminders")
+@click.option("--batch-size", type=int, default=None, help="Reminders per batch (REMINDER_CATCHUP_BATCH).")
+@click.option("--rate", type=float, default=None, help="Reminders per second, 0 = unpaced (REMINDER_CATCHUP_RATE).")
+@click.option("--dry-run", is_flag=True, help="Only print the backlog size.")
+def catch_up_reminders_cmd(batch_size, rate, dry_run):
+    "Deliver overdue reminders for events that haven't started yet"
+    with app.app_context():
+        from api.reminders.catchup import backlog_size, catch_up
+        if dry_run:
+            click.echo(f"{backlog_size()} missed reminders")
+            return
+        stats = catch_up(batch_size=batch_size, rate=rate)
+        click.echo(f"delivered {stats['delivered']}/{stats['backlog']} missed reminders in {stats['batches']} batches "
+                   f"({stats['seconds']}s, {stats['per_second']}/s)")
+
+@app.cli.command("scheduler")
+def scheduler_cmd():
+    "Run the background jobs (reminders, outbox, retention, ...) in this process until interrupted"
+    import time
+    from api import start_scheduler
+    from api.extensions import scheduler
+    start_scheduler(app)
+    click.echo(f"scheduler running: {', '.join(j.id for j in scheduler.get_jobs())}")
+    try:
+        while True:
+            time.sleep(3600)
+    except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown(wait=False)
@@ -0,0 +1,29 @@
+"""composite indexes for event filters + pending reminders
+
+Revision ID: 20261017090000
+Revises: 20250914200730
+Create Date: 2026-10-17T09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017090000'
+down_revision = '20250914200730'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_events_starts_at_id', 'events', ['starts_at', 'id'])
+    op.create_index('ix_events_status_starts_at', 'events', ['status', 'starts_at', 'id'])
+    op.create_index('ix_events_city_status_starts_at', 'events', ['city', 'status', 'starts_at'])
+    op.create_index('ix_events_province_status_starts_at', 'events', ['province', 'status', 'starts_at'])
+    op.create_index('ix_reminders_delivered_at_event_id', 'reminders', ['delivered_at', 'event_id'])
+
+def downgrade():
+    op.drop_index('ix_reminders_delivered_at_event_id', table_name='reminders')
+    op.drop_index('ix_events_province_status_starts_at', table_name='events')
+    op.drop_index('ix_events_city_status_starts_at', table_name='events')
+    op.drop_index('ix_events_status_starts_at', table_name='events')
+    op.drop_index('ix_events_starts_at_id', table_name='events')
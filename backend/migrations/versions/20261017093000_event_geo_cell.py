@@ -0,0 +1,45 @@
+"""events.geo_cell grid index for nearby search
+
+Revision ID: 20261017093000
+Revises: 20261017090000
+Create Date: 2026-10-17T09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017093000'
+down_revision = '20261017090000'
+branch_labels = None
+depends_on = None
+
+BATCH = 1000
+
+def upgrade():
+    from api.utils.geo import grid_cell
+
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.add_column(sa.Column('geo_cell', sa.Integer(), nullable=True))
+    op.create_index('ix_events_geo_cell', 'events', ['geo_cell', 'lat', 'lng', 'id'])
+
+    # backfill in small batches
+    bind = op.get_bind()
+    events = sa.table('events', sa.column('id'), sa.column('lat'), sa.column('lng'), sa.column('geo_cell'))
+    while True:
+        rows = bind.execute(
+            sa.select(events.c.id, events.c.lat, events.c.lng)
+            .where(events.c.geo_cell.is_(None), events.c.lat.isnot(None), events.c.lng.isnot(None))
+            .limit(BATCH)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            events.update().where(events.c.id == sa.bindparam('_id')).values(geo_cell=sa.bindparam('_cell')),
+            [{'_id': r.id, '_cell': grid_cell(r.lat, r.lng)} for r in rows],
+        )
+
+def downgrade():
+    op.drop_index('ix_events_geo_cell', table_name='events')
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('geo_cell')
@@ -0,0 +1,27 @@
+"""full-text search: Postgres tsvector/pg_trgm GIN indexes, SQLite FTS5 tables
+
+Revision ID: 20261017100000
+Revises: 20261017093000
+Create Date: 2026-10-17T10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017100000'
+down_revision = '20261017093000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    from api.search import schema_statements
+    bind = op.get_bind()
+    for stmt in schema_statements(bind.dialect.name):
+        op.execute(stmt)
+
+def downgrade():
+    from api.search import drop_statements
+    bind = op.get_bind()
+    for stmt in drop_statements(bind.dialect.name):
+        op.execute(stmt)
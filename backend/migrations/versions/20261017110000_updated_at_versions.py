@@ -0,0 +1,28 @@
+"""updated_at version columns on events/teams/tournaments (ETags)
+
+Revision ID: 20261017110000
+Revises: 20261017100000
+Create Date: 2026-10-17T11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017110000'
+down_revision = '20261017100000'
+branch_labels = None
+depends_on = None
+
+TABLES = ('events', 'teams', 'tournaments')
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL")
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,39 @@
+"""notification_outbox for asynchronous push delivery
+
+Revision ID: 20261017120000
+Revises: 20261017110000
+Create Date: 2026-10-17T12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017120000'
+down_revision = '20261017110000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('notification_outbox',
+    sa.Column('id', sa.UUID(as_uuid=False), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('body', sa.Text(), nullable=True),
+    sa.Column('data_json', sa.JSON(), nullable=True),
+    sa.Column('user_ids', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('claimed_by', sa.String(length=64), nullable=True),
+    sa.Column('claimed_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_outbox_status_next_attempt', 'notification_outbox', ['status', 'next_attempt_at'])
+
+def downgrade():
+    op.drop_index('ix_notification_outbox_status_next_attempt', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
@@ -0,0 +1,21 @@
+"""user_follows (following_id, follower_id) index for notification fan-out
+
+Revision ID: 20261017130000
+Revises: 20261017120000
+Create Date: 2026-10-17T13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017130000'
+down_revision = '20261017120000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_user_follows_following_follower', 'user_follows', ['following_id', 'follower_id'])
+
+def downgrade():
+    op.drop_index('ix_user_follows_following_follower', table_name='user_follows')
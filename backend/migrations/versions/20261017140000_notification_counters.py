@@ -0,0 +1,30 @@
+"""notification_counters: per-user unread badge count
+
+Revision ID: 20261017140000
+Revises: 20261017130000
+Create Date: 2026-10-17T14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017140000'
+down_revision = '20261017130000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('notification_counters',
+    sa.Column('user_id', sa.UUID(as_uuid=False), nullable=False),
+    sa.Column('unread', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute(
+        "INSERT INTO notification_counters (user_id, unread) "
+        "SELECT user_id, count(*) FROM notifications WHERE read_at IS NULL GROUP BY user_id"
+    )
+
+def downgrade():
+    op.drop_table('notification_counters')
@@ -0,0 +1,45 @@
+"""notifications inbox/unread/retention indexes + notifications_archive
+
+Revision ID: 20261017150000
+Revises: 20261017140000
+Create Date: 2026-10-17T15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017150000'
+down_revision = '20261017140000'
+branch_labels = None
+depends_on = None
+
+UNREAD = sa.text('read_at IS NULL')
+READ = sa.text('read_at IS NOT NULL')
+
+def upgrade():
+    op.create_index('ix_notifications_user_created', 'notifications', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_notifications_user_unread', 'notifications', ['user_id', 'created_at', 'id'],
+                    postgresql_where=UNREAD, sqlite_where=UNREAD)
+    op.create_index('ix_notifications_read_created', 'notifications', ['created_at'],
+                    postgresql_where=READ, sqlite_where=READ)
+    op.create_table('notifications_archive',
+    sa.Column('id', sa.UUID(as_uuid=False), nullable=False),
+    sa.Column('user_id', sa.UUID(as_uuid=False), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('body', sa.Text(), nullable=True),
+    sa.Column('data_json', sa.JSON(), nullable=True),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notifications_archive_user_id', 'notifications_archive', ['user_id'])
+
+def downgrade():
+    op.drop_index('ix_notifications_archive_user_id', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
+    op.drop_index('ix_notifications_read_created', table_name='notifications')
+    op.drop_index('ix_notifications_user_unread', table_name='notifications')
+    op.drop_index('ix_notifications_user_created', table_name='notifications')
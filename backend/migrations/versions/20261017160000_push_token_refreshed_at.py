@@ -0,0 +1,31 @@
+"""push_tokens.refreshed_at + live-token index
+
+Revision ID: 20261017160000
+Revises: 20261017150000
+Create Date: 2026-10-17T16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017160000'
+down_revision = '20261017150000'
+branch_labels = None
+depends_on = None
+
+LIVE = sa.text('revoked_at IS NULL')
+
+def upgrade():
+    with op.batch_alter_table('push_tokens', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('refreshed_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE push_tokens SET refreshed_at = created_at')
+    with op.batch_alter_table('push_tokens', schema=None) as batch_op:
+        batch_op.alter_column('refreshed_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_push_tokens_live', 'push_tokens', ['platform', 'refreshed_at'],
+                    postgresql_where=LIVE, sqlite_where=LIVE)
+
+def downgrade():
+    op.drop_index('ix_push_tokens_live', table_name='push_tokens')
+    with op.batch_alter_table('push_tokens', schema=None) as batch_op:
+        batch_op.drop_column('refreshed_at')
@@ -0,0 +1,36 @@
+"""notification_digests (coalesced ticket_sold / new_follower)
+
+Revision ID: 20261017170000
+Revises: 20261017160000
+Create Date: 2026-10-17T17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017170000'
+down_revision = '20261017160000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('notification_digests',
+    sa.Column('user_id', sa.UUID(as_uuid=False), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('entity', sa.String(length=120), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('events', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.String(length=200), nullable=False),
+    sa.Column('actor', sa.String(length=200), nullable=False),
+    sa.Column('data_json', sa.JSON(), nullable=True),
+    sa.Column('first_at', sa.DateTime(), nullable=False),
+    sa.Column('flush_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'type', 'entity')
+    )
+    op.create_index('ix_notification_digests_flush_at', 'notification_digests', ['flush_at'])
+
+def downgrade():
+    op.drop_index('ix_notification_digests_flush_at', table_name='notification_digests')
+    op.drop_table('notification_digests')
@@ -0,0 +1,28 @@
+"""notification_preferences (type x channel opt-outs)
+
+Revision ID: 20261017180000
+Revises: 20261017170000
+Create Date: 2026-10-17T18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017180000'
+down_revision = '20261017170000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('notification_preferences',
+    sa.Column('user_id', sa.UUID(as_uuid=False), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('channel', sa.String(length=20), nullable=False),
+    sa.Column('enabled', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'type', 'channel')
+    )
+
+def downgrade():
+    op.drop_table('notification_preferences')
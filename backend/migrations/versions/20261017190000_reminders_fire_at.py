@@ -0,0 +1,63 @@
+"""reminders.fire_at (indexed due time) + batched backfill
+
+Revision ID: 20261017190000
+Revises: 20261017180000
+Create Date: 2026-10-17T19:00:00
+
+"""
+from datetime import timedelta, timezone
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017190000'
+down_revision = '20261017180000'
+branch_labels = None
+depends_on = None
+
+BATCH = 1000
+PENDING = sa.text('delivered_at IS NULL')
+
+reminders = sa.table('reminders', sa.column('id', sa.String), sa.column('event_id', sa.String),
+                     sa.column('offset_minutes', sa.Integer), sa.column('fire_at', sa.DateTime))
+events = sa.table('events', sa.column('id', sa.String), sa.column('starts_at', sa.DateTime))
+
+def _fire_at(starts_at, offset):
+    if starts_at.tzinfo is not None:
+        starts_at = starts_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return starts_at - timedelta(minutes=15 if offset is None else offset)
+
+def upgrade():
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fire_at', sa.DateTime(), nullable=True))
+
+    # backfill in id order, BATCH rows per round: bounds statement size and memory; it all still
+    # commits in the migration's single transaction
+    conn = op.get_bind()
+    last = None
+    while True:
+        q = sa.select(reminders.c.id, reminders.c.offset_minutes, events.c.starts_at)\
+            .select_from(reminders.join(events, reminders.c.event_id == events.c.id))\
+            .order_by(reminders.c.id).limit(BATCH)
+        if last is not None:
+            q = q.where(reminders.c.id > last)
+        rows = conn.execute(q).all()
+        if not rows:
+            break
+        params = [{"rid": r.id, "fire": _fire_at(r.starts_at, r.offset_minutes)} for r in rows if r.starts_at]
+        if params:
+            conn.execute(reminders.update().where(reminders.c.id == sa.bindparam('rid'))
+                         .values(fire_at=sa.bindparam('fire')), params)
+        last = rows[-1].id
+        if len(rows) < BATCH:
+            break
+
+    op.create_index('ix_reminders_pending_fire_at', 'reminders', ['fire_at'],
+                    postgresql_where=PENDING, sqlite_where=PENDING)
+    op.drop_index('ix_reminders_delivered_at_event_id', table_name='reminders')
+
+def downgrade():
+    op.create_index('ix_reminders_delivered_at_event_id', 'reminders', ['delivered_at', 'event_id'])
+    op.drop_index('ix_reminders_pending_fire_at', table_name='reminders')
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.drop_column('fire_at')
@@ -0,0 +1,21 @@
+"""reminders.event_id index (event reschedule / engine reload)
+
+Revision ID: 20261017200000
+Revises: 20261017190000
+Create Date: 2026-10-17T20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017200000'
+down_revision = '20261017190000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_reminders_event_id', 'reminders', ['event_id'])
+
+def downgrade():
+    op.drop_index('ix_reminders_event_id', table_name='reminders')
@@ -0,0 +1,32 @@
+"""reminders claim lease (claimed_by/claimed_at) + scheduler_leases
+
+Revision ID: 20261017210000
+Revises: 20261017200000
+Create Date: 2026-10-17T21:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017210000'
+down_revision = '20261017200000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_by', sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+    op.create_table('scheduler_leases',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('holder', sa.String(length=120), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+def downgrade():
+    op.drop_table('scheduler_leases')
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.drop_column('claimed_at')
+        batch_op.drop_column('claimed_by')
@@ -0,0 +1,34 @@
+"""search: pg_trgm index over all searchable fields instead of only the primary column
+
+Revision ID: 20261017220000
+Revises: 20261017210000
+Create Date: 2026-10-17T22:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017220000'
+down_revision = '20261017210000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    from api.search import SEARCH_FIELDS, schema_statements
+    for stmt in schema_statements("postgresql"):
+        op.execute(stmt)  # IF NOT EXISTS: only the new ix_<table>_search_trgm indexes are created
+    for table, cols in SEARCH_FIELDS.items():
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{cols[0]}_trgm")
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    from api.search import SEARCH_FIELDS
+    for table, cols in SEARCH_FIELDS.items():
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_trgm")
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_{cols[0]}_trgm ON {table} USING gin ({cols[0]} gin_trgm_ops)")
@@ -0,0 +1,23 @@
+"""users.calendar_token_version (revocable calendar feed URLs)
+
+Revision ID: 20261017230000
+Revises: 20261017220000
+Create Date: 2026-10-17T23:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017230000'
+down_revision = '20261017220000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('calendar_token_version', sa.Integer(), server_default='0', nullable=False))
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('calendar_token_version')
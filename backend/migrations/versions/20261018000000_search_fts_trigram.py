@@ -0,0 +1,31 @@
+"""search: rebuild the SQLite FTS5 tables with the trigram tokenizer
+
+Revision ID: 20261018000000
+Revises: 20261017230000
+Create Date: 2026-10-18T00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018000000'
+down_revision = '20261017230000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    from api.search import drop_statements, schema_statements
+    for stmt in drop_statements("sqlite") + schema_statements("sqlite"):
+        op.execute(stmt)
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    from api.search import drop_statements, schema_statements
+    for stmt in drop_statements("sqlite") + schema_statements("sqlite", "unicode61 remove_diacritics 2"):
+        op.execute(stmt)
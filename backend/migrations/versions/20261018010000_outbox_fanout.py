@@ -0,0 +1,25 @@
+"""notification_outbox.fanout_of / fanout_after (durable follower fan-out)
+
+Revision ID: 20261018010000
+Revises: 20261018000000
+Create Date: 2026-10-18T01:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018010000'
+down_revision = '20261018000000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fanout_of', sa.UUID(as_uuid=False), nullable=True))
+        batch_op.add_column(sa.Column('fanout_after', sa.UUID(as_uuid=False), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_column('fanout_after')
+        batch_op.drop_column('fanout_of')
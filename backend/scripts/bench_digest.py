@@ -0,0 +1,71 @@
+# scripts/bench_digest.py
+# One popular host: N ticket purchases and M follows inside a single
+# coalescing window, through the real endpoints. Reports notification rows
+# and outbox (push) rows written for the host, before and after coalescing.
+#   python scripts/bench_digest.py [--purchases 2000] [--follows 1000]
+import argparse, os, sys, tempfile, time, uuid
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--purchases", type=int, default=2000)
+p.add_argument("--follows", type=int, default=1000)
+p.add_argument("--db", default=None, help="SQLAlchemy URI (default: temp SQLite file)")
+args = p.parse_args()
+
+if not args.db:
+    args.db = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_digest.db")
+os.environ["SQLALCHEMY_DATABASE_URI"] = args.db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from api import create_app
+from api.extensions import db, scheduler
+from api.models import Event, Notification, NotificationOutbox, User
+from api.notifications.digest import flush_due
+
+app = create_app()
+scheduler.shutdown(wait=False)
+client = app.test_client()
+with app.app_context():
+    db.create_all()
+prefix = app.config.get("API_PREFIX", "/api").rstrip("/")
+
+def bench_id():
+    # UUID columns get NUMERIC affinity on SQLite; skip ids whose hex could read as a number
+    while True:
+        u = uuid.uuid4()
+        if any(ch in "abcdf" for ch in u.hex):
+            return str(u)
+
+def run(window):
+    app.config["NOTIFY_COALESCE_WINDOW_SECONDS"] = window
+    with app.app_context():
+        now = datetime.utcnow()
+        host = bench_id()
+        buyers = [bench_id() for _ in range(max(args.purchases, args.follows))]
+        db.session.execute(User.__table__.insert(), [
+            {"id": uid, "email": f"{uid}@example.com", "password_hash": "x", "is_admin": False, "created_at": now}
+            for uid in [host] + buyers])
+        ev = Event(id=bench_id(), title="Finals", sport="football", host_id=host, starts_at=now + timedelta(days=3))
+        db.session.add(ev); db.session.commit()
+        tokens = [create_access_token(identity=uid) for uid in buyers]
+        ev_id = ev.id
+    t0 = time.perf_counter()
+    for tok in tokens[:args.purchases]:
+        client.post(f"{prefix}/events/{ev_id}/tickets/purchase", json={"quantity": 2}, headers={"Authorization": f"Bearer {tok}"})
+    for tok in tokens[:args.follows]:
+        client.post(f"{prefix}/users/{host}/follow", headers={"Authorization": f"Bearer {tok}"})
+    elapsed = time.perf_counter() - t0
+    with app.app_context():
+        if window:
+            db.session.execute(db.text("UPDATE notification_digests SET flush_at = :t"), {"t": datetime.utcnow()})
+            db.session.commit()
+            flush_due()
+        rows = db.session.query(Notification).filter_by(user_id=host).all()
+        pushes = sum(1 for o in db.session.query(NotificationOutbox).all() if host in (o.user_ids or []))
+        return len(rows), pushes, elapsed, sorted({n.title if n.type == "new_follower" else n.body for n in rows})[:2]
+
+for label, window in (("per event  ", 0), ("coalesced  ", 300)):
+    rows, pushes, elapsed, sample = run(window)
+    print(f"{label}: host rows {rows:>6,}  host pushes {pushes:>6,}  ({args.purchases:,} purchases + {args.follows:,} follows "
+          f"in {elapsed:.1f}s)  e.g. {sample}")
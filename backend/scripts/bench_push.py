@@ -0,0 +1,111 @@
+# scripts/bench_push.py
+# End-to-end push throughput: C concurrent callers each run
+# deliver_notification() (notification + counter + outbox row, committed)
+# while the outbox drain sends through a simulated transport. Reports the
+# write rate, the end-to-end rate (first call -> last push handed to the
+# transport) and enqueue->sent latency percentiles.
+#   python scripts/bench_push.py [--notifications 5000] [--callers 16] [--transport fake|http]
+#                                [--latency-ms 50] [--failure-rate 0.01] [--dead-rate 0.01]
+import argparse, os, sys, tempfile, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+p = argparse.ArgumentParser()
+p.add_argument("--notifications", type=int, default=5000)
+p.add_argument("--callers", type=int, default=16)
+p.add_argument("--users", type=int, default=1000)
+p.add_argument("--tokens-per-user", type=int, default=2)
+p.add_argument("--transport", choices=("fake", "http"), default="fake")
+p.add_argument("--latency-ms", type=float, default=50.0)
+p.add_argument("--failure-rate", type=float, default=0.01, help="share of multicasts failing transiently")
+p.add_argument("--dead-rate", type=float, default=0.01, help="share of tokens reported unregistered")
+p.add_argument("--threads", type=int, default=16, help="outbox send threads")
+p.add_argument("--batch", type=int, default=100, help="outbox claim batch")
+p.add_argument("--port", type=int, default=5099)
+p.add_argument("--db", default=None, help="SQLAlchemy URI (default: temp SQLite file)")
+args = p.parse_args()
+
+if not args.db:
+    args.db = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_push.db")
+os.environ["SQLALCHEMY_DATABASE_URI"] = args.db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import create_app
+from api.extensions import db, scheduler
+from api.models import NotificationOutbox, PushToken, User
+from api.notifications import outbox
+from api.notifications.service import deliver_notification
+from api.notifications.transport import FakeTransport, HTTPTransport, init_push_transport
+
+app = create_app()
+scheduler.shutdown(wait=False)
+app.logger.setLevel("WARNING")
+app.config["NOTIFY_BACKOFF_SECONDS"] = 0.05  # retry simulated outages right away
+
+server = None
+if args.transport == "http":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from fake_push_server import make_server
+    server = make_server(args.port, args.latency_ms, args.failure_rate, args.dead_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    transport = HTTPTransport(f"http://127.0.0.1:{args.port}/send")
+else:
+    transport = FakeTransport(args.latency_ms, args.failure_rate, args.dead_rate, seed=1)
+init_push_transport(app, transport)
+
+def bench_id():
+    # UUID columns get NUMERIC affinity on SQLite; skip ids whose hex could read as a number
+    while True:
+        u = uuid.uuid4()
+        if any(ch in "abcdf" for ch in u.hex):
+            return str(u)
+
+with app.app_context():
+    db.create_all()
+    now = datetime.utcnow()
+    users = [bench_id() for _ in range(args.users)]
+    db.session.execute(User.__table__.insert(), [
+        {"id": uid, "email": f"{uid}@example.com", "password_hash": "x", "is_admin": False, "created_at": now} for uid in users])
+    db.session.execute(PushToken.__table__.insert(), [
+        {"id": bench_id(), "user_id": uid, "token": f"tok-{uid}-{k}", "platform": "android", "created_at": now, "refreshed_at": now}
+        for uid in users for k in range(args.tokens_per_user)])
+    db.session.commit()
+
+done = threading.Event()
+
+def drainer():
+    with app.app_context():
+        while not done.is_set():
+            if not sum(outbox.drain(batch_size=args.batch, threads=args.threads).values()):
+                time.sleep(0.02)
+
+def caller(i):
+    with app.app_context():
+        deliver_notification([users[i % len(users)]], "bench", f"Bench {i}", "end-to-end push", {"i": i})
+
+threading.Thread(target=drainer, daemon=True).start()
+t0 = time.perf_counter()
+with ThreadPoolExecutor(args.callers) as pool:
+    list(pool.map(caller, range(args.notifications)))
+written = time.perf_counter() - t0
+
+with app.app_context():
+    O = NotificationOutbox
+    while db.session.query(O).filter(O.status.in_(("pending", "sending"))).count():
+        db.session.rollback()
+        time.sleep(0.05)
+    total = time.perf_counter() - t0
+    done.set()
+    rows = db.session.query(O.status, O.created_at, O.sent_at, O.attempts).all()
+    lat = sorted((r.sent_at - r.created_at).total_seconds() for r in rows if r.status == "sent" and r.sent_at)
+    retried = sum(1 for r in rows if (r.attempts or 0) > 1)
+    revoked = db.session.query(PushToken).filter(PushToken.revoked_at.isnot(None)).count()
+
+pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1000 if lat else 0.0
+print(f"transport {transport.name}: {args.latency_ms:.0f}ms/multicast, {args.failure_rate:.0%} outages, {args.dead_rate:.0%} dead tokens; "
+      f"{args.callers} callers, {args.threads} send threads")
+print(f"writes:      {args.notifications / written:>8,.0f} notifications/s ({args.notifications:,} in {written:.1f}s)")
+print(f"end-to-end:  {args.notifications / total:>8,.0f} notifications/s ({total:.1f}s until the outbox was empty)")
+print(f"latency:     p50 {pct(0.5):.0f}ms  p95 {pct(0.95):.0f}ms  p99 {pct(0.99):.0f}ms (enqueue -> sent)")
+print(f"outcomes:    {sum(1 for r in rows if r.status == 'sent'):,} sent, {sum(1 for r in rows if r.status == 'failed'):,} failed, "
+      f"{retried:,} retried, {revoked:,} tokens revoked; transport {getattr(transport, 'stats', None) or server.stats}")
@@ -0,0 +1,80 @@
+# scripts/bench_reminder_burst.py
+# Cup-final burst: N users set a reminder on the same event (across a few
+# offsets/methods), all due now. Runs one check_due_reminders() pass and
+# reports time, SQL statements and commits, notifications and push outbox rows.
+#   python scripts/bench_reminder_burst.py [--reminders 20000] [--offsets 15,60] [--with-tokens]
+import argparse, os, sys, tempfile, time, uuid
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--reminders", type=int, default=20000)
+p.add_argument("--offsets", default="15,60", help="comma-separated offset_minutes, assigned round-robin")
+p.add_argument("--with-tokens", action="store_true", help="give every user a push token")
+p.add_argument("--db", default=None, help="SQLAlchemy URI (default: temp SQLite file)")
+args = p.parse_args()
+
+if not args.db:
+    args.db = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_reminder_burst.db")
+os.environ["SQLALCHEMY_DATABASE_URI"] = args.db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event as sa_event, func
+from api import create_app
+from api.extensions import db, scheduler
+from api.models import Event, Notification, NotificationOutbox, PushToken, Reminder, User
+from api.reminders.scheduler import check_due_reminders
+
+app = create_app()
+scheduler.shutdown(wait=False)
+app.logger.setLevel("WARNING")
+
+def bench_id():
+    # UUID columns get NUMERIC affinity on SQLite; skip ids whose hex could read as a number
+    while True:
+        u = uuid.uuid4()
+        if any(ch in "abcdf" for ch in u.hex):
+            return str(u)
+
+offsets = [int(o) for o in args.offsets.split(",")]
+with app.app_context():
+    db.create_all()
+    now = datetime.utcnow()
+    users = [bench_id() for _ in range(args.reminders)]
+    db.session.execute(User.__table__.insert(), [
+        {"id": u, "email": f"{u}@example.com", "password_hash": "x", "is_admin": False, "created_at": now} for u in users])
+    if args.with_tokens:
+        db.session.execute(PushToken.__table__.insert(), [
+            {"id": bench_id(), "user_id": u, "token": f"tok-{u}", "platform": "android", "created_at": now} for u in users])
+    # one event per offset so every reminder is due right now
+    events = {o: bench_id() for o in offsets}
+    db.session.execute(Event.__table__.insert(), [
+        {"id": eid, "title": "Cup Final", "sport": "football", "host_id": users[0], "status": "approved",
+         "starts_at": now + timedelta(minutes=o), "created_at": now, "updated_at": now} for o, eid in events.items()])
+    db.session.execute(Reminder.__table__.insert(), [
+        {"id": bench_id(), "user_id": u, "event_id": events[offsets[i % len(offsets)]], "method": "push",
+         "offset_minutes": offsets[i % len(offsets)], "fire_at": now - timedelta(seconds=10), "created_at": now}
+        for i, u in enumerate(users)])
+    db.session.commit()
+
+    counts = {"statements": 0, "commits": 0}
+    def _stmt(*a):
+        counts["statements"] += 1
+    def _commit(*a):
+        counts["commits"] += 1
+    engine = db.engine
+    sa_event.listen(engine, "before_cursor_execute", _stmt)
+    sa_event.listen(engine, "commit", _commit)
+    t0 = time.perf_counter()
+    delivered = check_due_reminders()
+    secs = time.perf_counter() - t0
+    sa_event.remove(engine, "before_cursor_execute", _stmt)
+    sa_event.remove(engine, "commit", _commit)
+
+    notes = db.session.query(func.count()).select_from(Notification).filter(Notification.type == "reminder_due").scalar()
+    outbox = db.session.query(func.count()).select_from(NotificationOutbox).scalar()
+    left = db.session.query(func.count()).select_from(Reminder).filter(Reminder.delivered_at.is_(None)).scalar()
+
+print(f"{delivered:,}/{args.reminders:,} reminders delivered in {secs:.2f}s ({len(offsets)} group(s)); "
+      f"{left} left undelivered")
+print(f"{counts['statements']} SQL statements, {counts['commits']} commits; "
+      f"{notes:,} notifications, {outbox} push outbox rows (<= 500 recipients each)")
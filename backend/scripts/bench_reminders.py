@@ -0,0 +1,128 @@
+# scripts/bench_reminders.py
+# Reminder engine under a large backlog: seed N scheduled reminders (default
+# 1M, spread over 30 days) plus --due reminders that come due during the run,
+# then run the engine for --seconds and report delivery lag (delivered_at -
+# fire_at) and database statements, extrapolated to an hour.
+#   python scripts/bench_reminders.py [--reminders 1000000] [--due 2000] [--seconds 90] [--mode timer|interval]
+import argparse, os, random, sys, tempfile, time, uuid
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--reminders", type=int, default=1_000_000)
+p.add_argument("--due", type=int, default=2000, help="reminders firing during the run")
+p.add_argument("--seconds", type=float, default=90.0)
+p.add_argument("--mode", choices=("timer", "interval"), default="timer")
+p.add_argument("--db", default=None, help="SQLAlchemy URI (default: temp SQLite file)")
+args = p.parse_args()
+
+if not args.db:
+    args.db = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_reminders.db")
+os.environ["SQLALCHEMY_DATABASE_URI"] = args.db
+os.environ["REMINDER_ENGINE"] = args.mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event as sa_event
+from api import create_app
+from api.extensions import db, scheduler
+from api.models import Event, Reminder, User
+from api.reminders.engine import reminder_engine
+from api.reminders.scheduler import register_jobs
+
+app = create_app()
+scheduler.pause()  # restarted below with only the reminder job
+app.logger.setLevel("WARNING")
+
+def bench_id():
+    # UUID columns get NUMERIC affinity on SQLite; skip ids whose hex could read as a number
+    while True:
+        u = uuid.uuid4()
+        if any(ch in "abcdf" for ch in u.hex):
+            return str(u)
+
+with app.app_context():
+    db.create_all()
+    now = datetime.utcnow()
+    t0 = time.perf_counter()
+    n_users = 1000
+    users = [bench_id() for _ in range(n_users)]
+    db.session.execute(User.__table__.insert(), [
+        {"id": u, "email": f"{u}@example.com", "password_hash": "x", "is_admin": False, "created_at": now} for u in users])
+    host = users[0]
+    # background: events over the next 30 days (after the run), every user reminded
+    n_events = max(1, args.reminders // n_users)
+    events = [(bench_id(), now + timedelta(hours=2) + timedelta(seconds=random.uniform(0, 30 * 86400))) for _ in range(n_events)]
+    # due during the run: start times are re-anchored just before the engine starts
+    due_events = [(bench_id(), now + timedelta(minutes=15)) for k in range(100)]
+    db.session.execute(Event.__table__.insert(), [
+        {"id": eid, "title": f"Match {i}", "sport": "football", "host_id": host, "starts_at": st, "status": "approved",
+         "created_at": now, "updated_at": now}
+        for i, (eid, st) in enumerate(events + due_events)])
+    db.session.commit()
+    batch = []
+    def flush():
+        db.session.execute(Reminder.__table__.insert(), batch); db.session.commit(); batch.clear()
+    for eid, st in events:
+        for u in users[:min(n_users, args.reminders)]:
+            batch.append({"id": bench_id(), "user_id": u, "event_id": eid, "method": "push", "offset_minutes": 15,
+                          "fire_at": st - timedelta(minutes=15), "created_at": now})
+            if len(batch) >= 50_000:
+                flush()
+    per_due = max(1, args.due // len(due_events))
+    for k, (eid, st) in enumerate(due_events):
+        for u in users[:per_due]:
+            batch.append({"id": bench_id(), "user_id": u, "event_id": eid, "method": "push", "offset_minutes": 15,
+                          "fire_at": st - timedelta(minutes=15), "created_at": now})
+    flush()
+    total = db.session.query(Reminder).count()
+    print(f"seeded {total:,} reminders ({per_due * len(due_events):,} due during the run) in {time.perf_counter() - t0:.1f}s")
+
+    # what the pre-fire_at job did every minute: load every pending reminder joined to its event
+    t0 = time.perf_counter()
+    n = sum(1 for _ in db.session.query(Reminder, Event).join(Event, Reminder.event_id == Event.id)
+            .filter(Reminder.delivered_at.is_(None)).yield_per(10_000))
+    print(f"legacy full pending scan: {n:,} rows loaded in {time.perf_counter() - t0:.2f}s (was run every minute)")
+    db.session.expunge_all()
+
+statements = {"poll": 0, "other": 0}
+with app.app_context():
+    engine = db.engine
+@sa_event.listens_for(engine, "before_cursor_execute")
+def _count(conn, cursor, statement, params, context, executemany):
+    s = statement.lstrip().upper()
+    key = "poll" if s.startswith("SELECT") and "FROM REMINDERS" in s and "FIRE_AT >=" in s.replace("\n", " ") else "other"
+    statements[key] += 1
+
+with app.app_context():
+    # anchor the due set to the actual start (seeding a big backlog takes a while)
+    start = datetime.utcnow()
+    for k, (eid, _) in enumerate(due_events):
+        st = start + timedelta(minutes=15, seconds=5 + args.seconds * 0.8 * k / 100)
+        db.session.execute(Event.__table__.update().where(Event.id == eid).values(starts_at=st))
+        db.session.execute(Reminder.__table__.update().where(Reminder.event_id == eid).values(fire_at=st - timedelta(minutes=15)))
+    db.session.commit()
+
+scheduler.remove_all_jobs()
+register_jobs(app)
+t_start = time.perf_counter()
+scheduler.resume()
+time.sleep(args.seconds)
+scheduler.shutdown(wait=False)
+elapsed = time.perf_counter() - t_start
+
+with app.app_context():
+    due_ids = [eid for eid, _ in due_events]
+    rows = db.session.query(Reminder.fire_at, Reminder.delivered_at).filter(Reminder.event_id.in_(due_ids)).all()
+    lags = sorted((d - f).total_seconds() for f, d in rows if d)
+    late = sum(1 for f, d in rows if d is None and f <= datetime.utcnow())
+
+pct = lambda q: lags[min(len(lags) - 1, int(q * len(lags)))] if lags else float("nan")
+print(f"mode {args.mode}: {len(lags):,}/{len(rows):,} due reminders delivered in {elapsed:.0f}s ({late} overdue and undelivered)")
+print(f"delivery lag: p50 {pct(0.5):.2f}s  p95 {pct(0.95):.2f}s  max {pct(1.0):.2f}s")
+per_hour = lambda n: n * 3600 / elapsed
+print(f"DB statements: {statements['poll']} due-window queries ({per_hour(statements['poll']):,.0f}/hour), "
+      f"{statements['other']:,} for delivery ({len(lags):,} reminders)")
+if args.mode == "timer":
+    print(f"engine: {reminder_engine.stats}, heap {reminder_engine.size():,} reminders; "
+          f"steady state {3600 / app.config['REMINDER_RESYNC_SECONDS']:.0f} refill queries/hour")
+else:
+    print("interval: 60 due-window queries/hour, each tick hits the DB whether or not anything is due")
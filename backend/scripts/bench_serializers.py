@@ -0,0 +1,69 @@
+# scripts/bench_serializers.py
+# Compare marshmallow dumps with the compiled serializers (api/serializers.py)
+# on synthetic rows: asserts identical output, then reports rows/sec for
+# dump-only and dump+encode.
+#   python scripts/bench_serializers.py [--rows 100] [--rounds 2000]
+import argparse, json, os, random, sys, time, uuid
+from datetime import date, datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--rows", type=int, default=100, help="rows per page")
+p.add_argument("--rounds", type=int, default=2000, help="pages serialized per measurement")
+args = p.parse_args()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from api.models import Event, Team, Tournament, User
+from api.schemas import events_schema, teams_schema, tournaments_schema, users_schema
+from api.serializers import dump_event, dump_team, dump_tournament, dump_user, dump_many, json_response, orjson
+
+random.seed(7)
+now = datetime(2026, 10, 17, 12, 0, 0, 123456)
+
+def maybe(v):
+    return v if random.random() < 0.7 else None
+
+def make_rows(n):
+    ev, te, to, us = [], [], [], []
+    for i in range(n):
+        ev.append(Event(id=str(uuid.uuid4()), title=f"Match {i}", sport="cricket", status="approved",
+                        city=maybe("Lahore"), province=maybe("Punjab"), venue=maybe("Gaddafi Stadium"),
+                        lat=maybe(31.5 + i / 1000), lng=maybe(74.3), starts_at=now + timedelta(hours=i),
+                        ends_at=maybe(now + timedelta(hours=i + 2)), host_id=str(uuid.uuid4()), created_at=now))
+        te.append(Team(id=str(uuid.uuid4()), name=f"Team {i}", short_name=maybe(f"T{i}"), league=maybe("PSL"),
+                       sport="cricket", city=maybe("Karachi"), province=None, owner_id=str(uuid.uuid4()), created_at=now))
+        to.append(Tournament(id=str(uuid.uuid4()), name=f"Cup {i}", organizer=maybe("HEC"), level="university",
+                             institution_type=None, city="Islamabad", province=maybe("ICT"),
+                             start_date=maybe(date(2026, 11, 1)), end_date=maybe(date(2026, 11, 9)), created_at=now))
+        us.append(User(id=str(uuid.uuid4()), email=f"u{i}@example.com", display_name=maybe(f"User {i}"),
+                       sports=maybe(["cricket", "hockey"]), is_admin=bool(i % 2), created_at=now))
+    return ev, te, to, us
+
+def rate(fn, rows):
+    t0 = time.perf_counter()
+    for _ in range(args.rounds):
+        fn(rows)
+    return args.rounds * len(rows) / (time.perf_counter() - t0)
+
+app = Flask(__name__)
+ev, te, to, us = make_rows(args.rows)
+cases = [
+    ("events", events_schema, dump_event, ev),
+    ("teams", teams_schema, dump_team, te),
+    ("tournaments", tournaments_schema, dump_tournament, to),
+    ("users", users_schema, dump_user, us),
+]
+print(f"json backend: {'orjson' if orjson else 'flask'}; {args.rows} rows x {args.rounds} rounds")
+with app.app_context():
+    for name, schema, dump, rows in cases:
+        old, new = schema.dump(rows), dump_many(dump, rows)
+        assert old == new, f"{name}: compiled dump differs from marshmallow"
+        assert json.loads(jsonify(old).get_data()) == json.loads(json_response(new).get_data()), f"{name}: JSON differs"
+
+        base = rate(schema.dump, rows)
+        fast = rate(lambda r: dump_many(dump, r), rows)
+        base_enc = rate(lambda r: jsonify(schema.dump(r)), rows)
+        fast_enc = rate(lambda r: json_response(dump_many(dump, r)), rows)
+        print(f"{name:12s} dump {base:>10,.0f} -> {fast:>10,.0f} rows/s ({fast / base:4.1f}x)   "
+              f"dump+encode {base_enc:>10,.0f} -> {fast_enc:>10,.0f} rows/s ({fast_enc / base_enc:4.1f}x)")
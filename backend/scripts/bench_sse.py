@@ -0,0 +1,103 @@
+# scripts/bench_sse.py
+# Idle-connection load test for GET /api/notifications/stream: open N SSE
+# connections (one per user) against a threaded dev server in this process,
+# report memory/threads per connection, then fan one notification out to all
+# of them and time delivery.
+#   python scripts/bench_sse.py [--connections 1000] [--port 5098]
+import argparse, os, resource, selectors, socket, sys, tempfile, threading, time, uuid
+from datetime import datetime
+
+p = argparse.ArgumentParser()
+p.add_argument("--connections", type=int, default=1000)
+p.add_argument("--port", type=int, default=5098)
+p.add_argument("--db", default=None, help="SQLAlchemy URI (default: temp SQLite file)")
+args = p.parse_args()
+
+if not args.db:
+    args.db = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_sse.db")
+os.environ["SQLALCHEMY_DATABASE_URI"] = args.db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import make_server
+from api import create_app
+from api.extensions import db, scheduler
+from api.models import User, UserFollow
+from api.notifications.fanout import fan_out
+from api.notifications.stream import notification_broker
+
+app = create_app()
+scheduler.shutdown(wait=False)
+soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.connections * 2 + 256)), hard))
+
+def rss_mb():
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def bench_id():
+    # UUID columns get NUMERIC affinity on SQLite; skip ids whose hex could read as a number
+    while True:
+        u = uuid.uuid4()
+        if any(ch in "abcdf" for ch in u.hex):
+            return str(u)
+
+with app.app_context():
+    db.create_all()
+    now = datetime.utcnow()
+    host = bench_id()
+    users = [{"id": bench_id(), "email": f"sse-{i}-{uuid.uuid4().hex[:6]}@example.com", "password_hash": "x",
+              "is_admin": False, "created_at": now} for i in range(args.connections)]
+    db.session.execute(User.__table__.insert(), [{**users[0], "id": host, "email": f"host-{uuid.uuid4().hex}@example.com"}] + users)
+    db.session.execute(UserFollow.__table__.insert(),
+                       [{"follower_id": u["id"], "following_id": host, "created_at": now} for u in users])
+    db.session.commit()
+    tokens = [create_access_token(identity=u["id"]) for u in users]
+
+server = make_server("127.0.0.1", args.port, app, threaded=True)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base_rss, base_threads = rss_mb(), threading.active_count()
+
+sel = selectors.DefaultSelector()
+t0 = time.perf_counter()
+socks = []
+for tok in tokens:
+    s = socket.create_connection(("127.0.0.1", args.port))
+    s.sendall(f"GET /api/notifications/stream?jwt={tok} HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n".encode())
+    socks.append(s)
+# wait until every stream has sent its initial badge
+pending = {s: b"" for s in socks}
+for s in socks:
+    sel.register(s, selectors.EVENT_READ)
+def wait_for(marker, timeout=120):
+    left = set(pending)
+    for s in pending:
+        pending[s] = b""
+    deadline = time.time() + timeout
+    while left and time.time() < deadline:
+        for key, _ in sel.select(timeout=1):
+            s = key.fileobj
+            pending[s] += s.recv(65536)
+            if marker in pending[s]:
+                left.discard(s)
+    return len(pending) - len(left)
+ready = wait_for(b"event: badge")
+opened = time.perf_counter() - t0
+time.sleep(1)
+rss, threads = rss_mb(), threading.active_count()
+print(f"{ready:,}/{args.connections:,} streams open in {opened:.1f}s; broker sees {notification_broker.connections():,}")
+print(f"memory: +{rss - base_rss:.1f} MB ({(rss - base_rss) * 1024 / max(ready, 1):.1f} KB/conn), "
+      f"threads: +{threads - base_threads} (one per connection with the threaded server)")
+
+with app.app_context():
+    t0 = time.perf_counter()
+    fan_out(host, "new_event", "New event: SSE bench", push=False)
+    got = wait_for(b"event: notification")
+    print(f"fan-out delivered to {got:,}/{ready:,} open streams in {time.perf_counter() - t0:.2f}s")
+
+for s in socks:
+    s.close()
+server.shutdown()
@@ -0,0 +1,92 @@
+# scripts/bench_tickets.py
+# Ticket-drop load harness: fire N concurrent purchases at one ticket type via
+# POST /api/events/<id>/tickets/purchase and check nothing was oversold.
+#   python scripts/bench_tickets.py [--purchases 5000] [--capacity 2000] [--concurrency 64] [--db URI]
+import argparse, os, random, sys, tempfile, threading, time, uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--purchases", type=int, default=5000)
+p.add_argument("--capacity", type=int, default=2000)
+p.add_argument("--max-qty", type=int, default=4, help="each purchase buys 1..max-qty tickets")
+p.add_argument("--concurrency", type=int, default=64)
+p.add_argument("--db", default=None, help="SQLAlchemy URI (default: temp SQLite file)")
+args = p.parse_args()
+
+if not args.db:
+    args.db = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_tickets.db")
+os.environ["SQLALCHEMY_DATABASE_URI"] = args.db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+from api import create_app
+from api.extensions import db, scheduler
+from api.models import Event, TicketPurchase, TicketType, User
+
+app = create_app()
+scheduler.shutdown(wait=False)
+
+def bench_id():
+    # UUID columns get NUMERIC affinity on SQLite; skip ids whose hex could read as a number
+    while True:
+        u = uuid.uuid4()
+        if any(ch in "abcdf" for ch in u.hex):
+            return str(u)
+
+with app.app_context():
+    db.create_all()
+    buyers = [User(id=bench_id(), email=f"buyer-{uuid.uuid4().hex}@example.com", password_hash="x") for _ in range(50)]
+    db.session.add_all(buyers); db.session.flush()
+    ev = Event(id=bench_id(), title="Ticket drop", status="approved", starts_at=datetime.utcnow() + timedelta(days=7),
+               host_id=buyers[0].id)
+    db.session.add(ev); db.session.flush()
+    tt = TicketType(id=bench_id(), event_id=ev.id, name="General", price_cents=1500, capacity=args.capacity)
+    db.session.add(tt); db.session.commit()
+    event_id, tt_id = ev.id, tt.id
+    tokens = [create_access_token(identity=str(u.id)) for u in buyers]
+
+random.seed(1)
+jobs = [(random.choice(tokens), random.randint(1, args.max_qty)) for _ in range(args.purchases)]
+statuses, lat = Counter(), []
+bought = Counter()
+lock = threading.Lock()
+local = threading.local()
+
+def purchase(job):
+    token, qty = job
+    client = getattr(local, "client", None) or app.test_client()
+    local.client = client
+    t0 = time.perf_counter()
+    r = client.post(f"/api/events/{event_id}/tickets/purchase", json={"ticket_type_id": tt_id, "quantity": qty},
+                    headers={"Authorization": f"Bearer {token}"})
+    dt = time.perf_counter() - t0
+    body = r.get_json(silent=True) or {}
+    key = r.status_code if r.status_code != 400 else body.get("error", 400)
+    with lock:
+        statuses[key] += 1
+        lat.append(dt)
+        if r.status_code == 201:
+            bought["tickets"] += qty
+
+t0 = time.perf_counter()
+with ThreadPoolExecutor(args.concurrency) as pool:
+    list(pool.map(purchase, jobs))
+elapsed = time.perf_counter() - t0
+
+with app.app_context():
+    sold = db.session.get(TicketType, tt_id).sold
+    purchased = db.session.query(func.coalesce(func.sum(TicketPurchase.quantity), 0)).filter_by(ticket_type_id=tt_id).scalar()
+
+lat.sort()
+print(f"db: {args.db.split(':')[0]}  purchases={args.purchases} "
+      f"concurrency={args.concurrency} capacity={args.capacity}")
+print(f"responses: {dict(statuses)}")
+print(f"throughput: {args.purchases / elapsed:,.0f} req/s   p50={lat[len(lat) // 2] * 1000:.1f}ms "
+      f"p95={lat[int(len(lat) * 0.95)] * 1000:.1f}ms")
+print(f"sold={sold} purchased={purchased} acknowledged={bought['tickets']}")
+assert sold <= args.capacity, f"oversold: {sold} > {args.capacity}"
+assert sold == purchased == bought["tickets"], "ticket counter, purchase rows and 201 responses disagree"
+print("ok: no oversell")
@@ -0,0 +1,100 @@
+# scripts/check_reminders_once.py
+# Exactly-once check for reminder delivery across processes: seed reminders
+# that come due over the next few seconds, start N independent app processes
+# (each with its own scheduler + reminder engine, like N gunicorn workers),
+# wait, then assert every reminder produced exactly one notification and was
+# marked delivered. Exits 1 on any duplicate or miss.
+#   python scripts/check_reminders_once.py [--processes 4] [--reminders 300] [--mode claim|leader] [--engine timer|interval]
+import argparse, os, subprocess, sys, tempfile, time, uuid
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--processes", type=int, default=4)
+p.add_argument("--reminders", type=int, default=300)
+p.add_argument("--spread", type=float, default=8.0, help="seconds over which the reminders come due")
+p.add_argument("--mode", choices=("claim", "leader"), default="claim",
+               help="claim: every process ticks and claims; leader: only the lease holder ticks")
+p.add_argument("--engine", choices=("timer", "interval"), default="timer")
+p.add_argument("--db", default=None, help="SQLAlchemy URI (default: temp SQLite file)")
+p.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+p.add_argument("--run-for", type=float, default=0, help=argparse.SUPPRESS)
+args = p.parse_args()
+
+if not args.db:
+    args.db = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "reminders_once.db")
+os.environ["SQLALCHEMY_DATABASE_URI"] = args.db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if args.worker:
+    # one "process" of the fleet: full app with its scheduler, nothing else
+    from api import create_app
+    from api.extensions import scheduler
+    app = create_app()
+    app.logger.setLevel("WARNING")
+    time.sleep(args.run_for)
+    scheduler.shutdown(wait=False)  # stops the engine loop, which releases its lease
+    sys.exit(0)
+
+from sqlalchemy import func
+from api import create_app
+from api.extensions import db, scheduler
+from api.models import Event, Notification, Reminder, User
+
+app = create_app()
+scheduler.shutdown(wait=False)
+
+def bench_id():
+    # UUID columns get NUMERIC affinity on SQLite; skip ids whose hex could read as a number
+    while True:
+        u = uuid.uuid4()
+        if any(ch in "abcdf" for ch in u.hex):
+            return str(u)
+
+lead = 4.0  # seconds for the workers to start before the first reminder is due
+if args.engine == "interval":
+    args.spread = min(args.spread, 50.0)  # the poll window is 2 minutes; keep every fire_at inside one tick's reach
+with app.app_context():
+    db.create_all()
+    now = datetime.utcnow()
+    users = [bench_id() for _ in range(args.reminders)]
+    host = users[0]
+    db.session.execute(User.__table__.insert(), [
+        {"id": u, "email": f"{u}@example.com", "password_hash": "x", "is_admin": False, "created_at": now} for u in users])
+    events = [(bench_id(), now + timedelta(minutes=15, seconds=lead + args.spread * k / 10)) for k in range(10)]
+    db.session.execute(Event.__table__.insert(), [
+        {"id": eid, "title": f"Match {i}", "sport": "football", "host_id": host, "starts_at": st, "status": "approved",
+         "created_at": now, "updated_at": now} for i, (eid, st) in enumerate(events)])
+    db.session.execute(Reminder.__table__.insert(), [
+        {"id": bench_id(), "user_id": u, "event_id": events[i % 10][0], "method": "push", "offset_minutes": 15,
+         "fire_at": events[i % 10][1] - timedelta(minutes=15), "created_at": now}
+        for i, u in enumerate(users)])
+    db.session.commit()
+
+env = dict(os.environ, REMINDER_ENGINE=args.engine, SCHEDULER_ENABLED="1",
+           REMINDER_LEADER_LEASE_SECONDS="10" if args.mode == "leader" else "0",
+           PUSH_TRANSPORT="fake", NOTIFY_COALESCE_WINDOW_SECONDS="0")
+run_for = lead + args.spread + (65 if args.engine == "interval" else 6)
+procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", "--db", args.db, "--run-for", str(run_for)],
+                          env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+         for _ in range(args.processes)]
+print(f"{args.processes} processes ({args.mode}, {args.engine}), {args.reminders} reminders due over {args.spread:.0f}s; "
+      f"waiting {run_for:.0f}s")
+errors = [pr.communicate()[1].decode(errors="replace") for pr in procs]
+
+with app.app_context():
+    counts = dict(db.session.query(Notification.user_id, func.count())
+                  .filter(Notification.type == "reminder_due").group_by(Notification.user_id).all())
+    undelivered = db.session.query(Reminder).filter(Reminder.delivered_at.is_(None)).count()
+    holders = db.session.query(Reminder.claimed_by).distinct().count()
+
+dupes = {u: n for u, n in counts.items() if n > 1}
+missing = [u for u in users if u not in counts]
+print(f"notifications: {sum(counts.values())} for {args.reminders} reminders; duplicates {len(dupes)}, "
+      f"missing {len(missing)}, undelivered {undelivered}; delivered by {holders} process(es)")
+crashed = [e for e in errors if "Traceback" in e]
+if crashed:
+    print(crashed[0][-2000:])
+if dupes or missing or undelivered or crashed:
+    print("FAIL")
+    sys.exit(1)
+print("ok: each reminder delivered exactly once")
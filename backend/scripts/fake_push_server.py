@@ -0,0 +1,60 @@
+# scripts/fake_push_server.py
+# Local HTTP push provider for PUSH_TRANSPORT=http: accepts the JSON multicast
+# HTTPTransport sends, sleeps to simulate provider latency, answers 503 on a
+# share of requests and marks a share of tokens (and any "dead:..." token)
+# UNREGISTERED.
+#   python scripts/fake_push_server.py [--port 5099] [--latency-ms 50] [--failure-rate 0.01] [--dead-rate 0.01]
+#   PUSH_TRANSPORT=http PUSH_HTTP_URL=http://127.0.0.1:5099/send flask run
+import argparse, json, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_server(port=5099, latency_ms=50.0, failure_rate=0.0, dead_rate=0.0, host="127.0.0.1"):
+    stats = {"requests": 0, "tokens": 0, "errors": 0, "dead": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            time.sleep(latency_ms / 1000 * random.uniform(0.8, 1.2))
+            tokens = payload.get("tokens") or []
+            with lock:
+                stats["requests"] += 1
+                if random.random() < failure_rate:
+                    stats["errors"] += 1
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                results = [{"error": "UNREGISTERED" if t.startswith("dead:") or random.random() < dead_rate else None}
+                           for t in tokens]
+                stats["tokens"] += len(tokens)
+                stats["dead"] += sum(1 for r in results if r["error"])
+            body = json.dumps({"results": results}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.stats = stats
+    return server
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--port", type=int, default=5099)
+    p.add_argument("--latency-ms", type=float, default=50.0)
+    p.add_argument("--failure-rate", type=float, default=0.0)
+    p.add_argument("--dead-rate", type=float, default=0.0)
+    a = p.parse_args()
+    srv = make_server(a.port, a.latency_ms, a.failure_rate, a.dead_rate)
+    print(f"fake push provider on http://127.0.0.1:{a.port}/send")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        print(srv.stats)
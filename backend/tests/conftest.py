@@ -0,0 +1,49 @@
+# tests/conftest.py
+# Shared setup: background jobs off, backend/ importable. `app` is one fresh
+# SQLite app per test module; `db_app` also runs against Postgres when
+# TEST_POSTGRES_URI is set.
+import os, sys, tempfile
+
+import pytest
+
+os.environ["SCHEDULER_ENABLED"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import create_app
+from api.config import Config
+from api.extensions import db
+
+BACKENDS = ["sqlite"] + (["postgresql"] if os.getenv("TEST_POSTGRES_URI") else [])
+
+
+def _make_app(uri):
+    Config.SQLALCHEMY_DATABASE_URI = uri
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+def _teardown(app):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = _make_app("sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db"))
+    with app.app_context():
+        yield app
+    _teardown(app)
+
+
+@pytest.fixture(scope="module", params=BACKENDS)
+def db_app(request):
+    uri = os.environ["TEST_POSTGRES_URI"] if request.param == "postgresql" else \
+        "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+    app = _make_app(uri)
+    with app.app_context():
+        yield app
+    _teardown(app)
@@ -0,0 +1,44 @@
+# tests/test_calendar_feed.py
+import re, uuid
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from api.extensions import db
+from api.models import Event, Reminder, Team, TeamFollower, User
+
+
+def _user(email):
+    u = User(id=str(uuid.uuid4()), email=email, password_hash="x")
+    db.session.add(u)
+    return u
+
+
+def test_feed_lists_reminded_and_followed_team_events(app):
+    soon = datetime.utcnow() + timedelta(days=3)
+    with app.app_context():
+        fan, owner, other = _user("fan@example.com"), _user("owner@example.com"), _user("other@example.com")
+        team = Team(name="Lahore Lions", sport="football", owner_id=owner.id)
+        db.session.add(team)
+        db.session.flush()
+        db.session.add(TeamFollower(user_id=fan.id, team_id=team.id))
+        reminded = Event(title="Reminded Match", sport="cricket", starts_at=soon, host_id=other.id)
+        db.session.add_all([
+            reminded,
+            Event(title="Lions Home Game", sport="football", starts_at=soon, host_id=owner.id),
+            Event(title="Owner Padel Night", sport="padel", starts_at=soon, host_id=owner.id),  # not the team's sport
+            Event(title="Lions Next Season", sport="football", starts_at=soon + timedelta(days=400), host_id=owner.id),
+            Event(title="Unrelated", sport="football", starts_at=soon, host_id=other.id),
+        ])
+        db.session.flush()
+        db.session.add(Reminder(user_id=fan.id, event_id=reminded.id))
+        db.session.commit()
+        headers = {"Authorization": "Bearer " + create_access_token(identity=fan.id)}
+
+    client = app.test_client()
+    token = client.get("/api/me/calendar-token", headers=headers).get_json()["token"]
+    body = client.get(f"/api/me/calendar.ics?token={token}").get_data(as_text=True)
+    assert sorted(re.findall(r"^SUMMARY:(.*)$", body, re.M)) == ["Lions Home Game", "Reminded Match"]
+
+    client.post("/api/me/calendar-token/rotate", headers=headers)
+    assert client.get(f"/api/me/calendar.ics?token={token}").status_code == 401
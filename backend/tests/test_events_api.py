@@ -0,0 +1,59 @@
+# tests/test_events_api.py
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.extensions import db
+from api.models import Event, User
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    with app.app_context():
+        host = User(id=str(uuid.uuid4()), email="host@example.com", password_hash="x")
+        db.session.add(host)
+        db.session.add_all(Event(title=f"Match {i}", sport="football", status="approved", host_id=host.id,
+                                 starts_at=datetime.utcnow() + timedelta(days=i + 1)) for i in range(3))
+        db.session.commit()
+    return app.test_client()
+
+
+@pytest.mark.parametrize("path", ["/api/events", "/api/events/schedule"])
+@pytest.mark.parametrize("size, expected", [("0", 1), ("-5", 1), ("2", 2), ("500", 3)])
+def test_cursor_page_size_is_clamped(client, path, size, expected):
+    r = client.get(f"{path}?cursor=&page_size={size}")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert len(body["items"]) == expected
+    assert 1 <= body["page_size"] <= 100
+
+
+def test_cursor_page_size_must_be_an_integer(client):
+    assert client.get("/api/events?cursor=&page_size=ten").status_code == 400
+
+
+def test_nearby_rejects_a_radius_above_the_maximum(client):
+    assert client.get("/api/events/nearby?lat=24.86&lng=67.0&radius_km=500").status_code == 400
+    assert client.get("/api/events/nearby?lat=24.86&lng=67.0&radius_km=0").status_code == 400
+
+
+def test_nearby_pages_nearest_first(app, client):
+    with app.app_context():
+        host = User(id=str(uuid.uuid4()), email="near@example.com", password_hash="x")
+        db.session.add(host)
+        # due north of the query point, 0.05 degrees (~5.6 km) apart; the last is out of range
+        db.session.add_all(Event(title=f"Near {i}", sport="cricket", host_id=host.id, lat=-30 + 0.05 * i, lng=150.0,
+                                 starts_at=datetime.utcnow() + timedelta(days=1)) for i in range(1, 7))
+        db.session.commit()
+
+    seen, cursor = [], ""
+    while True:
+        body = client.get(f"/api/events/nearby?lat=-30&lng=150&radius_km=30&page_size=2&cursor={cursor}").get_json()
+        assert len(body["items"]) <= 2 and body["radius_km"] == 30
+        seen += [(e["title"], e["distance_km"]) for e in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert [t for t, _ in seen] == [f"Near {i}" for i in range(1, 6)]
+    assert all(d < 30 for _, d in seen) and seen == sorted(seen, key=lambda s: s[1])
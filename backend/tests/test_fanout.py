@@ -0,0 +1,69 @@
+# tests/test_fanout.py
+# New-event fan-out is an outbox row committed with the event and expanded
+# by the drain, resumable from its fanout_after mark.
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from api.extensions import db
+from api.models import Notification, NotificationOutbox, User, UserFollow
+from api.notifications.outbox import claim_batch, drain, process_batch
+
+
+@pytest.fixture
+def host(app):
+    with app.app_context():
+        NotificationOutbox.query.delete()
+        host = User(id=str(uuid.uuid4()), email=f"host-{uuid.uuid4().hex[:6]}@example.com", password_hash="x")
+        fans = [User(id=str(uuid.uuid4()), email=f"fan-{uuid.uuid4().hex[:6]}@example.com", password_hash="x")
+                for _ in range(4)]
+        db.session.add_all([host, *fans])
+        db.session.add_all(UserFollow(follower_id=f.id, following_id=host.id) for f in fans)
+        db.session.commit()
+        return {"id": host.id, "fans": sorted(f.id for f in fans),
+                "headers": {"Authorization": "Bearer " + create_access_token(identity=host.id)}}
+
+
+def _notified(fans):
+    return sorted(n.user_id for n in Notification.query.filter(Notification.user_id.in_(fans), Notification.type == "new_event"))
+
+
+def test_create_event_queues_the_fan_out_with_the_event(app, host):
+    r = app.test_client().post("/api/events", json={"title": "Derby", "starts_at": "2030-01-01T15:00:00"},
+                               headers=host["headers"])
+    assert r.status_code == 201
+    with app.app_context():
+        row = NotificationOutbox.query.filter_by(fanout_of=host["id"]).one()
+        assert row.status == "pending" and _notified(host["fans"]) == []
+
+        totals = drain(max_batches=1)
+        assert totals["fanouts"] == 1 and totals["fanout_recipients"] == 4
+        assert _notified(host["fans"]) == host["fans"]
+        db.session.expire_all()
+        assert db.session.get(NotificationOutbox, row.id).status == "sent"
+        assert NotificationOutbox.query.filter(NotificationOutbox.fanout_of.is_(None)).count() == 1  # the push batch
+
+
+def test_fan_out_resumes_after_its_mark(app, host):
+    from api.notifications.fanout import queue_fan_out
+    with app.app_context():
+        row = queue_fan_out(host["id"], "new_event", "New event: Derby")
+        row.fanout_after = host["fans"][1]  # a previous worker got this far before dying
+        db.session.commit()
+        drain(max_batches=1)
+        assert _notified(host["fans"]) == host["fans"][2:]
+
+
+def test_fan_out_stops_when_its_claim_was_taken_over(app, host):
+    from api.notifications.fanout import queue_fan_out
+    with app.app_context():
+        row = queue_fan_out(host["id"], "new_event", "New event: Derby")
+        db.session.commit()
+        rows = claim_batch("worker-a", 10)
+        NotificationOutbox.query.filter_by(id=row.id).update({"claimed_by": "worker-b"}, synchronize_session=False)
+        db.session.commit()
+        with ThreadPoolExecutor(1) as pool:
+            stats = process_batch(rows, pool, "worker-a")
+        assert stats["lost_claim"] == 1 and _notified(host["fans"]) == []
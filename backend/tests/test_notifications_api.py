@@ -0,0 +1,58 @@
+# tests/test_notifications_api.py
+import uuid
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from api.extensions import db
+from api.models import User
+from api.notifications.fanout import write_notifications
+from api.notifications.stream import notification_broker
+
+
+@pytest.fixture(scope="module")
+def user(app):
+    with app.app_context():
+        u = User(id=str(uuid.uuid4()), email="reader@example.com", password_hash="x")
+        db.session.add(u)
+        db.session.commit()
+        write_notifications([u.id], "system", "Hello", "", {}, push=False)
+        write_notifications([u.id], "system", "Again", "", {}, push=False)
+        return {"id": u.id, "headers": {"Authorization": "Bearer " + create_access_token(identity=u.id)}}
+
+
+@pytest.mark.parametrize("mode", ["cursor=&", ""])
+@pytest.mark.parametrize("limit, expected", [("0", 1), ("-3", 1), ("1", 1), ("500", 2)])
+def test_inbox_limit_is_clamped(app, user, mode, limit, expected):
+    r = app.test_client().get(f"/api/notifications/?{mode}limit={limit}", headers=user["headers"])
+    assert r.status_code == 200
+    assert len(r.get_json()["items"]) == expected
+
+
+def test_inbox_limit_must_be_an_integer(app, user):
+    r = app.test_client().get("/api/notifications/?cursor=&limit=x", headers=user["headers"])
+    assert r.status_code == 400
+
+
+def test_reads_push_the_badge_to_open_streams(app, user):
+    client, headers = app.test_client(), user["headers"]
+    sub = notification_broker.subscribe(user["id"])
+    try:
+        items = client.get("/api/notifications/?limit=100", headers=headers).get_json()["items"]
+        first, second = [n["id"] for n in items]
+
+        client.patch(f"/api/notifications/{first}/read", headers=headers)
+        assert sub.queue.get_nowait() == {"badge": 1}
+        client.patch(f"/api/notifications/{first}/read", headers=headers)  # already read: no change, no event
+        assert sub.queue.empty()
+
+        client.post("/api/notifications/read", json={"ids": [second]}, headers=headers)
+        assert sub.queue.get_nowait() == {"badge": 0}
+
+        with app.app_context():
+            write_notifications([user["id"]], "system", "Third", "", {}, push=False)
+        sub.queue.get_nowait()  # the new notification itself
+        client.post("/api/notifications/read-all", headers=headers)
+        assert sub.queue.get_nowait() == {"badge": 0}
+    finally:
+        notification_broker.unsubscribe(sub)
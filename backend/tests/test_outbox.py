@@ -0,0 +1,49 @@
+# tests/test_outbox.py
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from api.extensions import db
+from api.models import NotificationOutbox
+from api.notifications.outbox import claim_batch, enqueue, process_batch
+from api.notifications.retention import purge_outbox
+
+
+def test_expired_claim_cannot_overwrite_a_reclaimed_row(app):
+    with app.app_context():
+        row = enqueue(["u1"], "system", "Hello")
+        db.session.commit()
+        row_id = row.id
+        stale = claim_batch("worker-a", 10)
+        assert [r.id for r in stale] == [row_id]
+
+        # worker-a stalls past its lease; worker-b takes the row over
+        NotificationOutbox.query.filter_by(id=row_id).update(
+            {"claimed_at": datetime.utcnow() - timedelta(hours=1)}, synchronize_session=False)
+        db.session.commit()
+        fresh = claim_batch("worker-b", 10)
+        assert [r.id for r in fresh] == [row_id]
+
+        with ThreadPoolExecutor(1) as pool:
+            process_batch(stale, pool, "worker-a")  # worker-a finally records its outcome
+        db.session.expire_all()
+        row = db.session.get(NotificationOutbox, row_id)
+        assert (row.status, row.claimed_by) == ("sending", "worker-b")
+
+        with ThreadPoolExecutor(1) as pool:
+            process_batch(fresh, pool, "worker-b")
+        db.session.expire_all()
+        assert db.session.get(NotificationOutbox, row_id).status == "skipped"  # push not configured in tests
+
+
+def test_purge_deletes_only_old_finished_rows(app):
+    with app.app_context():
+        NotificationOutbox.query.delete()
+        old = datetime.utcnow() - timedelta(days=30)
+        for status, created in [("sent", old), ("failed", old), ("skipped", old), ("pending", old), ("sending", old),
+                                ("sent", datetime.utcnow())]:
+            db.session.add(NotificationOutbox(type="system", title=status, user_ids=[], status=status,
+                                              created_at=created))
+        db.session.commit()
+        assert purge_outbox(days=7, batch_size=2) == 3
+        left = sorted((r.status, r.created_at > old) for r in NotificationOutbox.query)
+        assert left == [("pending", False), ("sending", False), ("sent", True)]
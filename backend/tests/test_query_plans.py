@@ -0,0 +1,12 @@
+# tests/test_query_plans.py
+# EXPLAINs the hot event/reminder queries (api/query_plans.py) on SQLite and,
+# when TEST_POSTGRES_URI is set, on Postgres; fails on any full table scan.
+from api.query_plans import check_plans
+
+
+def test_hot_queries_use_an_index(db_app):
+    with db_app.app_context():
+        results = check_plans()
+    assert results
+    failed = {name: lines for name, lines, scans in results if scans}
+    assert not failed, "\n".join(f"{name}:\n  " + "\n  ".join(lines) for name, lines in failed.items())
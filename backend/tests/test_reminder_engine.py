@@ -0,0 +1,86 @@
+# tests/test_reminder_engine.py
+# The timer engine only hears about its own process's commits; reminders
+# written elsewhere must still be sent by the next refill. A process that
+# takes over the leader lease replays what was missed meanwhile.
+import subprocess, sys, time, uuid
+from datetime import datetime, timedelta
+
+from api.extensions import db, scheduler
+from api.models import Event, Notification, Reminder, User
+from api.reminders.catchup import catch_up
+from api.reminders.engine import ReminderEngine
+from api.reminders.scheduler import LEASE_NAME
+from api.utils.lease import acquire_lease, release_lease
+
+# another process (web worker with SCHEDULER_ENABLED=0, admin app) adding a reminder
+INSERT = """
+import sqlite3, sys
+con = sqlite3.connect(sys.argv[1])
+con.execute("INSERT INTO reminders (id, user_id, event_id, method, offset_minutes, fire_at, created_at)"
+            " VALUES (?, ?, ?, 'push', 15, ?, ?)", sys.argv[2:6] + [sys.argv[5]])
+con.commit()
+"""
+
+
+def _ts(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def test_refill_delivers_reminder_written_by_another_process(app):
+    with app.app_context():
+        user = User(id=str(uuid.uuid4()), email="fan@example.com", password_hash="x")
+        event = Event(title="Cup Final", sport="football", starts_at=datetime.utcnow() + timedelta(minutes=15),
+                      host_id=user.id)
+        db.session.add_all([user, event])
+        db.session.commit()
+
+        engine = ReminderEngine()
+        engine.app = app
+        engine.horizon, engine.resync, engine.grace = timedelta(minutes=15), 300, timedelta(milliseconds=100)
+        engine._refill()
+
+        # due almost at once, so by the next refill it's older than now - grace
+        rid = str(uuid.uuid4())
+        fire_at = datetime.utcnow() + timedelta(milliseconds=50)
+        path = db.engine.url.database
+        ids = [uuid.UUID(i).hex for i in (rid, user.id, event.id)]  # SQLite stores UUIDs as 32-char hex
+        subprocess.run([sys.executable, "-c", INSERT, path, *ids, _ts(fire_at)], check=True)
+        assert engine.size() == 0  # no after_commit hook reached this engine
+        time.sleep(0.3)
+
+        engine._refill()
+        engine._fire(engine._pop_due(datetime.utcnow()))
+
+        db.session.expire_all()
+        assert db.session.get(Reminder, rid).delivered_at is not None
+        assert Notification.query.filter_by(user_id=user.id, type="reminder_due").count() == 1
+
+
+def test_taking_over_the_lease_catches_up_missed_reminders(app):
+    with app.app_context():
+        user = User(id=str(uuid.uuid4()), email="late@example.com", password_hash="x")
+        event = Event(title="Semi Final", sport="football", starts_at=datetime.utcnow() + timedelta(hours=1),
+                      host_id=user.id)
+        db.session.add_all([user, event])
+        db.session.flush()
+        # was due 10 minutes ago, while the old leader was dead but still held the lease
+        missed = Reminder(user_id=user.id, event_id=event.id, offset_minutes=70)
+        db.session.add(missed)
+        db.session.commit()
+        acquire_lease(LEASE_NAME, "old-leader", 30)
+
+        engine = ReminderEngine()
+        engine.app = app
+        assert not engine._hold_lease()
+        assert scheduler.get_job("reminder_catchup") is None
+
+        release_lease(LEASE_NAME, "old-leader")  # lease ran out
+        assert engine._hold_lease()
+        job = scheduler.get_job("reminder_catchup")
+        assert job is not None
+        scheduler.remove_job("reminder_catchup")
+        catch_up()  # what the job runs (it stops when the scheduler isn't running, as here)
+
+        db.session.expire_all()
+        assert db.session.get(Reminder, missed.id).delivered_at is not None
+        assert Notification.query.filter_by(user_id=user.id, type="reminder_due").count() == 1
@@ -0,0 +1,80 @@
+# tests/test_search.py
+# Pins substring/email matches for apply_search on SQLite (FTS5) and, when
+# TEST_POSTGRES_URI is set, on Postgres (tsvector + pg_trgm).
+#   python -m pytest -q tests/test_search.py
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from api.extensions import db
+from api.models import Event, User
+from api.search import apply_search, ensure_search_schema
+
+
+@pytest.fixture(scope="module")
+def app(db_app):
+    with db_app.app_context():
+        ensure_search_schema()
+        host = User(id=str(uuid.uuid4()), email="alice.host@example.com", password_hash="x", display_name="Alice Host")
+        db.session.add_all([
+            host,
+            User(id=str(uuid.uuid4()), email="bob@clubmail.co.uk", password_hash="x", display_name="Bob"),
+            Event(title="Cup Final", city="Manchester", sport="football", venue="Old Trafford",
+                  starts_at=datetime(2026, 5, 1, 15), host_id=host.id),
+            Event(title="Derby Day", city="Liverpool", sport="basketball", venue="Arena",
+                  starts_at=datetime(2026, 5, 2, 15), host_id=host.id),
+        ])
+        db.session.commit()
+        yield db_app
+
+
+def search(model, q):
+    query, _ = apply_search(db.session.query(model), model, q)
+    return query.all()
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("bob@clubmail", "bob@clubmail.co.uk"),   # email fragment
+    ("clubmail.co", "bob@clubmail.co.uk"),
+    ("lice.ho", "alice.host@example.com"),    # mid-word substring
+    ("Alice", "alice.host@example.com"),      # word / prefix
+])
+def test_user_search_matches_email_and_substrings(app, q, expected):
+    with app.app_context():
+        assert [u.email for u in search(User, q)] == [expected]
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("anches", "Cup Final"),      # city substring (not the primary column)
+    ("basket", "Derby Day"),      # sport prefix
+    ("sketba", "Derby Day"),      # sport substring
+    ("traff", "Cup Final"),       # venue substring
+    ("cup fin", "Cup Final"),     # multi-word prefix
+])
+def test_event_search_matches_every_field(app, q, expected):
+    with app.app_context():
+        assert [e.title for e in search(Event, q)] == [expected]
+
+
+def test_no_match(app):
+    with app.app_context():
+        assert search(Event, "zzzz") == []
+
+
+def test_like_wildcards_are_literal(app):
+    with app.app_context():
+        assert search(Event, "y%d") == []   # would match "Derby Day" as a LIKE pattern
+        assert search(Event, "y_d") == []
+
+
+def test_sqlite_search_uses_the_fts_index(app):
+    with app.app_context():
+        if db.engine.dialect.name != "sqlite":
+            pytest.skip("SQLite FTS5 plan")
+        query, _ = apply_search(db.session.query(Event), Event, "anches")
+        sql = str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+        plan = [r[-1] for r in db.session.execute(text("EXPLAIN QUERY PLAN " + sql))]
+        assert "SEARCH events USING INTEGER PRIMARY KEY (rowid=?)" in plan, plan
+        assert "SCAN events" not in plan, plan
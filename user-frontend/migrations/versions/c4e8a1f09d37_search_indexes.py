@@ -0,0 +1,41 @@
+"""search indexes (tsvector + pg_trgm)
+
+Revision ID: c4e8a1f09d37
+Revises: 26651eb5a882
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a1f09d37'
+down_revision = '26651eb5a882'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return  # SQLite gets its FTS5 tables in d7b2f5a1c3e9
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_teams_search ON teams USING gin (to_tsvector('simple'::regconfig, "
+        "coalesce(name, '') || ' ' || coalesce(short_name, '') || ' ' || coalesce(league, '')))"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_teams_name_trgm ON teams USING gin (name gin_trgm_ops)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tournaments_search ON tournaments USING gin (to_tsvector('simple'::regconfig, "
+        "coalesce(name, '') || ' ' || coalesce(organizer, '')))"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tournaments_name_trgm ON tournaments USING gin (name gin_trgm_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_tournaments_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_tournaments_search")
+    op.execute("DROP INDEX IF EXISTS ix_teams_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_teams_search")
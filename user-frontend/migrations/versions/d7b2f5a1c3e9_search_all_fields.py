@@ -0,0 +1,70 @@
+"""search: pg_trgm index over all searchable fields, SQLite FTS5 tables
+
+Revision ID: d7b2f5a1c3e9
+Revises: c4e8a1f09d37
+Create Date: 2026-10-18 00:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7b2f5a1c3e9'
+down_revision = 'c4e8a1f09d37'
+branch_labels = None
+depends_on = None
+
+# frozen copy of src/app/search.py SEARCH_FIELDS at this revision
+FIELDS = {
+    "teams": ("name", "short_name", "league"),
+    "tournaments": ("name", "organizer"),
+}
+
+
+def _doc(cols):
+    # same expression as search_text() in src/app/search.py
+    return " || ' ' || ".join(f"coalesce({c}, '')" for c in cols)
+
+
+def _fts(table, cols):
+    fts = f"{table}_fts"
+    col_list = ", ".join(cols)
+    new_vals = ", ".join(f"new.{c}" for c in cols)
+    old_vals = ", ".join(f"old.{c}" for c in cols)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({col_list}, content='{table}', "
+        f"content_rowid='rowid', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for table, cols in FIELDS.items():
+        if dialect == "postgresql":
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_trgm ON {table} "
+                       f"USING gin (({_doc(cols)}) gin_trgm_ops)")
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_name_trgm")
+        elif dialect == "sqlite":
+            for stmt in _fts(table, cols):
+                op.execute(stmt)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for table, cols in FIELDS.items():
+        if dialect == "postgresql":
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_trgm")
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_name_trgm ON {table} USING gin (name gin_trgm_ops)")
+        elif dialect == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
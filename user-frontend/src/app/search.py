@@ -0,0 +1,89 @@
+# src/app/search.py
+# Ranked search for the `search` query param; same approach as
+# backend/api/search.py (keep the two in step, only SEARCH_FIELDS differs):
+# - Postgres: tsvector GIN index for ranked word/prefix matches plus a pg_trgm
+#   GIN index on the same concatenated text, so substrings of any field match.
+# - SQLite: FTS5 tables with the trigram tokenizer (SQLite 3.34+); 1-2
+#   character terms only filter the FTS hits.
+# - Anything else (or before migrating): the plain ILIKE filter.
+# Indexes/FTS tables come from migrations c4e8a1f09d37 and d7b2f5a1c3e9.
+import re
+from sqlalchemy import func, literal_column, or_, select, text
+from .extensions import db
+
+# table -> searchable columns (first one is the primary column, used for similarity ranking)
+SEARCH_FIELDS = {
+    "teams": ("name", "short_name", "league"),
+    "tournaments": ("name", "organizer"),
+}
+
+_MAX_TERMS = 8
+_MIN_TRIGRAM = 3  # shorter FTS5 trigram queries match nothing
+_fts_ready = set()
+
+def _terms(q):
+    return re.findall(r"\w+", (q or "").lower())[:_MAX_TERMS]
+
+def _has_fts(table):
+    key = (str(db.engine.url), table)
+    if key in _fts_ready:
+        return True
+    found = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"), {"n": f"{table}_fts"}
+    ).first()
+    if found:
+        _fts_ready.add(key)
+    return bool(found)
+
+def _like_pattern(q):
+    # %q% with the user's own %, _ and \ taken literally (use with escape="\\")
+    return "%" + re.sub(r"([\\%_])", r"\\\1", q) + "%"
+
+def _like_any(model, q):
+    like = _like_pattern(q.lower())
+    return or_(*[getattr(model, c).ilike(like, escape="\\") for c in SEARCH_FIELDS[model.__tablename__]])
+
+def search_text(model):
+    # must match the indexed expression exactly
+    cols = [func.coalesce(getattr(model, c), literal_column("''")) for c in SEARCH_FIELDS[model.__tablename__]]
+    doc = cols[0]
+    for c in cols[1:]:
+        doc = doc.op("||")(literal_column("' '")).op("||")(c)
+    return doc
+
+def ts_document(model):
+    return func.to_tsvector(literal_column("'simple'::regconfig"), search_text(model))
+
+def apply_search(query, model, q):
+    """Returns (query, ranked); ranked queries are already ordered best-first."""
+    terms = _terms(q)
+    if not terms:
+        return query, False
+    table = model.__tablename__
+    dialect = db.engine.dialect.name
+
+    if dialect == "postgresql":
+        doc = ts_document(model)
+        tsq = func.to_tsquery(literal_column("'simple'::regconfig"), " & ".join(f"{t}:*" for t in terms))
+        primary = getattr(model, SEARCH_FIELDS[table][0])
+        # word/prefix hits via the tsvector index, any substring via the trigram index
+        query = query.filter(or_(doc.op("@@")(tsq), search_text(model).ilike(_like_pattern(q), escape="\\")))
+        return query.order_by(func.ts_rank(doc, tsq).desc(), func.similarity(primary, q).desc().nullslast()), True
+
+    if dialect == "sqlite" and _has_fts(table):
+        indexed = [t for t in terms if len(t) >= _MIN_TRIGRAM]
+        if indexed:
+            match = " ".join(f'"{t}"' for t in indexed)  # every term as a substring, in any field
+            hits = (
+                select(literal_column("rowid").label("rid"), literal_column(f"bm25({table}_fts)").label("rank"))
+                .select_from(text(f"{table}_fts"))
+                .where(text(f"{table}_fts MATCH :match").bindparams(match=match))
+                .subquery()
+            )
+            query = query.join(hits, hits.c.rid == literal_column(f"{table}.rowid"))
+            for t in terms:
+                if len(t) < _MIN_TRIGRAM:
+                    query = query.filter(_like_any(model, t))  # only checked on the FTS hits
+            return query.order_by(hits.c.rank.asc()), True
+
+    return query.filter(_like_any(model, q)), False
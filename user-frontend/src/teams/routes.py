@@ -1,9 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_
 from ..app.extensions import db
 from ..app.models import Team, TeamMember, FollowTeam
 from ..app.schemas import team_schema, teams_schema
+from ..app.search import apply_search
 
 bp = Blueprint("teams", __name__)
 
@@ -15,16 +15,15 @@ def list_teams():
     city = request.args.get("city")
     province = request.args.get("province")
 
-    if search:
-        like = f"%{search}%"
-        q = q.filter(or_(Team.name.ilike(like), Team.short_name.ilike(like), Team.league.ilike(like)))
     if sport: q = q.filter(Team.sport==sport)
     if city: q = q.filter(Team.city==city)
     if province: q = q.filter(Team.province==province)
+    q, ranked = apply_search(q, Team, search)
+    if not ranked: q = q.order_by(Team.created_at.desc())
 
     page = int(request.args.get("page", 1))
     size = min(int(request.args.get("page_size", 20)), 100)
-    items = q.order_by(Team.created_at.desc()).paginate(page=page, per_page=size, error_out=False)
+    items = q.paginate(page=page, per_page=size, error_out=False)
     return jsonify({
         "items": teams_schema.dump(items.items),
         "page": page, "page_size": size, "total": items.total
@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from sqlalchemy import or_
 from ..app.extensions import db
 from ..app.models import Tournament, TournamentRegistration
+from ..app.search import apply_search
 
 bp = Blueprint("tournaments", __name__)
 
@@ -13,12 +13,10 @@ def list_tournaments():
     level = request.args.get("level")
     city = request.args.get("city")
     province = request.args.get("province")
-    if search:
-        like = f"%{search}%"
-        q = q.filter(or_(Tournament.name.ilike(like), Tournament.organizer.ilike(like)))
     if level: q = q.filter(Tournament.level==level)
     if city: q = q.filter(Tournament.city==city)
     if province: q = q.filter(Tournament.province==province)
+    q, _ = apply_search(q, Tournament, search)
 
     page = int(request.args.get("page", 1))
     size = min(int(request.args.get("page_size", 20)), 100)